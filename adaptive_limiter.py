@@ -0,0 +1,73 @@
+# adaptive_limiter.py
+import asyncio
+import time
+from contextlib import asynccontextmanager
+
+
+class AdaptiveLimiter:
+    """
+    AIMD (additív növelés, multiplikatív csökkentés) párhuzamossági korlát.
+    An AIMD concurrency limiter for fanning out REST calls without tripping rate limits.
+
+    Sikeres hívások után a korlát lassan nő (korlátonként +1), rate limit
+    jelzésre (throttle(), vagy ha egy hívás `slow_threshold` másodpercnél
+    tovább tartott, mert a könyvtár a 429-es válasz miatt várakozott) a
+    felére csökken, és az új hívások a `retry_after` idejéig szünetelnek.
+    """
+
+    def __init__(self, initial=4, minimum=1, maximum=16, slow_threshold=2.0, cooldown=1.0):
+        self.limit = float(initial)
+        self.minimum = minimum
+        self.maximum = maximum
+        self.slow_threshold = slow_threshold
+        # Egy rate limit hullám (sok egyszerre visszatérő hívás) csak egyszer felezze a korlátot
+        self.cooldown = cooldown
+        self._active = 0
+        self._paused_until = 0.0
+        self._last_decrease = float("-inf")
+        self._condition = asyncio.Condition()
+
+        # Metrikák
+        self.calls = 0
+        self.throttled = 0
+        self.peak = int(self.limit)
+
+    @property
+    def active(self):
+        return self._active
+
+    @asynccontextmanager
+    async def slot(self):
+        """Egy hívás helye a korláton belül; a hívás idejét a kilépéskor értékeli."""
+        async with self._condition:
+            await self._condition.wait_for(lambda: self._active < int(self.limit))
+            self._active += 1
+        try:
+            pause = self._paused_until - time.monotonic()
+            if pause > 0:
+                await asyncio.sleep(pause)
+            started = time.monotonic()
+            yield self
+            self._record(time.monotonic() - started)
+        finally:
+            async with self._condition:
+                self._active -= 1
+                self._condition.notify_all()
+
+    def throttle(self, retry_after=0.0):
+        """Rate limit jelzés: a korlát felére csökken, az új hívások `retry_after` ideig várnak."""
+        self.throttled += 1
+        now = time.monotonic()
+        if now - self._last_decrease >= self.cooldown:
+            self._last_decrease = now
+            self.limit = max(self.minimum, self.limit / 2)
+        self._paused_until = max(self._paused_until, now + retry_after)
+
+    def _record(self, elapsed):
+        self.calls += 1
+        if elapsed >= self.slow_threshold:
+            # A könyvtár a háttérben kivárta a rate limitet
+            self.throttle()
+            return
+        self.limit = min(self.maximum, self.limit + 1 / self.limit)
+        self.peak = max(self.peak, int(self.limit))
@@ -0,0 +1,85 @@
+# benchmarks/bench_youtube_id.py
+"""
+Összehasonlítja a régi, split alapú YouTube ID kinyerést az előre lefordított mintával.
+Compares the old split-based YouTube ID parsing with the precompiled parser.
+
+Futtatás / usage:
+    python benchmarks/bench_youtube_id.py [--urls N] [--repeat R]
+"""
+import argparse
+import os
+import random
+import re
+import string
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cogs.youtube_cog import get_youtube_id  # noqa: E402
+
+# Az egyes URL formák és hogy a régi kód elvileg kezeli-e őket
+URL_FORMS = (
+    ("watch", "https://www.youtube.com/watch?v={id}"),
+    ("watch+params", "https://www.youtube.com/watch?v={id}&list=PL123&t=42s"),
+    ("params előtte", "https://m.youtube.com/watch?feature=share&v={id}"),
+    ("youtu.be", "https://youtu.be/{id}?si=abcdef"),
+    ("shorts", "https://www.youtube.com/shorts/{id}?feature=share"),
+    ("embed", "https://www.youtube.com/embed/{id}"),
+    ("music", "https://music.youtube.com/watch?v={id}&feature=share"),
+    ("live", "https://www.youtube.com/live/{id}"),
+    ("<link>", "<https://youtu.be/{id}>"),
+    ("szövegben", "nézd: https://www.youtube.com/watch?v={id} !"),
+    ("nem youtube", "https://example.com/watch?v={id}"),
+)
+
+
+def legacy_get_youtube_id(url):
+    """A YouTubeCog korábbi get_youtube_id függvénye változtatás nélkül."""
+    if 'youtu.be' in url:
+        return url.split('youtu.be/')[1].split('?')[0]
+    if 'youtube.com' in url:
+        match = re.search(r"v=([\w-]+)", url)
+        if match:
+            return match.group(1)
+    return None
+
+
+def random_id(rng):
+    return "".join(rng.choice(string.ascii_letters + string.digits + "-_") for _ in range(11))
+
+
+def run(url_count, repeat):
+    rng = random.Random(42)
+
+    # Helyesség URL formánként
+    print(f"{'forma':<16} {'régi':>12} {'új':>12}")
+    for name, form in URL_FORMS:
+        video_id = random_id(rng)
+        url = form.format(id=video_id)
+        expected = None if name == "nem youtube" else video_id
+        legacy_ok = "ok" if legacy_get_youtube_id(url) == expected else "HIBÁS"
+        new_ok = "ok" if get_youtube_id(url) == expected else "HIBÁS"
+        print(f"{name:<16} {legacy_ok:>12} {new_ok:>12}")
+
+    # Sebesség a régi kód által is kezelt formákon
+    forms = [form for name, form in URL_FORMS if name in ("watch", "watch+params", "youtu.be", "music")]
+    urls = [rng.choice(forms).format(id=random_id(rng)) for _ in range(url_count)]
+    legacy = min(timeit.repeat(lambda: [legacy_get_youtube_id(u) for u in urls], number=1, repeat=repeat))
+    compiled = min(timeit.repeat(lambda: [get_youtube_id(u) for u in urls], number=1, repeat=repeat))
+    legacy_ns = legacy / url_count * 1e9
+    compiled_ns = compiled / url_count * 1e9
+    print()
+    print(f"régi: {legacy_ns:.0f} ns/URL, új: {compiled_ns:.0f} ns/URL ({legacy_ns / compiled_ns:.2f}x)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--urls", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    run(args.urls, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+# benchmarks/feed_stub_server.py
+"""
+Helyi YouTube feed helyettesítő szerver és a FeedPoller mérése ellene.
+A local stand-in for YouTube channel feeds, and a poller run against it.
+
+A szerver csatornánként szintetikus Atom feedet ad (a legújabb 15 videóval),
+a csatornákra `--upload-every` másodpercenként kerül új videó, és ETag /
+If-Modified-Since esetén 304-et válaszol. Alapból a FeedPoller fut ellene
+`--duration` ideig, és jelenti a kérések, 304-ek, új videók számát és az
+észlelés késését; `--serve` módban csak a szerver indul el, a bot ekkor a
+kiírt YOUTUBE_FEED_URL értékkel erre irányítható.
+
+Futtatás / usage (a repó gyökeréből):
+    python benchmarks/feed_stub_server.py --feeds 500 --duration 30 --interval 2
+    python benchmarks/feed_stub_server.py --serve --port 8765
+"""
+import argparse
+import asyncio
+import hashlib
+import os
+import random
+import sys
+import time
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from aiohttp import web  # noqa: E402
+from feed_poller import FeedPoller  # noqa: E402
+from metrics import Histogram  # noqa: E402
+
+ENTRIES_PER_FEED = 15
+
+
+class StubFeeds:
+    """Determinisztikus feltöltési idők csatornánként: a k. videó a `offset + k * every` időpontban jelenik meg."""
+
+    def __init__(self, upload_every, started):
+        self.upload_every = upload_every
+        self.started = int(started)
+        self.requests = 0
+        self.not_modified = 0
+
+    def _offset(self, channel_id):
+        return int(hashlib.md5(channel_id.encode()).hexdigest(), 16) % self.upload_every
+
+    def uploads(self, channel_id, now):
+        """A csatorna eddig megjelent legújabb videói (video_id, Unix idő) párokban, legújabb elöl."""
+        offset = self._offset(channel_id)
+        newest = int((now - self.started - offset) // self.upload_every)
+        first = max(0, newest - ENTRIES_PER_FEED + 1)
+        return [
+            (f"{channel_id[-6:]}{index:05d}", self.started + offset + index * self.upload_every)
+            for index in range(newest, first - 1, -1)
+        ]
+
+    def render(self, channel_id, uploads):
+        parts = [
+            '<?xml version="1.0" encoding="UTF-8"?>\n'
+            '<feed xmlns:yt="http://www.youtube.com/xml/schemas/2015" '
+            'xmlns:media="http://search.yahoo.com/mrss/" xmlns="http://www.w3.org/2005/Atom">\n'
+            f"<title>Csatorna {channel_id}</title><author><name>Csatorna {channel_id}</name></author>\n"
+        ]
+        for video_id, published in uploads:
+            stamp = datetime.fromtimestamp(published, timezone.utc).isoformat()
+            parts.append(
+                f"<entry><id>yt:video:{video_id}</id><yt:videoId>{video_id}</yt:videoId>"
+                f"<yt:channelId>{channel_id}</yt:channelId><title>Videó {video_id}</title>"
+                f'<link rel="alternate" href="https://www.youtube.com/watch?v={video_id}"/>'
+                f"<author><name>Csatorna {channel_id}</name></author>"
+                f"<published>{stamp}</published><updated>{stamp}</updated>"
+                f"<media:group><media:description>{'Leírás ' * 40}</media:description></media:group></entry>\n"
+            )
+        parts.append("</feed>\n")
+        return "".join(parts).encode()
+
+    async def handle(self, request):
+        self.requests += 1
+        channel_id = request.query.get("channel_id")
+        if not channel_id:
+            return web.Response(status=400)
+        uploads = self.uploads(channel_id, time.time())
+        etag = f'"{uploads[0][0] if uploads else "empty"}"'
+        newest = uploads[0][1] if uploads else self.started
+        last_modified = format_datetime(datetime.fromtimestamp(newest, timezone.utc), usegmt=True)
+
+        if request.headers.get("If-None-Match") == etag:
+            self.not_modified += 1
+            return web.Response(status=304, headers={"ETag": etag, "Last-Modified": last_modified})
+        since = request.headers.get("If-Modified-Since")
+        if since and "If-None-Match" not in request.headers and parsedate_to_datetime(since).timestamp() >= newest:
+            self.not_modified += 1
+            return web.Response(status=304, headers={"ETag": etag, "Last-Modified": last_modified})
+        return web.Response(
+            body=self.render(channel_id, uploads), content_type="application/atom+xml",
+            headers={"ETag": etag, "Last-Modified": last_modified}
+        )
+
+
+async def start_server(feeds, port):
+    app = web.Application()
+    app.router.add_get("/feeds/videos.xml", feeds.handle)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, "127.0.0.1", port).start()
+    return runner
+
+
+async def serve(args):
+    feeds = StubFeeds(args.upload_every, time.time())
+    runner = await start_server(feeds, args.port)
+    print(f"YOUTUBE_FEED_URL=http://127.0.0.1:{args.port}/feeds/videos.xml?channel_id={{channel_id}}")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await runner.cleanup()
+
+
+async def measure(args):
+    feeds = StubFeeds(args.upload_every, time.time())
+    runner = await start_server(feeds, args.port)
+    rng = random.Random(42)
+    channels = [
+        "UC" + "".join(rng.choice("abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789_-") for _ in range(22))
+        for _ in range(args.feeds)
+    ]
+
+    seen = {}
+    detection = Histogram()
+
+    async def handler(state, entries):
+        now = time.time()
+        for entry in entries:
+            seen[entry.video_id] = seen.get(entry.video_id, 0) + 1
+            detection.observe(now - entry.published.replace(tzinfo=timezone.utc).timestamp())
+
+    async def saver(state):
+        pass
+
+    poller = FeedPoller(
+        handler, saver, url=f"http://127.0.0.1:{args.port}/feeds/videos.xml?channel_id={{channel_id}}",
+        interval=args.interval, concurrency=args.concurrency
+    )
+    started = time.time()
+    # A követés kezdete a kiindulópont, mint a /follow add parancsnál
+    baseline = datetime.fromtimestamp(started, timezone.utc).replace(tzinfo=None)
+    for channel_id in channels:
+        poller.add(channel_id, last_published=baseline)
+    poller.start()
+    await asyncio.sleep(args.duration)
+    await poller.stop()
+    finished = time.time()
+    await runner.cleanup()
+
+    # Az elvárt videók: a követés kezdete után, de legalább egy lekérési időközzel a vége előtt megjelentek
+    expected = {
+        video_id for channel_id in channels
+        for video_id, published in feeds.uploads(channel_id, finished)
+        if int(started) < published <= finished - args.interval * 1.5
+    }
+    missed = expected - seen.keys()
+    duplicates = sum(1 for count in seen.values() if count > 1)
+
+    stats = poller.stats()
+    fetch = stats["fetch_time"]
+    ratio = stats["not_modified"] / stats["requests"] if stats["requests"] else 0.0
+    print(f"feedek: {args.feeds}, időköz: {args.interval:g} s, párhuzamosság: {args.concurrency}, futásidő: {finished - started:.1f} s")
+    print(f"kérések: {stats['requests']} ({stats['requests'] / (finished - started):.0f}/s), 304: {stats['not_modified']} ({ratio:.1%}), hiba: {stats['errors']}")
+    print(f"letöltve: {stats['fetched']} feed, {stats['bytes_read'] / 1024:.0f} KiB")
+    print(f"lekérési idő: p50 {fetch['p50'] * 1000:.1f} ms | p99 {fetch['p99'] * 1000:.1f} ms")
+    print(f"új videók: {stats['new_entries']} | elvárt: {len(expected)} | kimaradt: {len(missed)} | duplikált: {duplicates}")
+    if detection.count:
+        snapshot = detection.snapshot()
+        print(f"észlelési késés: p50 {snapshot['p50']:.2f} s | p99 {snapshot['p99']:.2f} s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--serve", action="store_true", help="csak a szerver indítása")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--feeds", type=int, default=200)
+    parser.add_argument("--duration", type=float, default=20.0)
+    parser.add_argument("--interval", type=float, default=2.0, help="feedenkénti lekérési időköz (s)")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--upload-every", type=int, default=10, help="csatornánkénti feltöltési időköz (s)")
+    args = parser.parse_args()
+    asyncio.run(serve(args) if args.serve else measure(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,472 @@
+# benchmarks/load_harness.py
+"""
+Terheléses teszt: gateway események visszajátszása a valódi cog-okon keresztül.
+Load harness: replays gateway events through the real cogs.
+
+A valódi MyBot példányt és a cogs mappa bővítményeit használja, de a Discord
+kapcsolatot hamis objektumok, az aiomysql poolt pedig egy memóriában futó,
+állítható késleltetésű helyettesítő váltja ki. A végén áteresztőképességet,
+p50/p99 késleltetést és eseményenkénti adatbázis hívásszámot jelent.
+
+Futtatás / usage (a repó gyökeréből):
+    python benchmarks/load_harness.py --events 20000 --guilds 50 --db-latency-ms 2
+    python benchmarks/load_harness.py --record events.jsonl --events 5000
+    python benchmarks/load_harness.py --replay events.jsonl
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import string
+import sys
+import time
+from collections import Counter
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)  # a bővítmények a "cogs" mappából töltődnek
+
+import discord  # noqa: E402
+from bot import MyBot  # noqa: E402
+from db_pool import InstrumentedPool  # noqa: E402
+from metrics import Histogram  # noqa: E402
+from runtime_metrics import RuntimeMetrics  # noqa: E402
+
+# Paraméter nélkül meghívható parancsok, amelyeket a harness végig tud futtatni
+INTERACTION_COMMANDS = ("server", "cogs", "admin list-bad-words", "admin template-list", "stats cache", "stats moderation", "stats feeds", "stats runtime")
+
+
+# --- Memóriában futó adatbázis helyettesítő ---
+
+class FakeDatabase:
+    """A bot lekérdezéseit kiszolgáló, memóriában tárolt táblák és hívásszámláló."""
+
+    def __init__(self, latency):
+        self.latency = latency
+        self.calls = 0
+        self.statements = Counter()
+        self.guilds = {}
+        self.enabled_cogs = {}
+        self.bad_words = {}
+        self.templates = {}
+
+    def add_guild(self, guild_id, name, cogs, bad_words):
+        self.guilds[guild_id] = (guild_id, name, None, None, None, None, "Placeholder CPU Info", "Placeholder RAM Info")
+        self.enabled_cogs[guild_id] = set(cogs)
+        self.bad_words[guild_id] = set(bad_words)
+        self.templates[guild_id] = {}
+
+    def run(self, query, args):
+        """Visszaadja a lekérdezés sorait; az ismeretlen utasítások egy sort érintenek."""
+        self.calls += 1
+        self.statements[query.split(" WHERE ")[0][:60]] += 1
+        guild_id = args[0] if args else None
+        if query.startswith("SELECT word FROM bad_words"):
+            return [(word,) for word in self.bad_words.get(guild_id, ())]
+        if query.startswith("SELECT cog_name FROM enabled_cogs"):
+            return [(cog,) for cog in self.enabled_cogs.get(guild_id, ())]
+        if query.startswith("SELECT guild_id, guild_name FROM guilds"):
+            return [(row[0], row[1]) for row in self.guilds.values()]
+        if query.startswith("SELECT") and "FROM guilds WHERE guild_id" in query:
+            row = self.guilds.get(guild_id)
+            if row is None:
+                return []
+            return [dict(zip(("guild_id", "guild_name"), row))] if query.startswith("SELECT *") else [row]
+        if "FROM post_templates WHERE guild_id" in query:
+            return sorted(self.templates.get(guild_id, {}).values(), key=lambda t: t["name"])
+        return None
+
+
+class FakeCursor:
+    def __init__(self, db):
+        self._db = db
+        self._rows = []
+        self.rowcount = 0
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        pass
+
+    async def execute(self, query, args=None):
+        if self._db.latency:
+            await asyncio.sleep(self._db.latency)
+        rows = self._db.run(query, args)
+        self._rows = rows or []
+        self.rowcount = len(self._rows) if rows is not None else 1
+
+    async def executemany(self, query, args):
+        for arg in args:
+            await self.execute(query, arg)
+
+    async def fetchone(self):
+        return self._rows[0] if self._rows else None
+
+    async def fetchall(self):
+        return self._rows
+
+
+class FakeConnection:
+    def __init__(self, db):
+        self._db = db
+
+    def cursor(self, *cursor_classes):
+        return FakeCursor(self._db)
+
+    async def begin(self):
+        pass
+
+    async def commit(self):
+        pass
+
+    async def rollback(self):
+        pass
+
+
+class FakeAiomysqlPool:
+    """Az aiomysql Pool acquire/release felületének helyettesítője korlátos kapcsolatszámmal."""
+
+    def __init__(self, db, maxsize):
+        self._db = db
+        self.minsize = 1
+        self.maxsize = maxsize
+        self._free = [FakeConnection(db) for _ in range(maxsize)]
+        self._available = asyncio.Semaphore(maxsize)
+
+    @property
+    def size(self):
+        return self.maxsize
+
+    @property
+    def freesize(self):
+        return len(self._free)
+
+    async def acquire(self):
+        await self._available.acquire()
+        return self._free.pop()
+
+    async def release(self, conn):
+        self._free.append(conn)
+        self._available.release()
+
+    def close(self):
+        pass
+
+    async def wait_closed(self):
+        pass
+
+
+# --- Hamis Discord objektumok ---
+
+class FakeRole:
+    def __init__(self, role_id):
+        self.id = role_id
+        self.mention = f"<@&{role_id}>"
+
+
+class FakeChannel:
+    def __init__(self, channel_id, counters):
+        self.id = channel_id
+        self.mention = f"<#{channel_id}>"
+        self._counters = counters
+
+    async def send(self, *args, **kwargs):
+        self._counters["channel.send"] += 1
+
+    async def delete_messages(self, messages, **kwargs):
+        self._counters["channel.delete_messages"] += 1
+
+
+class FakeGuild:
+    def __init__(self, guild_id, counters):
+        self.id = guild_id
+        self.name = f"guild-{guild_id}"
+        self.icon = None
+        self.channel = FakeChannel(guild_id * 10, counters)
+
+    def get_channel(self, channel_id):
+        return self.channel if channel_id == self.channel.id else None
+
+    def get_role(self, role_id):
+        return FakeRole(role_id) if role_id else None
+
+
+class FakeUser:
+    def __init__(self, user_id, bot=False):
+        self.id = user_id
+        self.bot = bot
+        self.mention = f"<@{user_id}>"
+        self.display_name = f"user-{user_id}"
+
+
+class FakeMessage:
+    def __init__(self, message_id, guild, author, content, counters):
+        self.id = message_id
+        self.guild = guild
+        self.author = author
+        self.channel = guild.channel
+        self.content = content
+        self._counters = counters
+
+    async def delete(self, **kwargs):
+        self._counters["message.delete"] += 1
+
+
+class FakeResponse:
+    def __init__(self, counters):
+        self._counters = counters
+        self._done = False
+
+    def is_done(self):
+        return self._done
+
+    async def send_message(self, *args, **kwargs):
+        self._done = True
+        self._counters["response.send_message"] += 1
+
+    async def defer(self, **kwargs):
+        self._done = True
+
+    async def autocomplete(self, choices):
+        self._done = True
+
+
+class FakeFollowup:
+    def __init__(self, counters):
+        self._counters = counters
+
+    async def send(self, *args, **kwargs):
+        self._counters["followup.send"] += 1
+
+
+class FakeInteraction:
+    def __init__(self, guild, user, command, counters):
+        self.guild = guild
+        self.guild_id = guild.id
+        self.user = user
+        self.command = command
+        self.type = discord.InteractionType.application_command
+        self.response = FakeResponse(counters)
+        self.followup = FakeFollowup(counters)
+        self.extras = {}
+
+
+# --- Eseményfolyam ---
+
+def _random_word(rng, min_len=3, max_len=9):
+    return "".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(min_len, max_len)))
+
+
+def synthetic_events(count, guilds, bad_words_per_guild, interaction_ratio, hit_ratio, seed):
+    """Szintetikus üzenet- és interakció-eseményeket állít elő."""
+    rng = random.Random(seed)
+    vocab = {guild_id: sorted({_random_word(rng, 5) for _ in range(bad_words_per_guild)}) for guild_id in range(1, guilds + 1)}
+    events = []
+    for index in range(count):
+        guild_id = rng.randint(1, guilds)
+        if rng.random() < interaction_ratio:
+            events.append({"type": "interaction", "guild_id": guild_id, "user_id": rng.randint(1, 5000),
+                           "command": rng.choice(INTERACTION_COMMANDS)})
+            continue
+        words = [_random_word(rng, 2, 8) for _ in range(rng.randint(3, 30))]
+        if vocab[guild_id] and rng.random() < hit_ratio:
+            words.insert(rng.randrange(len(words)), rng.choice(vocab[guild_id]))
+        events.append({"type": "message", "guild_id": guild_id, "user_id": rng.randint(1, 5000),
+                       "message_id": index, "content": " ".join(words)})
+    return events, vocab
+
+
+def load_events(path):
+    """Beolvas egy JSONL eseményfájlt; a "guild" sorok a szerverek tiltólistáit írják le."""
+    events, vocab = [], {}
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            event = json.loads(line)
+            if event["type"] == "guild":
+                vocab[event["guild_id"]] = event["bad_words"]
+            else:
+                vocab.setdefault(event["guild_id"], [])
+                events.append(event)
+    return events, vocab
+
+
+# --- Visszajátszás ---
+
+class Harness:
+    def __init__(self, args):
+        self.args = args
+        self.counters = Counter()
+        self.db = FakeDatabase(args.db_latency_ms / 1000)
+        self.pool = InstrumentedPool(FakeAiomysqlPool(self.db, args.pool_size))
+        self.bot = MyBot(db_pool=self.pool)
+        self.guild_objects = {}
+        self.latency = {"message": Histogram(), "interaction": Histogram()}
+        self.processed = Counter()
+
+    async def setup(self, vocab):
+        for filename in sorted(os.listdir("cogs")):
+            if filename.endswith(".py") and not filename.startswith("__"):
+                await self.bot.load_extension(f"cogs.{filename[:-3]}")
+        self.bot.build_command_map()
+        all_cogs = [f"cogs.{f[:-3]}" for f in os.listdir("cogs") if f.endswith(".py") and not f.startswith("__")]
+        for guild_id, words in vocab.items():
+            self.db.add_guild(guild_id, f"guild-{guild_id}", all_cogs, words)
+            self.guild_objects[guild_id] = FakeGuild(guild_id, self.counters)
+
+    def _guild(self, guild_id):
+        guild = self.guild_objects.get(guild_id)
+        if guild is None:
+            guild = self.guild_objects[guild_id] = FakeGuild(guild_id, self.counters)
+            self.db.add_guild(guild_id, guild.name, [], [])
+        return guild
+
+    def _command(self, qualified_name):
+        names = qualified_name.split()
+        command = self.bot.tree.get_command(names[0])
+        for name in names[1:]:
+            command = command.get_command(name)
+        return command
+
+    async def handle(self, event):
+        guild = self._guild(event["guild_id"])
+        user = FakeUser(event.get("user_id", 1))
+        if event["type"] == "message":
+            message = FakeMessage(event.get("message_id", 0), guild, user, event["content"], self.counters)
+            # A valódi diszpécserhez hasonlóan a _run_event-en át, így a kezelők mérése is benne van
+            for listener in self.bot.extra_events.get("on_message", []):
+                await self.bot._run_event(listener, "on_message", message)
+            return
+        command = self._command(event["command"])
+        interaction = FakeInteraction(guild, user, command, self.counters)
+        if await self.bot.is_cog_enabled(interaction):
+            await command.callback(command.binding, interaction)
+            self.bot.metrics.command_finished(interaction)
+
+    async def replay(self, events, concurrency):
+        queue = asyncio.Queue()
+        for event in events:
+            queue.put_nowait(event)
+
+        async def worker():
+            while True:
+                try:
+                    event = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                started = time.perf_counter()
+                try:
+                    await self.handle(event)
+                except Exception as e:
+                    self.counters[f"error:{type(e).__name__}"] += 1
+                self.latency[event["type"]].observe(time.perf_counter() - started)
+                self.processed[event["type"]] += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        # Az on_message csak sorba állít: a mérés a moderációs sor kiürüléséig tart
+        await self.drain()
+        return time.perf_counter() - started
+
+    async def drain(self):
+        cog = self.bot.get_cog("ModerationCog")
+        if cog is not None:
+            await cog.pipeline.join()
+            await cog.burst.flush_all()
+
+
+def report(harness, elapsed, db_calls_before, events):
+    total = sum(harness.processed.values())
+    db_calls = harness.db.calls - db_calls_before
+    print(f"Események: {total} ({dict(harness.processed)}) {elapsed:.2f} s alatt")
+    print(f"Áteresztőképesség: {total / elapsed:,.0f} esemény/s")
+    for kind, histogram in harness.latency.items():
+        if histogram.count:
+            snap = histogram.snapshot()
+            print(f"  {kind:<12} {histogram.count / elapsed:>10,.0f}/s  p50 {snap['p50'] * 1000:7.3f} ms  "
+                  f"p99 {snap['p99'] * 1000:7.3f} ms  max {snap['max'] * 1000:7.3f} ms")
+    print(f"DB hívások: {db_calls} ({db_calls / max(total, 1):.3f} / esemény)")
+    wait = harness.pool.wait_times.snapshot()
+    print(f"Pool várakozás: p50 {wait['p50'] * 1000:.3f} ms, p99 {wait['p99'] * 1000:.3f} ms, csúcs foglaltság {harness.pool.max_in_use}")
+    print(f"Discord hívások: {dict(sorted(harness.counters.items()))}")
+    cog = harness.bot.get_cog("ModerationCog")
+    if cog is not None:
+        stats = cog.pipeline.stats()
+        wait = stats["queue_wait"]
+        print(f"Moderációs sor: {stats['processed']} feldolgozva {stats['batches']} kötegben "
+              f"(átlag {stats['batch_size']:.1f}), csúcs mélység {stats['max_depth']}, ledobva {stats['dropped'] or 0}, "
+              f"sorban várakozás p50 {wait['p50'] * 1000:.3f} ms, p99 {wait['p99'] * 1000:.3f} ms")
+        burst = cog.burst.stats()
+        print(f"Tömeges törlés: {burst['messages']} üzenet, {burst['api_calls']} API hívás "
+              f"({burst['api_calls_saved']} megtakarítva)")
+    runtime = harness.bot.metrics.snapshot()
+    lag = runtime["loop_lag"]
+    print(f"Eseményhurok késés: p50 {lag['p50'] * 1000:.1f} ms, p99 {lag['p99'] * 1000:.1f} ms, max {lag['max'] * 1000:.1f} ms")
+    for row in sorted(runtime["commands"], key=lambda row: row["p99"], reverse=True)[:3]:
+        print(f"  /{row['name']:<22} {row['count']:>6} hívás  p99 {row['p99'] * 1000:7.3f} ms  hiba {row['errors']}")
+    if harness.args.verbose:
+        for statement, count in harness.db.statements.most_common():
+            print(f"  {count:>8}  {statement}")
+
+
+async def run(args):
+    if args.replay:
+        events, vocab = load_events(args.replay)
+    else:
+        events, vocab = synthetic_events(args.events, args.guilds, args.bad_words, args.interaction_ratio, args.hit_ratio, args.seed)
+    if args.record:
+        with open(args.record, "w", encoding="utf-8") as f:
+            for guild_id, words in vocab.items():
+                f.write(json.dumps({"type": "guild", "guild_id": guild_id, "bad_words": words}) + "\n")
+            for event in events:
+                f.write(json.dumps(event, ensure_ascii=False) + "\n")
+        print(f"{len(events)} esemény kiírva: {args.record}")
+        return
+
+    harness = Harness(args)
+    await harness.setup(vocab)
+    # Csak a hurok késés mérése indul, HTTP végpont nélkül
+    await harness.bot.metrics.start()
+
+    warmup, measured = events[:args.warmup], events[args.warmup:]
+    if warmup:
+        await harness.replay(warmup, args.concurrency)
+        harness.latency = {"message": Histogram(), "interaction": Histogram()}
+        harness.processed.clear()
+        harness.counters.clear()
+        harness.pool.wait_times = Histogram()
+        harness.bot.metrics = RuntimeMetrics()
+        await harness.bot.metrics.start()
+    db_calls_before = harness.db.calls
+    elapsed = await harness.replay(measured, args.concurrency)
+    report(harness, elapsed, db_calls_before, measured)
+    await harness.bot.metrics.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--events", type=int, default=20000)
+    parser.add_argument("--guilds", type=int, default=50)
+    parser.add_argument("--bad-words", type=int, default=500, help="tiltott szavak száma szerverenként")
+    parser.add_argument("--interaction-ratio", type=float, default=0.2)
+    parser.add_argument("--hit-ratio", type=float, default=0.02, help="tiltott szót tartalmazó üzenetek aránya")
+    parser.add_argument("--concurrency", type=int, default=64, help="egyszerre feldolgozott események")
+    parser.add_argument("--db-latency-ms", type=float, default=1.0, help="szimulált késleltetés SQL utasításonként")
+    parser.add_argument("--pool-size", type=int, default=10)
+    parser.add_argument("--warmup", type=int, default=0, help="ennyi eseményt mérés nélkül játszik vissza")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--record", help="a szintetikus eseményeket JSONL fájlba írja, és kilép")
+    parser.add_argument("--replay", help="JSONL eseményfájl visszajátszása")
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.ERROR)
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,23 @@
 # bot.py
+# A profiling modul rögzíti a folyamat indulási idejét, ezért ez az első import
+from profiling import PROCESS_START, StartupProfiler
 import discord
+from discord import app_commands
 from discord.ext import commands
 import os
+import sys
+import time
 import asyncio
+import math
 import logging
 from dotenv import load_dotenv
-from database import create_pool, create_tables, register_guild, get_enabled_cogs
+from command_sync import sync_if_changed
+from host_metrics import HostMetrics
+from runtime_metrics import RuntimeMetrics
+from migrations import run_migrations
+from database import create_pool, register_guild, reconcile_guilds, get_enabled_cog_set
+
+IMPORTS_DONE = time.perf_counter()
 
 # --- Logger Beállítása ---
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -14,108 +26,279 @@ logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(
 load_dotenv()
 
 # --- Bot Osztály ---
-class MyBot(commands.Bot):
-    def __init__(self, db_pool):
+class MyBot(commands.AutoShardedBot):
+    """
+    A bot automatikusan shardolt változata.
+    Egy folyamatban alapértelmezetten az összes shardot kezeli; a launcher.py
+    worker folyamatai a `shard_ids` / `shard_count` paraméterekkel csak a saját
+    shard tartományukat futtatják.
+    """
+    def __init__(self, db_pool, force_sync=False, profiler=None, shard_ids=None, shard_count=None,
+                 apply_migrations=True, sync_commands=True, metrics_port=0, metrics_host="127.0.0.1"):
         intents = discord.Intents.default()
         intents.messages = True
         intents.guilds = True
         intents.message_content = True
-        super().__init__(command_prefix="!", intents=intents)
+        # A tömeges moderáció rang és csatlakozási idő szerinti kiválasztásához kell (MEMBERS_INTENT=1)
+        intents.members = os.getenv("MEMBERS_INTENT") == "1"
+        super().__init__(command_prefix="!", intents=intents, shard_ids=shard_ids, shard_count=shard_count)
         self.db_pool = db_pool
+        # Ha igaz, a parancsfa akkor is szinkronizálódik, ha a lenyomata nem változott
+        self.force_sync = force_sync
+        # Több folyamatos futásnál a migrációkat a launcher, a szinkronizálást az első worker végzi
+        self.apply_migrations = apply_migrations
+        self.sync_commands = sync_commands
+        # Parancs teljes neve -> (cog modul, cog osztálynév); a bővítmények betöltése után épül fel
+        self.command_cogs = {}
+        self.profiler = profiler or StartupProfiler()
+        # Akkor áll be, ha az adatbázis séma kész; a táblákat a cog_load-ban használó cog-ok erre várnak
+        self.schema_ready = asyncio.Event()
+        # Parancsok és eseménykezelők késése, hibák, eseményhurok késés; `metrics_port` esetén Prometheus végpont
+        self.metrics = RuntimeMetrics()
+        # A gép és a folyamat terhelésének háttérben futó mintavételezője (pl. a /server számára);
+        # a hurok késését a RuntimeMetrics méréséből veszi
+        self.host_metrics = HostMetrics(loop_lag=lambda: self.metrics.last_loop_lag)
+        self.metrics_port = metrics_port
+        self.metrics_host = metrics_host
+        self.metrics.gauge("discord_bot_guilds", "Guilds handled by this process.", lambda: len(self.guilds))
+        self.metrics.gauge("discord_bot_gateway_latency_seconds", "Average gateway heartbeat latency.", self._gateway_latency)
+        self.metrics.gauge("discord_bot_process_resident_memory_bytes", "Resident memory of the bot process.", lambda: self._host_sample("rss"))
+        self.metrics.gauge("discord_bot_host_cpu_percent", "Host CPU utilisation.", lambda: self._host_sample("cpu_percent"))
+        self.metrics.gauge("discord_bot_host_memory_used_bytes", "Host memory in use (MemTotal - MemAvailable).", lambda: self._host_sample("mem_used"))
 
         # Globális ellenőrzés, ami minden app parancs előtt lefut
         self.tree.interaction_check = self.is_cog_enabled
+        self.tree.on_error = self.on_app_command_error
+
+    def owns_guild(self, guild_id):
+        """Igaz, ha a szerver shardját ez a folyamat kezeli (több folyamatos futásnál csak a sajátjait)."""
+        if not self.shard_ids or not self.shard_count:
+            return True
+        return (guild_id >> 22) % self.shard_count in self.shard_ids
+
+    @property
+    def shard_scope(self):
+        """A folyamat shard tartománya (pl. "0-7/16"), egy folyamatos futásnál "all"; a worker saját állapotának kulcsa."""
+        if not self.shard_ids or not self.shard_count:
+            return "all"
+        return f"{min(self.shard_ids)}-{max(self.shard_ids)}/{self.shard_count}"
+
+    def _host_sample(self, field):
+        sample = self.host_metrics.latest()
+        return getattr(sample, field) if sample is not None else None
+
+    def _gateway_latency(self):
+        latency = self.latency
+        # Csatlakozás előtt a discord.py NaN-t ad vissza
+        return latency if math.isfinite(latency) else None
+
+    async def _run_event(self, coro, event_name, *args, **kwargs):
+        # Minden eseménykezelő (a cog-oké is) itt fut: kezelőnként mérjük az idejét és a hibáit
+        await super()._run_event(self.metrics.timed_listener(coro, event_name), event_name, *args, **kwargs)
+
+    async def on_app_command_completion(self, interaction, command):
+        self.metrics.command_finished(interaction)
+
+    async def on_app_command_error(self, interaction, error):
+        """A parancsfa hibakezelője: rögzíti a hibát, majd az alapértelmezett naplózás fut."""
+        self.metrics.command_finished(interaction, error)
+        await app_commands.CommandTree.on_error(self.tree, interaction, error)
+
+    def build_command_map(self):
+        """
+        Felépíti a parancs -> cog modul táblát a betöltött parancsfából.
+        Builds the command -> cog module map once the extensions are loaded.
+        """
+        self.command_cogs = {}
+        for command in self.tree.walk_commands():
+            if isinstance(command, app_commands.Command):
+                self.command_cogs[command.qualified_name] = self._resolve_command_cog(command)
+
+    @staticmethod
+    def _resolve_command_cog(command):
+        # A cog-ba ágyazott parancsok binding attribútuma maga a cog példány.
+        if not isinstance(command.binding, commands.Cog):
+            return None
+        return command.binding.__class__.__module__, command.binding.__class__.__name__
 
     async def is_cog_enabled(self, interaction: discord.Interaction) -> bool:
         """
         Ellenőrzi, hogy a parancsot tartalmazó cog engedélyezve van-e az adott szerveren.
         """
+        if interaction.type is discord.InteractionType.application_command:
+            self.metrics.command_started(interaction)
         if not interaction.guild:
+            # A hamis eredményre nem fut hibakezelő, ezért az elutasítást itt rögzítjük
+            self.metrics.command_check_failed(interaction)
             return False  # DM-ben érkező parancsokat nem engedélyezünk
 
-        if interaction.command is None:
+        command = interaction.command
+        if command is None:
             return True
 
         try:
-            # A parancs callback függvényének __self__ attribútuma maga a cog példány.
-            command_cog = interaction.command.callback.__self__
-        except AttributeError:
-            # Ha a parancs nincs cog-ban, akkor nincs __self__ attribútum.
+            cog_info = self.command_cogs[command.qualified_name]
+        except KeyError:
+            cog_info = self.command_cogs[command.qualified_name] = self._resolve_command_cog(command)
+
+        # Ha a parancs nincs cog-ban, nincs mit ellenőrizni.
+        if cog_info is None:
             return True
 
-        cog_qualified_name = command_cog.__class__.__name__
-        cog_module = command_cog.__class__.__module__
+        cog_module, cog_qualified_name = cog_info
 
         # A management cog mindig engedélyezett
         if cog_qualified_name == "ManagementCog":
             return True
 
-        enabled_cogs = await get_enabled_cogs(self.db_pool, interaction.guild.id)
+        enabled_cogs = await get_enabled_cog_set(self.db_pool, interaction.guild.id)
 
         if cog_module not in enabled_cogs:
+            # Autocomplete kérésre nem lehet üzenettel válaszolni, csak elutasítjuk
+            if interaction.type is discord.InteractionType.autocomplete:
+                return False
             cog_name_user_friendly = cog_qualified_name.replace("Cog", "").lower()
             await interaction.response.send_message(
                 f"Ez a funkció (`{cog_name_user_friendly}`) ezen a szerveren nincs engedélyezve. "
                 f"Egy adminisztrátor bekapcsolhatja a `/enable {cog_name_user_friendly}` paranccsal.",
                 ephemeral=True
             )
+            self.metrics.command_check_failed(interaction)
             return False
         
         return True
 
+    async def _prepare_schema(self):
+        """Lefuttatja a függő migrációkat, majd jelzi, hogy a séma használható."""
+        try:
+            if not self.apply_migrations:
+                return
+            with self.profiler.phase("migrációk"):
+                await run_migrations(self.db_pool)
+        except Exception as e:
+            logging.error(f"Hiba az adatbázis migrációk futtatásakor: {e}")
+        finally:
+            self.schema_ready.set()
+
+    async def _load_cog(self, name):
+        """
+        Betölt egy cog bővítményt, és méri a betöltését (a modul futtatása és a setup együtt).
+        A modult a load_extension maga futtatja le, ezért külön import nem történik.
+        """
+        try:
+            with self.profiler.phase(name, "cog"):
+                await self.load_extension(name)
+            logging.info(f"Sikeresen betöltve: {name}")
+        except Exception as e:
+            logging.error(f"Hiba a(z) {name} betöltésekor: {e}")
+
     async def setup_hook(self):
         """Ez a függvény lefut a bot bejelentkezése után, de a websocket csatlakozás előtt."""
-        await create_tables(self.db_pool)
-        logging.info("Adatbázis táblák ellenőrizve/létrehozva.")
+        self.host_metrics.start()
+        await self.metrics.start(self.metrics_port, self.metrics_host)
+        # A séma ellenőrzése a háttérben fut, amíg a cog-ok betöltődnek és a parancsok szinkronizálódnak
+        schema_task = asyncio.create_task(self._prepare_schema())
 
-        # Cog-ok betöltése
+        # Cog-ok betöltése sorban: a modulok futtatása szinkron, a cog_load csak háttér taskokat indít,
+        # így az egyetlen valódi átfedés a háttérben futó séma ellenőrzéssel van
         cogs_dir = "cogs"
-        for filename in os.listdir(cogs_dir):
-            if filename.endswith(".py") and not filename.startswith("__"):
-                try:
-                    await self.load_extension(f"{cogs_dir}.{filename[:-3]}")
-                    logging.info(f"Sikeresen betöltve: {filename}")
-                except Exception as e:
-                    logging.error(f"Hiba a(z) {filename} betöltésekor: {e}")
-        
-        # Parancsok globális szinkronizálása.
-        try:
-            synced = await self.tree.sync()
-            logging.info(f"{len(synced)} parancs globálisan szinkronizálva.")
-        except Exception as e:
-            logging.error(f"Hiba a parancsok szinkronizálásakor: {e}")
+        extensions = [
+            f"{cogs_dir}.{filename[:-3]}"
+            for filename in sorted(os.listdir(cogs_dir))
+            if filename.endswith(".py") and not filename.startswith("__")
+        ]
+        with self.profiler.phase("cog-ok betöltése"):
+            for name in extensions:
+                await self._load_cog(name)
+        self.build_command_map()
+
+        # Parancsok globális szinkronizálása, ha a parancsfa megváltozott.
+        if self.sync_commands:
+            try:
+                with self.profiler.phase("parancsok szinkronizálása"):
+                    await sync_if_changed(self, force=self.force_sync)
+            except Exception as e:
+                logging.error(f"Hiba a parancsok szinkronizálásakor: {e}")
+
+        await schema_task
+
+    async def close(self):
+        await super().close()
+        await self.host_metrics.stop()
+        await self.metrics.stop()
 
     async def on_ready(self):
         """Amikor a bot sikeresen csatlakozott a Discordhoz."""
-        logging.info(f"Bejelentkezve mint: {self.user.name} ({self.user.id})")
-        logging.info("A bot a következő szervereken van jelen:")
+        first_ready = self.profiler.ready_at is None
+        ready_at = self.profiler.mark_ready()
+        logging.info(f"Bejelentkezve mint: {self.user.name} ({self.user.id}), {ready_at:.2f} s az indulás óta")
+        logging.info(f"A bot {len(self.guilds)} szerveren van jelen (shardok: {sorted(self.shards)} / {self.shard_count}).")
         for guild in self.guilds:
-            logging.info(f"- {guild.name} ({guild.id})")
-            await register_guild(self.db_pool, guild.id, guild.name)
+            logging.debug(f"- {guild.name} ({guild.id})")
+
+        if first_ready:
+            self.profiler.log_report()
+
+    async def on_shard_ready(self, shard_id):
+        """Amikor egy shard csatlakozott: csak a hozzá tartozó szervereket egyezteti."""
+        guilds = [guild for guild in self.guilds if guild.shard_id == shard_id]
+        try:
+            with self.profiler.phase(f"szerverek egyeztetése (shard {shard_id})"):
+                result = await reconcile_guilds(self.db_pool, [(guild.id, guild.name) for guild in guilds])
+        except Exception as e:
+            logging.error(f"Hiba a(z) {shard_id}. shard szervereinek egyeztetésekor: {e}")
+            return
+        logging.info(
+            f"Shard {shard_id}: {len(guilds)} szerver egyeztetve {result.elapsed * 1000:.0f} ms alatt: "
+            f"{result.inserted_guilds} új, {result.renamed_guilds} átnevezett, "
+            f"{result.inserted_cogs} cog sor beszúrva ({result.rows_changed} sor változott)."
+        )
 
     async def on_guild_join(self, guild):
         """Amikor a bot csatlakozik egy új szerverhez."""
         logging.info(f"A bot csatlakozott egy új szerverhez: {guild.name} ({guild.id})")
         await register_guild(self.db_pool, guild.id, guild.name)
 
-# --- Fő Függvény ---
-async def main():
-    db_config = {
+def db_config_from_env():
+    """Az adatbázis elérési adatai a .env fájlból."""
+    return {
         'host': os.getenv("DB_HOST"),
         'user': os.getenv("DB_USER"),
         'password': os.getenv("DB_PASSWORD"),
         'database': os.getenv("DB_NAME")
     }
 
+# --- Fő Függvény ---
+async def main(shard_ids=None, shard_count=None, apply_migrations=True, sync_commands=True, metrics_port=None):
+    """
+    Elindítja a botot. Paraméterek nélkül egy folyamat kezeli az összes shardot;
+    a launcher.py workerei a saját shard tartományukkal hívják.
+    """
+    db_config = db_config_from_env()
+
     if not all(db_config.values()):
         logging.error("Adatbázis konfigurációs változók hiányoznak a .env fájlból!")
         return
 
-    db_pool = await create_pool(db_config)
+    # Indulási profilozás: STARTUP_PROFILE=1 vagy --profile-startup
+    profiler = StartupProfiler(enabled=os.getenv("STARTUP_PROFILE") == "1" or "--profile-startup" in sys.argv)
+    profiler.record("bot modulok importálása", PROCESS_START, IMPORTS_DONE - PROCESS_START, "import")
+
+    with profiler.phase("adatbázis pool"):
+        db_pool = await create_pool(db_config)
     if not db_pool:
         return
 
-    bot = MyBot(db_pool=db_pool)
+    force_sync = os.getenv("FORCE_COMMAND_SYNC") == "1" or "--force-sync" in sys.argv
+    # Prometheus végpont: METRICS_PORT (0 = kikapcsolva); a launcher workerenként saját portot ad
+    if metrics_port is None:
+        metrics_port = int(os.getenv("METRICS_PORT") or 0)
+    bot = MyBot(
+        db_pool=db_pool, force_sync=force_sync, profiler=profiler,
+        shard_ids=shard_ids, shard_count=shard_count,
+        apply_migrations=apply_migrations, sync_commands=sync_commands,
+        metrics_port=metrics_port, metrics_host=os.getenv("METRICS_HOST", "127.0.0.1"),
+    )
 
     token = os.getenv("DISCORD_BOT_TOKEN")
     if not token:
@@ -123,11 +306,13 @@ async def main():
         await db_pool.close()
         return
 
-    async with bot:
-        await bot.start(token)
-
-    await db_pool.close()
-    logging.info("Adatbázis-kapcsolat lezárva.")
+    try:
+        async with bot:
+            await bot.start(token)
+    finally:
+        # Worker leállításakor (megszakított feladat) is lezárjuk a pool kapcsolatait
+        await db_pool.close()
+        logging.info("Adatbázis-kapcsolat lezárva.")
 
 if __name__ == "__main__":
     try:
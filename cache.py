@@ -0,0 +1,176 @@
+# cache.py
+import time
+from collections import OrderedDict
+
+
+class GuildCache:
+    """
+    Szerverenkénti, memóriában tartott gyorsítótár találat/hiány számlálókkal.
+    A per-guild in-memory cache with hit/miss counters.
+
+    A gyorsítótár lustán töltődik fel: az első lekérdezés után az érték addig
+    marad meg, amíg egy író művelet frissíti vagy érvényteleníti. Minden írás
+    növeli a szerver generációszámát, így egy közben futó betöltés nem írhat
+    vissza elavult adatot (lásd set_if_current).
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self._data = {}
+        self._generations = {}
+        self.hits = 0
+        self.misses = 0
+
+    def __contains__(self, guild_id):
+        return guild_id in self._data
+
+    def __len__(self):
+        return len(self._data)
+
+    def get(self, guild_id):
+        """Visszaadja a tárolt értéket, vagy None-t, ha még nincs betöltve."""
+        value = self._data.get(guild_id)
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    def peek(self, guild_id):
+        """Mint a get(), de nem módosítja a számlálókat."""
+        return self._data.get(guild_id)
+
+    def generation(self, guild_id):
+        """Az adott szerver aktuális generációszáma (minden írásnál nő)."""
+        return self._generations.get(guild_id, 0)
+
+    def set(self, guild_id, value):
+        """Eltárol egy értéket (írási út)."""
+        self._generations[guild_id] = self.generation(guild_id) + 1
+        self._data[guild_id] = value
+
+    def set_if_current(self, guild_id, value, generation):
+        """
+        Csak akkor tárolja el a betöltött értéket, ha a betöltés óta nem volt írás.
+        Stores a freshly loaded value unless a write happened while it was loading.
+        """
+        if self.generation(guild_id) != generation:
+            return False
+        self._data[guild_id] = value
+        return True
+
+    def invalidate(self, guild_id):
+        """Eldobja a szerver bejegyzését; a következő olvasás újra betölti."""
+        self._generations[guild_id] = self.generation(guild_id) + 1
+        self._data.pop(guild_id, None)
+
+    def clear(self):
+        for guild_id in list(self._data):
+            self.invalidate(guild_id)
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "name": self.name,
+            "size": len(self._data),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / total if total else 0.0,
+        }
+
+
+class LRUCache:
+    """
+    Méretkorlátos LRU gyorsítótár opcionális lejárati idővel (TTL).
+    A bounded LRU cache with an optional time-to-live per entry.
+
+    Ha a gyorsítótár megtelik, a legrégebben használt bejegyzés esik ki. A
+    lejárt bejegyzéseket olvasáskor dobja el. A generációszámok ugyanúgy
+    működnek, mint a GuildCache esetében.
+    """
+
+    def __init__(self, name, maxsize, ttl=None):
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._generations = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def __len__(self):
+        return len(self._data)
+
+    def get(self, key):
+        """Visszaadja a tárolt értéket, vagy None-t, ha nincs meg vagy lejárt."""
+        entry = self._data.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        value, expires_at = entry
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self._data[key]
+            self.expirations += 1
+            self.misses += 1
+            return None
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def peek(self, key):
+        """Mint a get(), de nem módosítja a sorrendet és a számlálókat."""
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if expires_at is not None and expires_at <= time.monotonic():
+            return None
+        return value
+
+    def generation(self, key):
+        return self._generations.get(key, 0)
+
+    def _store(self, key, value):
+        expires_at = time.monotonic() + self.ttl if self.ttl else None
+        self._data[key] = (value, expires_at)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def set(self, key, value):
+        self._generations[key] = self.generation(key) + 1
+        self._store(key, value)
+
+    def set_if_current(self, key, value, generation):
+        if self.generation(key) != generation:
+            return False
+        self._store(key, value)
+        return True
+
+    def invalidate(self, key):
+        self._generations[key] = self.generation(key) + 1
+        self._data.pop(key, None)
+
+    def clear(self):
+        for key in list(self._data):
+            self.invalidate(key)
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "name": self.name,
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / total if total else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
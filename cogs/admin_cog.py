@@ -3,6 +3,7 @@ import discord
 from discord import app_commands
 from discord.ext import commands
 import database as db
+from post_templates import CompiledTemplate, TemplateError
 
 # Admin parancsok csoportja
 class AdminGroup(app_commands.Group):
@@ -80,6 +81,11 @@ class AdminCog(commands.Cog):
     # --- SABLONKEZELÉS ---
     @admin.command(name="template-create", description="Új poszt sablon létrehozása.")
     async def template_create(self, interaction: discord.Interaction, nev: str, cim: str, leiras: str, szin: str = '#FFFFFF', lablec: str = ''):
+        # A sablont mentés előtt lefordítjuk, így a hibás változók és színek nem kerülnek az adatbázisba
+        try:
+            CompiledTemplate(nev, cim, leiras, szin, lablec)
+        except TemplateError as e:
+            return await interaction.response.send_message(f"Érvénytelen sablon: {e}", ephemeral=True)
         await db.create_template(self.db_pool, interaction.guild.id, nev, cim, leiras, szin, lablec)
         await interaction.response.send_message(f"A(z) `{nev}` nevű sablon létrehozva.", ephemeral=True)
 
@@ -93,7 +99,7 @@ class AdminCog(commands.Cog):
 
     @admin.command(name="template-list", description="Elérhető sablonok listázása.")
     async def template_list(self, interaction: discord.Interaction):
-        templates = await db.get_templates_for_guild(self.db_pool, interaction.guild.id)
+        templates = await db.get_template_listing(self.db_pool, interaction.guild.id)
         if not templates:
             return await interaction.response.send_message("Nincsenek sablonok létrehozva.", ephemeral=True)
         
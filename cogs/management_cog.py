@@ -2,12 +2,199 @@
 import discord
 from discord.ext import commands
 from discord import app_commands
-from database import get_all_cogs, get_enabled_cogs, set_cog_enabled
+import database as db
+import db_metrics
+from database import get_all_cogs, get_enabled_cog_set, set_cog_enabled
+from name_index import NameIndex
+
+# Diagnosztikai parancsok csoportja
+class StatsGroup(app_commands.Group):
+    """
+    Futásidejű statisztikák lekérdezésére szolgáló parancsok csoportja.
+    A group of commands for reading runtime statistics.
+    """
+    pass
 
 class ManagementCog(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
         self.db_pool = bot.db_pool
+        # A kapcsolható modulok neveit egyszer olvassuk fel, az autocomplete ebből dolgozik
+        self.cog_name_index = NameIndex(
+            cog.replace("cogs.", "").replace("_cog", "") for cog in get_all_cogs() if "management" not in cog
+        )
+
+    stats = StatsGroup(name="stats", description="Futásidejű statisztikák", default_permissions=discord.Permissions(administrator=True))
+
+    @stats.command(name="cache", description="A memóriában tartott gyorsítótárak állapota.")
+    async def cache_stats(self, interaction: discord.Interaction):
+        """Shows size and hit/miss counters of the in-memory caches."""
+        embed = discord.Embed(title="Gyorsítótárak", color=discord.Color.blue())
+        caches = [db.guild_config_cache, db.enabled_cogs_cache, db.bad_word_cache, db.template_cache, db.template_name_cache, db.posted_video_cache, db.video_metadata_cache]
+        server = self.bot.get_cog("ServerCog")
+        if server is not None:
+            caches.append(server.embed_cache)
+        for cache in caches:
+            stats = cache.stats()
+            lines = [f"Méret: {stats['size']}" + (f"/{stats['maxsize']}" if "maxsize" in stats else "")]
+            lines.append(f"Találat: {stats['hits']} | Hiány: {stats['misses']} ({stats['hit_ratio']:.1%})")
+            if "evictions" in stats:
+                lines.append(f"Kiszorítva: {stats['evictions']} | Lejárt: {stats['expirations']}")
+            embed.add_field(name=stats["name"], value="\n".join(lines), inline=False)
+        youtube = self.bot.get_cog("YouTubeCog")
+        if youtube is not None:
+            stats = youtube.metadata.stats()
+            embed.add_field(
+                name="yt-dlp kinyerések",
+                value=(
+                    f"Kinyerés: {stats['extractions']} (hiba: {stats['failures']}, összevont kérés: {stats['coalesced']})\n"
+                    f"Idő: p50 {stats['extract_time']['p50']:.2f} s | max {stats['extract_time']['max']:.2f} s"
+                ),
+                inline=False
+            )
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
+    @stats.command(name="pool", description="Az adatbázis-kapcsolat gyűjtő kihasználtsága.")
+    async def pool_stats(self, interaction: discord.Interaction):
+        """Shows connection pool utilisation and acquire wait times."""
+        stats = self.db_pool.stats()
+        wait = stats["wait"]
+        embed = discord.Embed(title="Adatbázis pool", color=discord.Color.blue())
+        embed.add_field(name="Méret", value=f"{stats['size']} (min {stats['minsize']}, max {stats['maxsize']})", inline=True)
+        embed.add_field(name="Foglalt / szabad", value=f"{stats['in_use']} / {stats['free']} (csúcs: {stats['max_in_use']})", inline=True)
+        embed.add_field(name="Várakozik", value=f"{stats['waiting']} (csúcs: {stats['max_waiting']})", inline=True)
+        embed.add_field(name="Foglalások", value=f"{stats['acquires']} (időtúllépés: {stats['timeouts']})", inline=True)
+        embed.add_field(
+            name="Várakozási idő",
+            value=f"p50: {wait['p50'] * 1000:.2f} ms | p95: {wait['p95'] * 1000:.2f} ms | p99: {wait['p99'] * 1000:.2f} ms | max: {wait['max'] * 1000:.2f} ms",
+            inline=False
+        )
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
+    @stats.command(name="queries", description="Adatbázis függvények hívásszáma és késleltetése.")
+    async def query_stats(self, interaction: discord.Interaction):
+        """Shows call counts and latency percentiles per database helper."""
+        rows = db_metrics.snapshot()
+        if not rows:
+            return await interaction.response.send_message("Még nem volt mért adatbázis hívás.", ephemeral=True)
+
+        # A "cache" oszlop az SQL nélkül kiszolgált hívások száma; a percentilisek csak a valódi lekérdezésekre vonatkoznak
+        lines = [f"{'függvény':<24} {'hívás':>7} {'cache':>7} {'p50 ms':>8} {'p99 ms':>8} {'hiba':>5}"]
+        for row in rows[:20]:
+            lines.append(f"{row['name'][:24]:<24} {row['count']:>7} {row['cache_hits']:>7} {row['p50'] * 1000:>8.2f} {row['p99'] * 1000:>8.2f} {row['errors']:>5}")
+        table = "\n".join(lines)
+        await interaction.response.send_message(f"**Adatbázis hívások:**\n```\n{table}\n```", ephemeral=True)
+
+    @stats.command(name="moderation", description="A moderációs feldolgozó sor állapota.")
+    async def moderation_stats(self, interaction: discord.Interaction):
+        """Shows depth, throughput, shedding and latency of the moderation pipeline."""
+        cog = self.bot.get_cog("ModerationCog")
+        if cog is None:
+            return await interaction.response.send_message("A moderációs modul nincs betöltve.", ephemeral=True)
+
+        stats = cog.pipeline.stats()
+        wait, batch = stats["queue_wait"], stats["batch_time"]
+        dropped = ", ".join(f"{reason}: {count}" for reason, count in sorted(stats["dropped"].items())) or "0"
+        embed = discord.Embed(title="Moderációs sor", color=discord.Color.blue())
+        embed.add_field(name="Mélység", value=f"{stats['depth']}/{stats['max_size']} (csúcs: {stats['max_depth']}, szerverek: {stats['guilds']})", inline=True)
+        embed.add_field(name="Workerek", value=f"{stats['inflight']}/{stats['workers']} dolgozik (kiszervezés: {stats['offload']}, {stats['offloaded']} köteg)", inline=True)
+        embed.add_field(name="Üzenetek", value=f"Sorba állítva: {stats['enqueued']} | Feldolgozva: {stats['processed']} | Találat: {stats['violations']}", inline=False)
+        embed.add_field(name="Ledobva", value=dropped, inline=True)
+        embed.add_field(name="Kötegek", value=f"{stats['batches']} (átlag: {stats['batch_size']:.1f} üzenet, hiba: {stats['errors']})", inline=True)
+        embed.add_field(
+            name="Várakozás a sorban",
+            value=f"p50: {wait['p50'] * 1000:.2f} ms | p99: {wait['p99'] * 1000:.2f} ms | max: {wait['max'] * 1000:.2f} ms",
+            inline=False
+        )
+        embed.add_field(
+            name="Köteg feldolgozási idő",
+            value=f"p50: {batch['p50'] * 1000:.2f} ms | p99: {batch['p99'] * 1000:.2f} ms | max: {batch['max'] * 1000:.2f} ms",
+            inline=False
+        )
+        burst = cog.burst.stats()
+        embed.add_field(
+            name=f"Tömeges törlés ({burst['window']:g} s ablak)",
+            value=(
+                f"{burst['messages']} üzenet: {burst['bulk_deletes']} tömeges + {burst['single_deletes']} egyedi törlés, "
+                f"{burst['warnings']} figyelmeztetés\n"
+                f"Megtakarított API hívás: {burst['api_calls_saved']} (hiba: {burst['failures']}, folyamatban: {burst['inflight']} csatorna)"
+            ),
+            inline=False
+        )
+        mutes = cog.mute_scheduler.stats()
+        next_in = f"{mutes['next_in']:.0f} s múlva" if mutes['next_in'] is not None else "nincs"
+        embed.add_field(
+            name="Időzített némítások",
+            value=(
+                f"Ütemezve: {mutes['depth']} | Következő lejárat: {next_in} | Feloldva: {mutes['processed']} ({mutes['batches']} kötegben)\n"
+                f"Késés: p50 {mutes['lag']['p50'] * 1000:.0f} ms | p99 {mutes['lag']['p99'] * 1000:.0f} ms | újrapróbálás: {mutes['retries']}"
+            ),
+            inline=False
+        )
+        writer = cog.warning_writer.stats()
+        embed.add_field(
+            name="Figyelmeztetések írása",
+            value=(
+                f"Várakozik: {writer['pending']} | Kiírva: {writer['written']} ({writer['flushes']} kötegben) | "
+                f"Hiba: {writer['failures']} | Elveszett: {writer['dropped']}"
+            ),
+            inline=False
+        )
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
+    @stats.command(name="feeds", description="A YouTube csatorna feedek lekérésének állapota.")
+    async def feed_stats(self, interaction: discord.Interaction):
+        """Shows request, conditional-hit and latency counters of the feed poller."""
+        cog = self.bot.get_cog("YouTubeCog")
+        if cog is None:
+            return await interaction.response.send_message("A YouTube modul nincs betöltve.", ephemeral=True)
+
+        stats = cog.feeds.stats()
+        fetch, lag = stats["fetch_time"], stats["lag"]
+        next_in = f"{stats['next_in']:.0f} s múlva" if stats['next_in'] is not None else "nincs"
+        not_modified = stats['not_modified'] / stats['requests'] if stats['requests'] else 0.0
+        embed = discord.Embed(title="YouTube feedek", color=discord.Color.blue())
+        embed.add_field(name="Feedek", value=f"{stats['feeds']} (folyamatban: {stats['inflight']}, következő: {next_in})", inline=True)
+        embed.add_field(name="Kérések", value=f"{stats['requests']} (304: {stats['not_modified']}, {not_modified:.1%} | hiba: {stats['errors']})", inline=True)
+        embed.add_field(name="Új videók", value=f"{stats['new_entries']} ({stats['fetched']} letöltött feedből, {stats['bytes_read'] / 1024:.0f} KiB)", inline=False)
+        embed.add_field(
+            name="Lekérési idő",
+            value=f"p50: {fetch['p50'] * 1000:.0f} ms | p99: {fetch['p99'] * 1000:.0f} ms | max: {fetch['max'] * 1000:.0f} ms",
+            inline=False
+        )
+        embed.add_field(name="Ütemezési késés", value=f"p50: {lag['p50'] * 1000:.0f} ms | p99: {lag['p99'] * 1000:.0f} ms", inline=False)
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
+    @stats.command(name="runtime", description="Parancsok és eseménykezelők késése, hibák és az eseményhurok késése.")
+    async def runtime_stats(self, interaction: discord.Interaction):
+        """Shows event-loop lag plus per-command and per-listener latency and error counts."""
+        snapshot = self.bot.metrics.snapshot()
+        lag = snapshot["loop_lag"]
+        lines = [
+            f"**Eseményhurok késés** ({lag['count']} mérés): p50 {lag['p50'] * 1000:.1f} ms | "
+            f"p99 {lag['p99'] * 1000:.1f} ms | max {lag['max'] * 1000:.1f} ms"
+        ]
+
+        commands = snapshot["commands"]
+        if commands:
+            table = [f"{'parancs':<22} {'hívás':>6} {'p50 ms':>8} {'p99 ms':>8} {'hiba':>5} {'elut.':>5}"]
+            for row in commands[:15]:
+                table.append(
+                    f"{row['name'][:22]:<22} {row['count']:>6} {row['p50'] * 1000:>8.1f} {row['p99'] * 1000:>8.1f} "
+                    f"{row['errors']:>5} {row['rejected']:>5}"
+                )
+            lines.append("**Parancsok:**\n```\n" + "\n".join(table) + "\n```")
+
+        listeners = snapshot["listeners"]
+        if listeners:
+            table = [f"{'kezelő':<30} {'hívás':>7} {'p99 ms':>8} {'össz s':>7} {'hiba':>5}"]
+            for row in listeners[:10]:
+                table.append(
+                    f"{row['listener'][:30]:<30} {row['count']:>7} {row['p99'] * 1000:>8.1f} {row['sum']:>7.1f} {row['errors']:>5}"
+                )
+            lines.append("**Eseménykezelők** (teljes idő szerint):\n```\n" + "\n".join(table) + "\n```")
+
+        await interaction.response.send_message("\n".join(lines)[:2000], ephemeral=True)
 
     @app_commands.command(name="cogs", description="Kilistázza az elérhető funkció modulokat (cog-okat) és állapotukat.")
     @app_commands.checks.has_permissions(administrator=True)
@@ -22,7 +209,7 @@ class ManagementCog(commands.Cog):
         # A management cogot nem akarjuk a listában duplán, így kiszedjük a cogs mappából felolvasottak közül
         all_cogs = [cog for cog in all_cogs if "management" not in cog]
         
-        enabled_cogs = await get_enabled_cogs(self.db_pool, interaction.guild.id)
+        enabled_cogs = await get_enabled_cog_set(self.db_pool, interaction.guild.id)
 
         embed = discord.Embed(title="Funkció Modulok (Cogs)", description=f"A `{interaction.guild.name}` szerver beállításai.", color=discord.Color.blue())
 
@@ -79,13 +266,8 @@ class ManagementCog(commands.Cog):
         
     # --- Autocomplete funkciók ---
     async def cog_name_autocomplete(self, interaction: discord.Interaction, current: str) -> list[app_commands.Choice[str]]:
-        all_cogs = get_all_cogs()
-        # Szűrjük ki a management cogot, és csak a current-nek megfelelőeket ajánljuk fel
-        choices = [
-            app_commands.Choice(name=cog.replace("cogs.", "").replace("_cog", ""), value=cog.replace("cogs.", "").replace("_cog", ""))
-            for cog in all_cogs if "management" not in cog and current.lower() in cog.lower()
-        ]
-        return choices
+        # A management cog nincs az indexben, így csak a kapcsolható modulokat ajánljuk fel
+        return [app_commands.Choice(name=name, value=name) for name in self.cog_name_index.search(current)]
 
     @enable_cog.autocomplete("cog_name")
     async def enable_cog_autocomplete(self, interaction: discord.Interaction, current: str) -> list[app_commands.Choice[str]]:
@@ -1,78 +1,297 @@
 # cogs/moderation_cog.py
 import discord
 from discord.ext import commands
+import asyncio
 import logging
-from database import get_bad_words, get_guild_config
+import os
+import re
+import time
+from datetime import datetime, timedelta, timezone
+from database import (
+    bad_word_cache, get_bad_word_matcher, get_guild_settings, insert_warnings, get_warnings, count_warnings,
+    save_mute, save_mutes, delete_mutes, delete_expired_mutes, get_active_mutes,
+)
+from adaptive_limiter import AdaptiveLimiter
+from moderation_pipeline import BurstDeleter, ModerationPipeline
+from mute_scheduler import ExpiryScheduler
+from write_behind import WriteBehindBuffer
+
+# A figyelmeztetések kötegelt kiírása: ennyi sor vagy ennyi másodperc után
+WARNINGS_FLUSH_SIZE = int(os.getenv("WARNINGS_FLUSH_SIZE", "100"))
+WARNINGS_FLUSH_INTERVAL = float(os.getenv("WARNINGS_FLUSH_INTERVAL", "2"))
+WARNINGS_PAGE_SIZE = 10
+
+# Időtartam megadása: pl. "30m", "2h", "1d12h"
+DURATION_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400, "w": 604800}
+DURATION_PATTERN = re.compile(r"(\d+)\s*([smhdw])")
+MAX_MUTE_DURATION = 365 * 86400
+
+def parse_duration(text):
+    """Az "1d12h" alakú időtartamot másodpercekké alakítja; érvénytelen szövegre None."""
+    text = text.strip().lower()
+    parts = DURATION_PATTERN.findall(text)
+    if not parts or DURATION_PATTERN.sub("", text).strip():
+        return None
+    seconds = sum(int(amount) * DURATION_UNITS[unit] for amount, unit in parts)
+    return seconds if 0 < seconds <= MAX_MUTE_DURATION else None
+
+# Tömeges moderáció: egy parancs legfeljebb ennyi tagot érint; a folyamatjelző ennyi másodpercenként frissül
+BULK_MAX_MEMBERS = 1000
+BULK_PROGRESS_INTERVAL = 2.0
+BULK_ATTEMPTS = 3
+USER_ID_PATTERN = re.compile(r"\d{15,20}")
+
+def _utc_timestamp(value):
+    """Az adatbázis (naiv, UTC) DATETIME értékét Unix időbélyeggé alakítja."""
+    return value.replace(tzinfo=timezone.utc).timestamp()
+
+def _utc_datetime(timestamp):
+    """A Unix időbélyeget az adatbázis naiv, UTC DATETIME értékévé alakítja."""
+    return datetime.fromtimestamp(timestamp, timezone.utc).replace(tzinfo=None)
+
+def _mute_expiry(seconds):
+    """A némítás lejárata egész másodpercre kerekítve, hogy az adatbázisban tárolt érték pontosan egyezzen."""
+    return (datetime.now(timezone.utc) + timedelta(seconds=seconds)).replace(microsecond=0)
+
+class WarningsView(discord.ui.View):
+    """Lapozó gomb a /warnings listához; a következő oldal az utolsó látott warning_id előtt kezdődik."""
+    def __init__(self, cog, member, before_id):
+        super().__init__(timeout=300)
+        self.cog = cog
+        self.member = member
+        self.before_id = before_id
+
+    @discord.ui.button(label="Régebbiek", style=discord.ButtonStyle.secondary)
+    async def older(self, interaction: discord.Interaction, button: discord.ui.Button):
+        embed, view = await self.cog.warnings_page(interaction.guild, self.member, self.before_id)
+        await interaction.response.edit_message(embed=embed, view=view)
+
+# Tömeges moderációs parancsok csoportja
+class BulkGroup(discord.app_commands.Group):
+    """
+    Sok tagot egyszerre érintő moderációs parancsok csoportja.
+    A group of moderation commands acting on many members at once.
+    """
+    pass
 
 class ModerationCog(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
         self.db_pool = bot.db_pool
+        # A szűrés a gateway eseménykezelőn kívül, kötegelve fut
+        self.pipeline = ModerationPipeline(self._load_matcher, self._handle_violations)
+        # Spam hullámnál csatornánként tömeges törlés és egy összesítő figyelmeztetés
+        self.burst = BurstDeleter()
+        # A figyelmeztetések nem az interakció közben, hanem kötegelve kerülnek az adatbázisba
+        self.warning_writer = WriteBehindBuffer(
+            "warnings", self._write_warnings, max_batch=WARNINGS_FLUSH_SIZE, interval=WARNINGS_FLUSH_INTERVAL
+        )
+
+        # Az időzített némítások lejáratai egyetlen kupacos ütemezőben; a kulcs (guild_id, user_id)
+        self.mute_scheduler = ExpiryScheduler("mutes", self._expire_mutes)
+        self.mute_roles = {}
+        self._mute_loader = None
+
+    async def cog_load(self):
+        self.pipeline.start()
+        self.warning_writer.start()
+        # A némítások betöltése nem tartja fel az indulást: a séma elkészültét háttérben várja meg
+        self._mute_loader = asyncio.create_task(self._load_mutes())
+
+    async def cog_unload(self):
+        if self._mute_loader is not None:
+            self._mute_loader.cancel()
+        await self.mute_scheduler.stop()
+        await self.pipeline.stop()
+        await self.burst.flush_all()
+        await self.warning_writer.close()
+
+    async def _write_warnings(self, rows):
+        await insert_warnings(self.db_pool, rows)
+
+    async def _load_mutes(self):
+        await self.bot.schema_ready.wait()
+        try:
+            rows = await get_active_mutes(self.db_pool)
+        except Exception as e:
+            logging.error(f"Hiba az időzített némítások betöltésekor: {e}")
+            rows = []
+        loaded = 0
+        for row in rows:
+            if not self.bot.owns_guild(row['guild_id']):
+                continue
+            key = (row['guild_id'], row['user_id'])
+            self.mute_roles[key] = row['role_id']
+            self.mute_scheduler.schedule(key, _utc_timestamp(row['expires_at']))
+            loaded += 1
+        self.mute_scheduler.start()
+        logging.info(f"{loaded} időzített némítás betöltve az ütemezőbe.")
+
+    async def _expire_mutes(self, batch):
+        """Egy köteg lejárt némítás feloldása; az adatbázisból egyetlen executemany törli őket."""
+        await self.bot.wait_until_ready()
+        done, failed = [], []
+        for key, expires_at in batch:
+            guild_id, user_id = key
+            guild = self.bot.get_guild(guild_id)
+            if guild is None:
+                # A szerver nem elérhető (pl. kiesés): a rangot nem tudjuk levenni, később újrapróbáljuk
+                failed.append(key)
+                continue
+            role = guild.get_role(self.mute_roles.get(key))
+            if role is not None:
+                try:
+                    member = guild.get_member(user_id) or await guild.fetch_member(user_id)
+                    if role in member.roles:
+                        await member.remove_roles(role, reason="A némítás lejárt")
+                except discord.NotFound:
+                    # A felhasználó már nincs a szerveren
+                    pass
+                except discord.Forbidden:
+                    logging.warning(f"Nincs jogosultságom a némítás feloldására a(z) {guild.name} szerveren.")
+                except discord.HTTPException as e:
+                    logging.error(f"Hiba a(z) {user_id} felhasználó némításának feloldásakor: {e}")
+                    failed.append(key)
+                    continue
+            done.append((key, expires_at))
+        # A várakozások alatt újranémított tagok új lejáratot kaptak: azok sora és rangja marad
+        done = [(key, expires_at) for key, expires_at in done if key not in self.mute_scheduler]
+        if done:
+            await delete_expired_mutes(self.db_pool, [
+                (guild_id, user_id, _utc_datetime(expires_at)) for (guild_id, user_id), expires_at in done
+            ])
+            for key, _ in done:
+                if key not in self.mute_scheduler:
+                    self.mute_roles.pop(key, None)
+            logging.info(f"{len(done)} időzített némítás lejárt és feloldva.")
+        return failed
+
+    async def _get_mute_role(self, guild):
+        """A szerver beállított némító rangja, vagy a felhasználónak szóló hibaüzenet."""
+        config = await get_guild_settings(self.db_pool, guild.id)
+        mute_role_id = config.mute_role_id if config else None
+        if not mute_role_id:
+            return None, "Nincs beállítva némító rang a szerverhez!"
+        mute_role = guild.get_role(mute_role_id)
+        if not mute_role:
+            return None, "A beállított némító rang nem található!"
+        return mute_role, None
 
     @commands.Cog.listener()
     async def on_message(self, message):
         """Event triggered on every message for bad word filtering."""
-        if message.author.bot or not message.guild:
+        if message.author.bot or not message.guild or not message.content:
             return
 
-        bad_words = await get_bad_words(self.db_pool, message.guild.id)
-        if not bad_words:
+        # Ha a szerver keresője már betöltött és üres, a sorba sem kell tenni
+        matcher = bad_word_cache.peek(message.guild.id)
+        if matcher is not None and not matcher:
             return
 
-        if any(word in message.content.lower() for word in bad_words):
-            try:
-                await message.delete()
-                await message.channel.send(f"{message.author.mention}, a hozzászólásod tiltott szavakat tartalmazott, ezért törölve lett.", delete_after=10)
-                logging.info(f"Törölt üzenet a(z) {message.guild.name} szerveren a tiltott szó szűrő miatt.")
-            except discord.Forbidden:
-                logging.warning(f"Nincs jogosultságom üzenetet törölni a(z) {message.guild.name} szerveren.")
-            except Exception as e:
-                logging.error(f"Hiba az üzenet törlésekor: {e}")
+        self.pipeline.enqueue(message)
+
+    async def _load_matcher(self, guild_id):
+        # A kereső a memóriából jön; adatbázist csak a szerver első kötegénél érünk el
+        return await get_bad_word_matcher(self.db_pool, guild_id)
+
+    async def _handle_violations(self, guild_id, violations):
+        """Egy köteg tiltott szót tartalmazó üzenetének átadása a csatornánkénti tömeges törlőnek."""
+        # A REST hívások a törlő saját feladataiban futnak, a sor workere nem vár rájuk
+        for message, match in violations:
+            self.burst.add(message, match)
 
     @discord.app_commands.command(name="warn", description="Figyelmeztet egy felhasználót.")
     @discord.app_commands.checks.has_permissions(moderate_members=True)
     async def warn(self, interaction: discord.Interaction, user: discord.Member, reason: str):
         """Slash command to warn a user."""
-        # TODO: A figyelmeztetéseket adatbázisba menteni
+        # Az időpontot itt rögzítjük, a sor később, kötegben íródik ki
+        self.warning_writer.add((interaction.guild.id, user.id, interaction.user.id, reason[:512], datetime.now(timezone.utc).replace(tzinfo=None)))
         await interaction.response.send_message(f"{user.mention} figyelmeztetve lett. Indok: {reason}", ephemeral=True)
         try:
             await user.send(f"Figyelmeztetést kaptál a(z) **{interaction.guild.name}** szerveren. Indok: **{reason}**")
         except discord.Forbidden:
             await interaction.followup.send("A felhasználónak nem lehet privát üzenetett küldeni.", ephemeral=True)
 
-    @discord.app_commands.command(name="mute", description="Némít egy felhasználót.")
+    @discord.app_commands.command(name="warnings", description="Kilistázza egy felhasználó figyelmeztetéseit.")
     @discord.app_commands.checks.has_permissions(moderate_members=True)
-    async def mute(self, interaction: discord.Interaction, user: discord.Member, reason: str):
-        """Slash command to mute a user."""
-        config = await get_guild_config(self.db_pool, interaction.guild.id)
-        mute_role_id = config.get('mute_role_id')
+    async def warnings(self, interaction: discord.Interaction, user: discord.Member):
+        """Slash command to list a user's warnings, newest first."""
+        # Az ürítés és a lekérdezések terhelés alatt túlléphetik az interakció 3 másodperces határidejét
+        await interaction.response.defer(ephemeral=True)
+        # A még ki nem írt figyelmeztetések is látszódjanak
+        await self.warning_writer.flush()
+        embed, view = await self.warnings_page(interaction.guild, user)
+        if view:
+            await interaction.followup.send(embed=embed, view=view, ephemeral=True)
+        else:
+            await interaction.followup.send(embed=embed, ephemeral=True)
 
-        if not mute_role_id:
-            return await interaction.response.send_message("Nincs beállítva némító rang a szerverhez!", ephemeral=True)
+    async def warnings_page(self, guild, member, before_id=None):
+        """Egy oldalnyi figyelmeztetés beágyazott üzenetként, és a lapozó gomb, ha van régebbi."""
+        rows = await get_warnings(self.db_pool, guild.id, member.id, before_id, WARNINGS_PAGE_SIZE + 1)
+        has_more = len(rows) > WARNINGS_PAGE_SIZE
+        rows = rows[:WARNINGS_PAGE_SIZE]
 
-        mute_role = interaction.guild.get_role(mute_role_id)
-        if not mute_role:
-            return await interaction.response.send_message("A beállított némító rang nem található!", ephemeral=True)
+        embed = discord.Embed(title=f"{member.display_name} figyelmeztetései", color=discord.Color.orange())
+        if before_id is None:
+            embed.description = f"Összesen: {await count_warnings(self.db_pool, guild.id, member.id)}"
+        if not rows:
+            embed.description = "Nincs figyelmeztetés."
+        for row in rows:
+            created_at = discord.utils.format_dt(row['created_at'].replace(tzinfo=timezone.utc), "f")
+            embed.add_field(name=f"#{row['warning_id']} - {created_at}", value=f"{row['reason']}\nModerátor: <@{row['moderator_id']}>", inline=False)
+
+        view = WarningsView(self, member, rows[-1]['warning_id']) if has_more else None
+        return embed, view
+
+    @discord.app_commands.command(name="mute", description="Némít egy felhasználót.")
+    @discord.app_commands.checks.has_permissions(moderate_members=True)
+    @discord.app_commands.describe(duration="A némítás időtartama (pl. 30m, 2h, 1d12h). Üresen hagyva végleges.")
+    async def mute(self, interaction: discord.Interaction, user: discord.Member, reason: str, duration: str = None):
+        """Slash command to mute a user, optionally for a limited time."""
+        seconds = None
+        if duration:
+            seconds = parse_duration(duration)
+            if seconds is None:
+                return await interaction.response.send_message("Érvénytelen időtartam. Példák: `30m`, `2h`, `1d12h` (legfeljebb 365 nap).", ephemeral=True)
+
+        mute_role, error = await self._get_mute_role(interaction.guild)
+        if error:
+            return await interaction.response.send_message(error, ephemeral=True)
 
         try:
             await user.add_roles(mute_role, reason=reason)
-            await interaction.response.send_message(f"{user.mention} némítva lett. Indok: {reason}")
         except discord.Forbidden:
-            await interaction.response.send_message("Nincs jogosultságom a rangot kezelni.", ephemeral=True)
+            return await interaction.response.send_message("Nincs jogosultságom a rangot kezelni.", ephemeral=True)
+
+        key = (interaction.guild.id, user.id)
+        if seconds is None:
+            # Végleges némítás: egy korábbi időzített lejárat nem oldhatja fel
+            if self.mute_scheduler.cancel(key):
+                self.mute_roles.pop(key, None)
+                await delete_mutes(self.db_pool, [key])
+            return await interaction.response.send_message(f"{user.mention} némítva lett. Indok: {reason}")
+
+        expires_at = _mute_expiry(seconds)
+        await save_mute(self.db_pool, interaction.guild.id, user.id, mute_role.id, interaction.user.id, reason[:512], expires_at.replace(tzinfo=None))
+        self.mute_roles[key] = mute_role.id
+        self.mute_scheduler.schedule(key, expires_at.timestamp())
+        await interaction.response.send_message(
+            f"{user.mention} némítva lett {discord.utils.format_dt(expires_at, 'R')} lejárattal. Indok: {reason}"
+        )
 
     @discord.app_commands.command(name="unmute", description="Feloldja egy felhasználó némítását.")
     @discord.app_commands.checks.has_permissions(moderate_members=True)
     async def unmute(self, interaction: discord.Interaction, user: discord.Member):
         """Slash command to unmute a user."""
-        config = await get_guild_config(self.db_pool, interaction.guild.id)
-        mute_role_id = config.get('mute_role_id')
+        mute_role, error = await self._get_mute_role(interaction.guild)
+        if error:
+            return await interaction.response.send_message(error, ephemeral=True)
 
-        if not mute_role_id:
-            return await interaction.response.send_message("Nincs beállítva némító rang a szerverhez!", ephemeral=True)
-
-        mute_role = interaction.guild.get_role(mute_role_id)
-        if not mute_role:
-            return await interaction.response.send_message("A beállított némító rang nem található!", ephemeral=True)
+        key = (interaction.guild.id, user.id)
+        if self.mute_scheduler.cancel(key):
+            self.mute_roles.pop(key, None)
+            await delete_mutes(self.db_pool, [key])
 
         if mute_role in user.roles:
             try:
@@ -83,5 +302,197 @@ class ModerationCog(commands.Cog):
         else:
             await interaction.response.send_message("A felhasználó nincs némítva.", ephemeral=True)
 
+    # --- Tömeges némítás ---
+
+    bulk = BulkGroup(name="bulk", description="Tömeges moderációs parancsok", default_permissions=discord.Permissions(moderate_members=True))
+
+    async def _select_members(self, interaction, role, joined_within, user_ids, limiter):
+        """
+        A feltételeknek (rang, csatlakozás ideje, ID lista; egyszerre több is) megfelelő tagok.
+        Returns (members, error); criteria are combined with AND.
+        """
+        guild = interaction.guild
+        within = None
+        if joined_within:
+            within = parse_duration(joined_within)
+            if within is None:
+                return None, "Érvénytelen időtartam a `joined_within` paraméterben. Példák: `10m`, `2h`."
+        ids = [int(user_id) for user_id in USER_ID_PATTERN.findall(user_ids or "")]
+        if role is None and within is None and not ids:
+            return None, "Adj meg legalább egy feltételt: `role`, `joined_within` vagy `user_ids`."
+
+        if role is not None or within is not None:
+            if not self.bot.intents.members:
+                return None, "A rang és csatlakozási idő szerinti kiválasztáshoz a `MEMBERS_INTENT=1` beállítás szükséges."
+            if not guild.chunked:
+                await guild.chunk()
+
+        if ids:
+            members = []
+            for user_id in dict.fromkeys(ids):
+                member = guild.get_member(user_id)
+                if member is None:
+                    try:
+                        async with limiter.slot():
+                            member = await guild.fetch_member(user_id)
+                    except discord.HTTPException:
+                        continue
+                members.append(member)
+        else:
+            members = role.members if role is not None else guild.members
+
+        if role is not None:
+            members = [member for member in members if role in member.roles]
+        if within is not None:
+            cutoff = discord.utils.utcnow() - timedelta(seconds=within)
+            members = [member for member in members if member.joined_at and member.joined_at >= cutoff]
+
+        # Magunkat, a parancs kiadóját, a tulajdonost és a nálunk magasabb rangúakat kihagyjuk
+        me = guild.me
+        members = [
+            member for member in members
+            if member.id not in (me.id, interaction.user.id, guild.owner_id) and member.top_role < me.top_role
+        ]
+        if len(members) > BULK_MAX_MEMBERS:
+            return None, f"A feltételeknek {len(members)} tag felel meg; egyszerre legfeljebb {BULK_MAX_MEMBERS} kezelhető."
+        return members, None
+
+    async def _bulk_role_change(self, interaction, members, mute_role, add, reason, limiter):
+        """
+        A rang hozzáadása vagy elvétele sok tagon, adaptív párhuzamossággal és folyamatjelzéssel.
+        Returns the list of members that were changed successfully.
+        """
+        action = "Némítás" if add else "Némítás feloldása"
+        started = time.perf_counter()
+        changed, failed = [], []
+        progress = await interaction.followup.send(f"{action}: 0/{len(members)}...", ephemeral=True, wait=True)
+
+        async def apply(member):
+            for _ in range(BULK_ATTEMPTS):
+                try:
+                    async with limiter.slot():
+                        if add:
+                            await member.add_roles(mute_role, reason=reason)
+                        else:
+                            await member.remove_roles(mute_role, reason=reason)
+                    changed.append(member)
+                    return
+                except discord.RateLimited as e:
+                    limiter.throttle(e.retry_after)
+                except discord.HTTPException as e:
+                    if e.status != 429:
+                        break
+                    limiter.throttle(1.0)
+            failed.append(member)
+
+        async def report_progress():
+            while True:
+                await asyncio.sleep(BULK_PROGRESS_INTERVAL)
+                try:
+                    await progress.edit(content=(
+                        f"{action}: {len(changed) + len(failed)}/{len(members)} "
+                        f"(párhuzamosság: {int(limiter.limit)}, hiba: {len(failed)})..."
+                    ))
+                except discord.HTTPException:
+                    pass
+
+        reporter = asyncio.create_task(report_progress())
+        try:
+            await asyncio.gather(*(apply(member) for member in members))
+        finally:
+            reporter.cancel()
+
+        elapsed = time.perf_counter() - started
+        await progress.edit(content=(
+            f"{action} kész: {len(changed)} sikeres, {len(failed)} sikertelen, {elapsed:.1f} s alatt "
+            f"(legnagyobb párhuzamosság: {limiter.peak}, rate limit jelzés: {limiter.throttled})."
+        ))
+        logging.info(
+            f"Tömeges {action.lower()} a(z) {interaction.guild.name} szerveren: {len(changed)}/{len(members)} tag, "
+            f"{elapsed:.1f} s, rate limit jelzés: {limiter.throttled}."
+        )
+        return changed
+
+    @bulk.command(name="mute", description="Több felhasználó némítása egyszerre (rang, csatlakozási idő vagy ID lista alapján).")
+    @discord.app_commands.checks.has_permissions(moderate_members=True)
+    @discord.app_commands.describe(
+        role="Csak az ezzel a ranggal rendelkező tagok.",
+        joined_within="Csak az ennyi időn belül csatlakozott tagok (pl. 10m, 2h).",
+        user_ids="Felhasználó ID-k szóközzel vagy vesszővel elválasztva.",
+        duration="A némítás időtartama (pl. 30m, 2h). Üresen hagyva végleges.",
+    )
+    async def bulk_mute(self, interaction: discord.Interaction, reason: str, role: discord.Role = None,
+                        joined_within: str = None, user_ids: str = None, duration: str = None):
+        """Mutes every member matching the given criteria."""
+        seconds = None
+        if duration:
+            seconds = parse_duration(duration)
+            if seconds is None:
+                return await interaction.response.send_message("Érvénytelen időtartam. Példák: `30m`, `2h`, `1d12h` (legfeljebb 365 nap).", ephemeral=True)
+        mute_role, error = await self._get_mute_role(interaction.guild)
+        if error:
+            return await interaction.response.send_message(error, ephemeral=True)
+
+        await interaction.response.defer(ephemeral=True, thinking=True)
+        limiter = AdaptiveLimiter()
+        members, error = await self._select_members(interaction, role, joined_within, user_ids, limiter)
+        if error:
+            return await interaction.followup.send(error, ephemeral=True)
+        members = [member for member in members if mute_role not in member.roles]
+        if not members:
+            return await interaction.followup.send("Nincs némítandó tag.", ephemeral=True)
+
+        changed = await self._bulk_role_change(interaction, members, mute_role, True, reason, limiter)
+
+        guild_id = interaction.guild.id
+        keys = [(guild_id, member.id) for member in changed]
+        if seconds is None:
+            # Végleges némítás: a korábbi időzített lejáratok törlődnek
+            cancelled = [key for key in keys if self.mute_scheduler.cancel(key)]
+            for key in cancelled:
+                self.mute_roles.pop(key, None)
+            if cancelled:
+                await delete_mutes(self.db_pool, cancelled)
+        elif keys:
+            expires_at = _mute_expiry(seconds)
+            stored_at = expires_at.replace(tzinfo=None)
+            await save_mutes(self.db_pool, [
+                (guild_id, user_id, mute_role.id, interaction.user.id, reason[:512], stored_at) for _, user_id in keys
+            ])
+            for key in keys:
+                self.mute_roles[key] = mute_role.id
+                self.mute_scheduler.schedule(key, expires_at.timestamp())
+
+    @bulk.command(name="unmute", description="Több felhasználó némításának feloldása egyszerre.")
+    @discord.app_commands.checks.has_permissions(moderate_members=True)
+    @discord.app_commands.describe(
+        role="Csak az ezzel a ranggal rendelkező tagok.",
+        joined_within="Csak az ennyi időn belül csatlakozott tagok (pl. 10m, 2h).",
+        user_ids="Felhasználó ID-k szóközzel vagy vesszővel elválasztva.",
+    )
+    async def bulk_unmute(self, interaction: discord.Interaction, role: discord.Role = None,
+                          joined_within: str = None, user_ids: str = None):
+        """Unmutes every muted member matching the given criteria."""
+        mute_role, error = await self._get_mute_role(interaction.guild)
+        if error:
+            return await interaction.response.send_message(error, ephemeral=True)
+
+        await interaction.response.defer(ephemeral=True, thinking=True)
+        limiter = AdaptiveLimiter()
+        members, error = await self._select_members(interaction, role, joined_within, user_ids, limiter)
+        if error:
+            return await interaction.followup.send(error, ephemeral=True)
+        members = [member for member in members if mute_role in member.roles]
+        if not members:
+            return await interaction.followup.send("Nincs feloldandó némítás.", ephemeral=True)
+
+        changed = await self._bulk_role_change(interaction, members, mute_role, False, "Tömeges feloldás", limiter)
+
+        cancelled = [key for key in ((interaction.guild.id, member.id) for member in changed) if self.mute_scheduler.cancel(key)]
+        for key in cancelled:
+            self.mute_roles.pop(key, None)
+        if cancelled:
+            await delete_mutes(self.db_pool, cancelled)
+
 async def setup(bot):
     await bot.add_cog(ModerationCog(bot))
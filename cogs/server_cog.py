@@ -2,8 +2,28 @@
 import discord
 from discord.ext import commands
 from discord import app_commands
-from database import get_guild_config, update_guild_config
+from cache import LRUCache
+from database import get_guild_settings, guild_config_version, update_guild_config
 import asyncio
+import os
+
+# A kész /server embedek gyorsítótárának mérete (szerver)
+SERVER_EMBED_CACHE_SIZE = int(os.getenv("SERVER_EMBED_CACHE_SIZE", "1000"))
+# A /server rövid átlagainak ablakai (másodperc)
+HOST_AVERAGE_WINDOWS = (60, 300)
+# A guilds tábla alapértelmezett CPU/RAM értékei; ezek helyett csak a mért adatok jelennek meg
+PLACEHOLDER_VALUES = {"Placeholder CPU Info", "Placeholder RAM Info"}
+
+def _format_bytes(value):
+    """Bájtok olvasható alakban (MiB / GiB)."""
+    if value >= 1024 ** 3:
+        return f"{value / 1024 ** 3:.1f} GiB"
+    return f"{value / 1024 ** 2:.0f} MiB"
+
+def _format_averages(averages, field, fmt):
+    """Az átlagok egy mezője "1 perc: x, 5 perc: y" alakban; hiányzó adatnál üres."""
+    parts = [f"{window // 60} perc: {fmt(avg[field])}" for window, avg in averages if avg and avg[field] is not None]
+    return f" ({', '.join(parts)})" if parts else ""
 
 # --- Modals for setup ---
 class ChannelModal(discord.ui.Modal, title="Videó Csatorna Beállítása"):
@@ -89,17 +109,17 @@ class HostModal(discord.ui.Modal, title="Szerver Host Beállítása"):
         await interaction.response.send_message("Szerver hoszt sikeresen beállítva.", ephemeral=True)
 
 class CpuModal(discord.ui.Modal, title="CPU Info Beállítása"):
-    cpu = discord.ui.TextInput(label="Add meg a szerver CPU információit.")
+    cpu = discord.ui.TextInput(label="CPU leírása (a terhelést a bot méri)", required=False)
 
     async def on_submit(self, interaction: discord.Interaction):
-        await update_guild_config(interaction.client.db_pool, interaction.guild.id, "server_cpu", self.cpu.value)
+        await update_guild_config(interaction.client.db_pool, interaction.guild.id, "server_cpu", self.cpu.value or None)
         await interaction.response.send_message("CPU információk sikeresen beállítva.", ephemeral=True)
 
 class RamModal(discord.ui.Modal, title="RAM Info Beállítása"):
-    ram = discord.ui.TextInput(label="Add meg a szerver RAM információit.")
+    ram = discord.ui.TextInput(label="RAM leírása (a terhelést a bot méri)", required=False)
 
     async def on_submit(self, interaction: discord.Interaction):
-        await update_guild_config(interaction.client.db_pool, interaction.guild.id, "server_ram", self.ram.value)
+        await update_guild_config(interaction.client.db_pool, interaction.guild.id, "server_ram", self.ram.value or None)
         await interaction.response.send_message("RAM információk sikeresen beállítva.", ephemeral=True)
 
 
@@ -137,32 +157,124 @@ class ServerCog(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
         self.db_pool = bot.db_pool
-
-    @app_commands.command(name="server", description="Szerverinformációk megjelenítése.")
-    async def server(self, interaction: discord.Interaction):
-        await interaction.response.defer(ephemeral=True)
-        config = await get_guild_config(self.db_pool, interaction.guild.id)
+        # Szerverenként a kész /server embed: (verzió, embed, hivatkozott csatorna és rang ID-k, CPU/RAM címkék)
+        self.embed_cache = LRUCache("server_embed", maxsize=SERVER_EMBED_CACHE_SIZE)
+        # A Discord oldali változások (név, ikon, törölt csatorna vagy rang) szerverenkénti verziója
+        self._guild_versions = {}
+
+    def _embed_version(self, guild_id):
+        """A konfiguráció és a Discord oldali állapot együttes verziója; adatbázis hívás nélkül."""
+        return (guild_config_version(guild_id), self._guild_versions.get(guild_id, 0))
+
+    def _bump(self, guild_id):
+        self._guild_versions[guild_id] = self._guild_versions.get(guild_id, 0) + 1
+
+    def _bump_if_referenced(self, guild_id, object_id):
+        """Csak akkor avul el az embed, ha a változott csatornát vagy rangot meg is jeleníti."""
+        entry = self.embed_cache.peek(guild_id)
+        if entry is not None and object_id in entry[2]:
+            self._bump(guild_id)
+
+    @commands.Cog.listener()
+    async def on_guild_update(self, before, after):
+        if before.name != after.name or before.icon != after.icon:
+            self._bump(after.id)
+
+    # A csatorna és rang említéseket a kliens jeleníti meg, így átnevezésnél az embed nem változik, csak törlésnél
+    @commands.Cog.listener()
+    async def on_guild_channel_delete(self, channel):
+        self._bump_if_referenced(channel.guild.id, channel.id)
+
+    @commands.Cog.listener()
+    async def on_guild_role_delete(self, role):
+        self._bump_if_referenced(role.guild.id, role.id)
+
+    @commands.Cog.listener()
+    async def on_guild_remove(self, guild):
+        self.embed_cache.invalidate(guild.id)
+        self._guild_versions.pop(guild.id, None)
+
+    async def build_server_embed(self, guild):
+        """
+        Felépíti a /server embed állandó részét a konfigurációból; None, ha a szerver nincs regisztrálva.
+        Returns (embed, CPU/RAM labels); the live host load is added by with_host_metrics().
+        """
+        version = self._embed_version(guild.id)
+        config = await get_guild_settings(self.db_pool, guild.id)
         if not config:
-            return await interaction.followup.send("A szerver nincs regisztrálva az adatbázisban.", ephemeral=True)
+            return None
 
         embed = discord.Embed(
-            title=f"Szerver Információ: {interaction.guild.name}",
-            description=config.get("server_description") or "Nincs leírás beállítva.",
+            title=f"Szerver Információ: {guild.name}",
+            description=config.server_description or "Nincs leírás beállítva.",
             color=discord.Color.blue()
         )
-        embed.add_field(name="Szerver Host", value=config.get("server_host") or "Nincs beállítva", inline=True)
-        embed.add_field(name="CPU Info", value=config.get("server_cpu") or "N/A", inline=True)
-        embed.add_field(name="RAM Info", value=config.get("server_ram") or "N/A", inline=True)
+        embed.add_field(name="Szerver Host", value=config.server_host or "Nincs beállítva", inline=True)
         
-        video_channel = interaction.guild.get_channel(config.get("video_public_channel_id"))
-        mute_role = interaction.guild.get_role(config.get("mute_role_id"))
+        video_channel = guild.get_channel(config.video_public_channel_id)
+        mute_role = guild.get_role(config.mute_role_id)
         
         embed.add_field(name="Videó Csatorna", value=video_channel.mention if video_channel else "Nincs beállítva", inline=True)
         embed.add_field(name="Némító Rang", value=mute_role.mention if mute_role else "Nincs beállítva", inline=True)
         
-        embed.set_thumbnail(url=interaction.guild.icon.url if interaction.guild.icon else None)
+        embed.set_thumbnail(url=guild.icon.url if guild.icon else None)
+
+        # A kézzel megadott CPU/RAM leírás a mért értékek fölé kerül címkeként
+        labels = tuple(value if value and value not in PLACEHOLDER_VALUES else None for value in (config.server_cpu, config.server_ram))
+        # A betöltés előtti verzióval tároljuk: ha közben írás történt, a következő hívás újraépíti
+        referenced = {config.video_public_channel_id, config.mute_role_id} - {None}
+        self.embed_cache.set(guild.id, (version, embed, referenced, labels))
+        return embed, labels
+
+    def with_host_metrics(self, embed, labels):
+        """
+        Az embed másolata a gép aktuális terhelésével és rövid átlagaival.
+        Returns a copy of the cached embed with live host load read from the sampler's ring buffer.
+        """
+        embed = embed.copy()
+        metrics = self.bot.host_metrics
+        latest = metrics.latest()
+        cpu_label, ram_label = labels
+        if latest is None:
+            embed.add_field(name="CPU", value=cpu_label or "Mérés folyamatban...", inline=True)
+            embed.add_field(name="RAM", value=ram_label or "Mérés folyamatban...", inline=True)
+            return embed
+
+        averages = [(window, metrics.average(window)) for window in HOST_AVERAGE_WINDOWS]
+        percent = lambda value: f"{value:.0f}%"
+        if latest.cpu_percent is not None:
+            cpu = f"{latest.cpu_percent:.0f}%" + _format_averages(averages, "cpu_percent", percent)
+        else:
+            cpu = "N/A"
+        if latest.mem_total:
+            ram = (
+                f"{_format_bytes(latest.mem_used)} / {_format_bytes(latest.mem_total)} ({latest.mem_percent:.0f}%)"
+                + _format_averages(averages, "mem_percent", percent)
+            )
+        else:
+            ram = "N/A"
+        embed.add_field(name="CPU", value=f"{cpu_label}\n{cpu}" if cpu_label else cpu, inline=True)
+        embed.add_field(name="RAM", value=f"{ram_label}\n{ram}" if ram_label else ram, inline=True)
 
-        await interaction.followup.send(embed=embed, ephemeral=True)
+        process = [f"Memória: {_format_bytes(latest.rss)}"] if latest.rss is not None else []
+        if latest.loop_lag is not None:
+            process.append(f"Hurok késés: {latest.loop_lag * 1000:.0f} ms" + _format_averages(averages, "loop_lag", lambda value: f"{value * 1000:.0f} ms"))
+        embed.add_field(name="Bot folyamat", value="\n".join(process) or "N/A", inline=False)
+        return embed
+
+    @app_commands.command(name="server", description="Szerverinformációk megjelenítése.")
+    async def server(self, interaction: discord.Interaction):
+        # Változatlan konfigurációnál a kész embed megy ki, adatbázis hívás és halasztás nélkül
+        entry = self.embed_cache.get(interaction.guild.id)
+        if entry is not None and entry[0] == self._embed_version(interaction.guild.id):
+            embed = self.with_host_metrics(entry[1], entry[3])
+            return await interaction.response.send_message(embed=embed, ephemeral=True)
+
+        await interaction.response.defer(ephemeral=True)
+        built = await self.build_server_embed(interaction.guild)
+        if built is None:
+            return await interaction.followup.send("A szerver nincs regisztrálva az adatbázisban.", ephemeral=True)
+        await interaction.followup.send(embed=self.with_host_metrics(*built), ephemeral=True)
 
     @app_commands.command(name="setup", description="Interaktív szerverbeállítások gombokkal.")
     @app_commands.checks.has_permissions(administrator=True)
@@ -3,39 +3,166 @@ import discord
 from discord import app_commands
 from discord.ext import commands
 import database as db
+from feed_poller import FeedPoller
+from post_templates import TemplateError
+from video_metadata import VideoMetadataService
+from datetime import datetime, timezone
+import asyncio
+import logging
 import re
 
+# Egyetlen előre lefordított minta a támogatott URL formákra:
+# youtube.com/watch?v=, /shorts/, /embed/, /live/, /v/, music.youtube.com, m.youtube.com, youtube-nocookie.com és youtu.be
+YOUTUBE_ID_PATTERN = re.compile(
+    r"(?:https?://)?(?:(?:www|m|music)\.)?"
+    r"(?:youtube(?:-nocookie)?\.com/(?:watch\?(?:[^#\s&]*&)*v=|shorts/|embed/|live/|v/)|youtu\.be/)"
+    r"([\w-]{11})(?![\w-])"
+)
+
+# Csatorna ID önmagában vagy youtube.com/channel/ linkben (a @név alakú linkek feloldása API-t igényelne)
+CHANNEL_ID_PATTERN = re.compile(r"(?:(?:https?://)?(?:(?:www|m)\.)?youtube\.com/channel/)?(UC[\w-]{22})(?![\w-])")
+
 def get_youtube_id(url):
-    """Kinyeri a YouTube videó ID-t a különböző URL formátumokból."""
-    if 'youtu.be' in url:
-        return url.split('youtu.be/')[1].split('?')[0]
-    if 'youtube.com' in url:
-        match = re.search(r"v=([\w-]+)", url)
-        if match:
-            return match.group(1)
-    return None
+    """Kinyeri a YouTube videó ID-t a különböző URL formátumokból; a link körüli szöveg (pl. <...>) nem zavar."""
+    match = YOUTUBE_ID_PATTERN.search(url)
+    return match.group(1) if match else None
+
+def get_channel_id(value):
+    """Kinyeri a YouTube csatorna ID-t (UC...) a megadott ID-ból vagy csatorna linkből."""
+    match = CHANNEL_ID_PATTERN.search(value)
+    return match.group(1) if match else None
+
+def _utcnow():
+    """Az aktuális idő naiv UTC datetime-ként, az adatbázis DATETIME oszlopaihoz."""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+# Követett csatornák parancsainak csoportja
+class FollowGroup(app_commands.Group):
+    """
+    YouTube csatornák követésére szolgáló parancsok csoportja.
+    A group of commands for following YouTube channels.
+    """
+    pass
 
 class YouTubeCog(commands.Cog):
     def __init__(self, bot: commands.Bot):
         self.bot = bot
         self.db_pool = bot.db_pool
+        # A videó címe, csatornája és hossza: LRU -> adatbázis -> yt-dlp (háttérszálon)
+        self.metadata = VideoMetadataService(
+            lambda video_id: db.get_video_metadata(self.db_pool, video_id),
+            lambda metadata: db.save_video_metadata(self.db_pool, metadata),
+        )
+        # A követett csatornák új videói automatikusan kikerülnek; csatornánként {guild_id: sablon}
+        self.feeds = FeedPoller(self._post_feed_entries, self._save_feed_state)
+        self.subscriptions = {}
+        self._feed_loader = None
+
+    async def cog_load(self):
+        # A feliratkozások betöltése nem tartja fel az indulást: a séma elkészültét háttérben várja meg
+        self._feed_loader = asyncio.create_task(self._load_subscriptions())
+
+    async def cog_unload(self):
+        if self._feed_loader is not None:
+            self._feed_loader.cancel()
+        await self.feeds.stop()
+        self.metadata.close()
+
+    async def _load_subscriptions(self):
+        await self.bot.schema_ready.wait()
+        try:
+            rows = await db.get_feed_subscriptions(self.db_pool, self.bot.shard_scope)
+        except Exception as e:
+            logging.error(f"Hiba a YouTube feliratkozások betöltésekor: {e}")
+            rows = []
+        for row in rows:
+            if not self.bot.owns_guild(row['guild_id']):
+                continue
+            self.subscriptions.setdefault(row['channel_id'], {})[row['guild_id']] = row['template_name']
+            self.feeds.add(row['channel_id'], row['etag'], row['last_modified'], row['last_published'])
+        self.feeds.start()
+        logging.info(f"{len(self.feeds)} YouTube csatorna feed betöltve ({len(rows)} feliratkozás).")
+
+    async def _save_feed_state(self, state):
+        # Több worker esetén mindegyik a saját szervereit szolgálja ki, ezért az állapot is a saját tartományáé
+        await db.save_feed_state(self.db_pool, state.channel_id, self.bot.shard_scope, state.etag, state.last_modified, state.last_published)
+
+    async def _post_feed_entries(self, state, entries):
+        """Egy csatorna új videóinak posztolása minden feliratkozott szerveren."""
+        await self.bot.wait_until_ready()
+        for entry in entries:
+            try:
+                metadata = await self.metadata.get(entry.video_id)
+            except Exception as e:
+                logging.error(f"Hiba a(z) {entry.video_id} videó adatainak lekérésekor: {e}")
+                metadata = None
+            duration = metadata.duration_text if metadata else ""
+            for guild_id, template_name in list(self.subscriptions.get(state.channel_id, {}).items()):
+                await self._post_feed_entry(guild_id, template_name, entry, duration)
+
+    async def _post_feed_entry(self, guild_id, template_name, entry, duration):
+        guild_config = await db.get_guild_settings(self.db_pool, guild_id)
+        public_channel = self.bot.get_channel(guild_config.video_public_channel_id) if guild_config and guild_config.video_public_channel_id else None
+        if public_channel is None:
+            return
+        # A kézzel már posztolt videó nem kerül ki újra
+        posted = await db.get_posted_video_ids(self.db_pool, guild_id)
+        if entry.video_id in posted:
+            return
+
+        template = None
+        if template_name:
+            template = (await db.get_compiled_templates(self.db_pool, guild_id)).get(template_name.casefold())
+            if template is None or isinstance(template, TemplateError):
+                logging.warning(f"A(z) '{template_name}' sablon nem használható a(z) {guild_id} szerveren, alapértelmezett embed készül.")
+                template = None
+
+        embed = self._build_embed(
+            template, entry.video_id, title=entry.title, link=entry.link, description="",
+            author=self.bot.user.display_name, channel=entry.author, duration=duration
+        )
+        try:
+            message = await public_channel.send(embed=embed)
+        except discord.HTTPException as e:
+            logging.warning(f"A(z) {entry.video_id} videó nem posztolható a(z) {guild_id} szerveren: {e}")
+            return
+        await db.mark_video_posted(self.db_pool, guild_id, entry.video_id, message.id)
+
+    def _build_embed(self, template, video_id, *, title, link, description, author, channel, duration):
+        """A poszt embedje sablonnal vagy az alapértelmezett formában, a videó bélyegképével."""
+        if template is not None:
+            # Változók behelyettesítése
+            embed = template.render(
+                title=title, link=link, description=description, author=author,
+                channel=channel, duration=duration
+            )
+        # Alapértelmezett embed sablon nélkül
+        else:
+            embed = discord.Embed(title=title, url=link, description=description, color=discord.Color.red())
+            if channel:
+                embed.add_field(name="Csatorna", value=channel, inline=True)
+            if duration:
+                embed.add_field(name="Hossz", value=duration, inline=True)
+            embed.set_footer(text=f"Beküldte: {author}")
+
+        # Thumbnail beállítása
+        embed.set_image(url=f"https://i.ytimg.com/vi/{video_id}/hqdefault.jpg")
+        return embed
 
     # Automatikus kiegészítés a sablonokhoz
     async def template_autocomplete(self, interaction: discord.Interaction, current: str) -> list[app_commands.Choice[str]]:
-        templates = await db.get_templates_for_guild(self.db_pool, interaction.guild.id)
-        return [
-            app_commands.Choice(name=template['name'], value=template['name'])
-            for template in templates if current.lower() in template['name']
-        ][:25]
+        name_index = await db.get_template_name_index(self.db_pool, interaction.guild.id)
+        return [app_commands.Choice(name=name, value=name) for name in name_index.search(current)]
 
     @app_commands.command(name="post-video", description="Videó posztolása egyedi címmel és leírással.")
     @app_commands.checks.has_permissions(moderate_members=True)
     @app_commands.autocomplete(sablon=template_autocomplete)
-    async def post_video(self, interaction: discord.Interaction, cim: str, link: str, leiras: str = "", sablon: str = None):
+    @app_commands.describe(cim="A poszt címe; üresen hagyva a videó saját címe.", ujra="A már posztolt videó ismételt posztolása.")
+    async def post_video(self, interaction: discord.Interaction, link: str, cim: str = None, leiras: str = "", sablon: str = None, ujra: bool = False):
         await interaction.response.defer(ephemeral=True) # Gondolkodási idő kérése
 
-        guild_config = await db.get_guild_config(self.db_pool, interaction.guild.id)
-        public_channel_id = guild_config.get('video_public_channel_id')
+        guild_config = await db.get_guild_settings(self.db_pool, interaction.guild.id)
+        public_channel_id = guild_config.video_public_channel_id if guild_config else None
 
         if not public_channel_id:
             return await interaction.followup.send("Nincs beállítva publikus videó csatorna! Használd az `/admin set-channel` parancsot.")
@@ -48,42 +175,91 @@ class YouTubeCog(commands.Cog):
         if not video_id:
             return await interaction.followup.send("Érvénytelen YouTube link.")
 
-        final_embed = None
+        # Ismétlődés-ellenőrzés a memóriában tartott halmazból
+        posted = await db.get_posted_video_ids(self.db_pool, interaction.guild.id)
+        if video_id in posted and not ujra:
+            return await interaction.followup.send("Ezt a videót már posztolták ezen a szerveren. Az `ujra` opcióval mégis posztolható.")
+
+        try:
+            metadata = await self.metadata.get(video_id)
+        except Exception as e:
+            logging.error(f"Hiba a(z) {video_id} videó adatainak lekérésekor: {e}")
+            metadata = None
+
+        title = cim or (metadata.title if metadata else None)
+        if not title:
+            return await interaction.followup.send("A videó adatai nem kérhetők le; add meg a címet a `cim` paraméterben.")
+        channel = (metadata.channel or "") if metadata else ""
+        duration = metadata.duration_text if metadata else ""
 
         # Sablon használata
+        template = None
         if sablon:
-            template_data = await db.get_template_by_name(self.db_pool, interaction.guild.id, sablon)
-            if not template_data:
+            templates = await db.get_compiled_templates(self.db_pool, interaction.guild.id)
+            template = templates.get(sablon.casefold())
+            if template is None:
                 return await interaction.followup.send(f"A(z) '{sablon}' sablon nem található.")
-            
-            try:
-                # Változók behelyettesítése
-                title = template_data['embed_title'].format(title=cim, link=link, description=leiras, author=interaction.user.display_name)
-                description = template_data['embed_description'].format(title=cim, link=link, description=leiras, author=interaction.user.display_name)
-                footer = template_data['embed_footer'].format(author=interaction.user.display_name)
-                color = int(template_data['color'].replace('#', ''), 16)
-
-                final_embed = discord.Embed(title=title, description=description, color=color)
-                if footer:
-                    final_embed.set_footer(text=footer)
-
-            except KeyError as e:
-                return await interaction.followup.send(f"Hiba a sablon formázásakor: Ismeretlen változó: {e}")
-        
-        # Alapértelmezett embed sablon nélkül
-        else:
-            final_embed = discord.Embed(title=cim, url=link, description=leiras, color=discord.Color.red())
-            final_embed.set_footer(text=f"Beküldte: {interaction.user.display_name}")
+            if isinstance(template, TemplateError):
+                return await interaction.followup.send(f"Hiba a sablon formázásakor: {template}")
 
-        # Thumbnail beállítása
-        thumbnail_url = f"https://i.ytimg.com/vi/{video_id}/hqdefault.jpg"
-        final_embed.set_image(url=thumbnail_url)
+        final_embed = self._build_embed(
+            template, video_id, title=title, link=link, description=leiras,
+            author=interaction.user.display_name, channel=channel, duration=duration
+        )
 
         try:
-            await public_channel.send(embed=final_embed)
+            message = await public_channel.send(embed=final_embed)
+            await db.mark_video_posted(self.db_pool, interaction.guild.id, video_id, message.id, interaction.user.id)
             await interaction.followup.send("A videó sikeresen posztolva.")
         except discord.Forbidden:
             await interaction.followup.send("Nincs jogosultságom üzenetet küldeni a beállított videó csatornába.")
 
+    follow = FollowGroup(name="follow", description="YouTube csatornák követése", default_permissions=discord.Permissions(manage_guild=True))
+
+    @follow.command(name="add", description="Egy YouTube csatorna új videóinak automatikus posztolása.")
+    @app_commands.autocomplete(sablon=template_autocomplete)
+    @app_commands.describe(csatorna="A csatorna ID-ja (UC...) vagy youtube.com/channel/ linkje.", sablon="Az új videók posztjához használt sablon.")
+    async def follow_add(self, interaction: discord.Interaction, csatorna: str, sablon: str = None):
+        channel_id = get_channel_id(csatorna)
+        if not channel_id:
+            return await interaction.response.send_message("Érvénytelen csatorna. Add meg a csatorna ID-ját (UC...) vagy a youtube.com/channel/ linkjét.", ephemeral=True)
+        if sablon:
+            templates = await db.get_compiled_templates(self.db_pool, interaction.guild.id)
+            if sablon.casefold() not in templates:
+                return await interaction.response.send_message(f"A(z) '{sablon}' sablon nem található.", ephemeral=True)
+            # A követés a sablon tárolt nevét jegyzi meg, nem a beírt alakot
+            sablon = templates[sablon.casefold()].name
+
+        # A követés kezdete a kiindulópont: a csatorna korábbi videói nem kerülnek ki
+        await db.add_feed_subscription(self.db_pool, interaction.guild.id, channel_id, sablon, _utcnow())
+        self.subscriptions.setdefault(channel_id, {})[interaction.guild.id] = sablon
+        if channel_id not in self.feeds:
+            # Új feed: az első lekérés rövidesen, hogy a kiindulópont ETag-je is meglegyen
+            self.feeds.add(channel_id, last_published=_utcnow(), delay=5)
+        await interaction.response.send_message(f"A(z) `{channel_id}` csatorna új videói mostantól automatikusan posztolva lesznek.", ephemeral=True)
+
+    @follow.command(name="remove", description="Egy YouTube csatorna követésének megszüntetése.")
+    @app_commands.describe(csatorna="A csatorna ID-ja (UC...) vagy youtube.com/channel/ linkje.")
+    async def follow_remove(self, interaction: discord.Interaction, csatorna: str):
+        channel_id = get_channel_id(csatorna)
+        if not channel_id or not await db.remove_feed_subscription(self.db_pool, interaction.guild.id, channel_id):
+            return await interaction.response.send_message("Ezt a csatornát nem követi a szerver.", ephemeral=True)
+        guilds = self.subscriptions.get(channel_id, {})
+        guilds.pop(interaction.guild.id, None)
+        if not guilds:
+            # Ha már egy szerver sem követi, a feed lekérése is leáll
+            self.subscriptions.pop(channel_id, None)
+            self.feeds.remove(channel_id)
+        await interaction.response.send_message(f"A(z) `{channel_id}` csatorna követése megszűnt.", ephemeral=True)
+
+    @follow.command(name="list", description="A szerver által követett YouTube csatornák.")
+    async def follow_list(self, interaction: discord.Interaction):
+        rows = await db.get_guild_feed_subscriptions(self.db_pool, interaction.guild.id)
+        if not rows:
+            return await interaction.response.send_message("A szerver nem követ egyetlen csatornát sem.", ephemeral=True)
+        lines = [f"`{row['channel_id']}`" + (f" (sablon: {row['template_name']})" if row['template_name'] else "") for row in rows]
+        embed = discord.Embed(title="Követett YouTube csatornák", description="\n".join(lines)[:4096], color=discord.Color.red())
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
 async def setup(bot):
     await bot.add_cog(YouTubeCog(bot))
\ No newline at end of file
@@ -0,0 +1,73 @@
+# command_sync.py
+import hashlib
+import json
+import logging
+import os
+import time
+
+# A legutóbbi sikeres szinkronizálás lenyomatát tároló helyi fájl
+SYNC_STATE_FILE = os.getenv("COMMAND_SYNC_STATE_FILE", ".command_sync.json")
+
+
+def command_tree_hash(tree):
+    """
+    Stabil lenyomatot számol a teljes globális parancsfáról.
+    Computes a stable hash of the full global app command tree.
+
+    A Discordnak küldött payloadot (nevek, leírások, opciók, jogosultságok,
+    csoportok és alparancsaik) kulcs szerint rendezett JSON-ként hasheli.
+    """
+    payload = [command.to_dict(tree) for command in tree.get_commands()]
+    payload.sort(key=lambda command: (command.get("type", 1), command["name"]))
+    encoded = json.dumps(payload, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+def load_sync_state(path=SYNC_STATE_FILE):
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+    except (OSError, ValueError) as e:
+        logging.warning(f"A parancs szinkronizálási állapot nem olvasható ({path}): {e}")
+        return {}
+
+
+def save_sync_state(state, path=SYNC_STATE_FILE):
+    try:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(state, f)
+    except OSError as e:
+        logging.warning(f"A parancs szinkronizálási állapot nem menthető ({path}): {e}")
+
+
+async def sync_if_changed(bot, force=False, path=SYNC_STATE_FILE):
+    """
+    Csak akkor szinkronizálja a parancsokat, ha a parancsfa lenyomata megváltozott.
+    Syncs the global command tree only when its hash differs from the last successful sync.
+
+    Visszaadja a szinkronizált parancsok listáját, vagy None-t, ha a szinkronizálás kimaradt.
+    """
+    tree_hash = command_tree_hash(bot.tree)
+    state = load_sync_state(path)
+    unchanged = state.get("hash") == tree_hash and state.get("application_id") == bot.application_id
+
+    if unchanged and not force:
+        saved = state.get("sync_seconds")
+        saved_text = f" (~{saved:.2f} s megtakarítva)" if saved is not None else ""
+        logging.info(f"A parancsfa nem változott, a globális szinkronizálás kimarad{saved_text}.")
+        return None
+
+    reason = "kényszerített" if force else "a parancsfa megváltozott"
+    started = time.perf_counter()
+    synced = await bot.tree.sync()
+    elapsed = time.perf_counter() - started
+    logging.info(f"{len(synced)} parancs globálisan szinkronizálva {elapsed:.2f} s alatt ({reason}).")
+    save_sync_state({
+        "hash": tree_hash,
+        "application_id": bot.application_id,
+        "synced_at": int(time.time()),
+        "sync_seconds": elapsed,
+    }, path)
+    return synced
@@ -2,8 +2,17 @@
 import aiomysql
 import logging
 import os
+import time
+from cache import GuildCache, LRUCache
+from db_pool import InstrumentedPool, pool_settings_from_env
+from db_metrics import timed_query, TracingCursor, TracingDictCursor
+from models import GuildConfig, ReconcileResult, VideoMetadata
+from post_templates import CompiledTemplate, TemplateError
+from name_index import NameIndex
+from word_filter import BadWordMatcher
 
 # --- Tábla Létrehozó SQL Parancsok ---
+# Az alap séma; az első migráció hozza létre (lásd migrations.py).
 
 TABLES = {}
 
@@ -61,6 +70,37 @@ TABLES['bad_words'] = (
     ") ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci"
 )
 
+# --- Gyorsítótárak ---
+
+# Szerverenként a tiltott szavakból lefordított kereső; az add/remove_bad_word frissíti.
+bad_word_cache = GuildCache("bad_words")
+
+# Szerverenként az engedélyezett cog modulok halmaza; a set_cog_enabled és a register_guild frissíti.
+enabled_cogs_cache = GuildCache("enabled_cogs")
+
+# Szerverkonfigurációk méretkorlátos LRU/TTL gyorsítótára; az update_guild_config érvényteleníti.
+guild_config_cache = LRUCache(
+    "guild_config",
+    maxsize=int(os.getenv("GUILD_CONFIG_CACHE_SIZE", "10000")),
+    ttl=float(os.getenv("GUILD_CONFIG_CACHE_TTL", "300")) or None,
+)
+
+# Szerverenként a már posztolt videók ID halmaza (lusta betöltés); a mark_video_posted helyben bővíti.
+posted_video_cache = GuildCache("posted_videos")
+
+# Videó ID -> VideoMetadata; a népszerű linkek így adatbázis és yt-dlp nélkül szolgálhatók ki.
+video_metadata_cache = LRUCache(
+    "video_metadata",
+    maxsize=int(os.getenv("VIDEO_METADATA_CACHE_SIZE", "5000")),
+    ttl=None,
+)
+
+# Szerverenként a lefordított poszt sablonok (név -> CompiledTemplate); a create/delete_template frissíti.
+template_cache = GuildCache("templates")
+
+# Szerverenként a sablonnevek autocomplete indexe; a create/delete_template helyben frissíti.
+template_name_cache = GuildCache("template_names")
+
 # --- Segédfüggvények ---
 def get_all_cogs():
     """Visszaadja az összes elérhető cog nevét a cogs mappából."""
@@ -69,50 +109,77 @@ def get_all_cogs():
 
 # --- Adatbázis Kezelő Függvények ---
 
-async def create_pool(db_config):
+async def create_pool(db_config, settings=None):
     """
     Létrehozza az adatbázis-kapcsolat gyűjtőt (pool).
     Creates the database connection pool.
+
+    A méretezés (port, min/max méret, időtúllépések, újrahasznosítás) a
+    `settings` szótárból jön, ennek hiányában a környezeti változókból.
     """
+    settings = settings or pool_settings_from_env()
     try:
         pool = await aiomysql.create_pool(
             host=db_config['host'],
-            port=3306,
+            port=settings['port'],
             user=db_config['user'],
             password=db_config['password'],
             db=db_config['database'],
+            minsize=settings['minsize'],
+            maxsize=settings['maxsize'],
+            connect_timeout=settings['connect_timeout'],
+            pool_recycle=settings['pool_recycle'],
+            cursorclass=TracingCursor,
             autocommit=True
         )
-        logging.info("Adatbázis-kapcsolat gyűjtő sikeresen létrehozva.")
-        return pool
+        logging.info(
+            f"Adatbázis-kapcsolat gyűjtő sikeresen létrehozva "
+            f"(méret: {settings['minsize']}-{settings['maxsize']}, recycle: {settings['pool_recycle']} s)."
+        )
+        return InstrumentedPool(pool, acquire_timeout=settings['acquire_timeout'])
     except Exception as e:
         logging.error(f"Hiba az adatbázis-kapcsolat gyűjtő létrehozásakor: {e}")
         return None
 
-async def create_tables(pool):
-    """
-    Létrehozza a szükséges táblákat, ha még nem léteznek.
-    Creates the necessary tables if they don't exist yet.
-    """
-    async with pool.acquire() as conn:
-        async with conn.cursor() as cursor:
-            for table_name, table_sql in TABLES.items():
-                try:
-                    logging.info(f"Tábla létrehozása: {table_name}")
-                    await cursor.execute(table_sql)
-                except Exception as e:
-                    logging.error(f"Hiba a(z) {table_name} tábla létrehozásakor: {e}")
-
+@timed_query
 async def get_guild_config(pool, guild_id):
     """
     Lekéri egy adott szerver teljes konfigurációját.
     Fetches the entire configuration for a specific guild.
     """
     async with pool.acquire() as conn:
-        async with conn.cursor(aiomysql.DictCursor) as cursor:
+        async with conn.cursor(TracingDictCursor) as cursor:
             await cursor.execute("SELECT * FROM guilds WHERE guild_id = %s", (guild_id,))
             return await cursor.fetchone()
 
+@timed_query
+async def get_guild_settings(pool, guild_id):
+    """
+    Visszaadja egy szerver konfigurációját GuildConfig rekordként, gyorsítótárazva.
+    Returns a guild's configuration as a cached GuildConfig record (None if not registered).
+    """
+    config = guild_config_cache.get(guild_id)
+    if config is None:
+        generation = guild_config_cache.generation(guild_id)
+        async with pool.acquire() as conn:
+            async with conn.cursor() as cursor:
+                columns = ", ".join(f"`{column}`" for column in GuildConfig.COLUMNS)
+                await cursor.execute(f"SELECT {columns} FROM guilds WHERE guild_id = %s", (guild_id,))
+                row = await cursor.fetchone()
+        if row is None:
+            return None
+        config = GuildConfig(*row)
+        guild_config_cache.set_if_current(guild_id, config, generation)
+    return config
+
+def guild_config_version(guild_id):
+    """
+    A szerver konfigurációjának verziója: minden konfigurációs írásnál (update_guild_config) nő.
+    Returns a per-guild config version that changes on every config write; no database access.
+    """
+    return guild_config_cache.generation(guild_id)
+
+@timed_query
 async def register_guild(pool, guild_id, guild_name):
     """
     Regisztrál egy új szervert az adatbázisban, és alapértelmezetten engedélyezi az összes cog-ot.
@@ -135,9 +202,84 @@ async def register_guild(pool, guild_id, guild_name):
                         "INSERT INTO enabled_cogs (guild_id, cog_name) VALUES (%s, %s)",
                         (guild_id, cog_name)
                     )
+                enabled_cogs_cache.set(guild_id, frozenset(all_cogs))
                 logging.info(f"Alapértelmezett cog-ok engedélyezve a(z) {guild_name} szerverre.")
 
 
+# Ennyi szerver ID kerül egy `IN (...)` listába az egyeztetés beolvasásakor
+RECONCILE_CHUNK_SIZE = 1000
+
+@timed_query
+async def reconcile_guilds(pool, guilds):
+    """
+    Egyezteti a gateway által látott szervereket az adatbázissal egyetlen tranzakcióban.
+    Reconciles the gateway's guild list with the database in a single transaction.
+
+    Csak a kapott szervereket olvassa be (`WHERE guild_id IN (...)`, darabokban),
+    így egy shard egyeztetése nem olvassa végig a teljes táblát. Ezután
+    executemany-vel beszúrja a hiányzókat (az alapértelmezett cog-okkal együtt),
+    és frissíti a megváltozott neveket. A `guilds` (guild_id, guild_name) párok
+    iterálható gyűjteménye.
+    """
+    started = time.perf_counter()
+    guilds = list(guilds)
+    guild_ids = [guild_id for guild_id, _ in guilds]
+    async with pool.acquire() as conn:
+        async with conn.cursor() as cursor:
+            known = {}
+            for offset in range(0, len(guild_ids), RECONCILE_CHUNK_SIZE):
+                chunk = guild_ids[offset:offset + RECONCILE_CHUNK_SIZE]
+                placeholders = ", ".join(["%s"] * len(chunk))
+                await cursor.execute(
+                    f"SELECT guild_id, guild_name FROM guilds WHERE guild_id IN ({placeholders})",
+                    chunk
+                )
+                known.update((row[0], row[1]) for row in await cursor.fetchall())
+
+            new_guilds = []
+            renamed = []
+            for guild_id, guild_name in guilds:
+                if guild_id not in known:
+                    new_guilds.append((guild_id, guild_name))
+                elif known[guild_id] != guild_name:
+                    renamed.append((guild_name, guild_id))
+
+            all_cogs = get_all_cogs()
+            cog_rows = [(guild_id, cog_name) for guild_id, _ in new_guilds for cog_name in all_cogs]
+
+            if new_guilds or renamed:
+                await conn.begin()
+                try:
+                    if new_guilds:
+                        await cursor.executemany(
+                            "INSERT INTO guilds (guild_id, guild_name) VALUES (%s, %s) ON DUPLICATE KEY UPDATE guild_name=VALUES(guild_name)",
+                            new_guilds
+                        )
+                        await cursor.executemany(
+                            "INSERT INTO enabled_cogs (guild_id, cog_name) VALUES (%s, %s) ON DUPLICATE KEY UPDATE cog_name=cog_name",
+                            cog_rows
+                        )
+                    if renamed:
+                        await cursor.executemany("UPDATE guilds SET guild_name = %s WHERE guild_id = %s", renamed)
+                    await conn.commit()
+                except Exception:
+                    await conn.rollback()
+                    raise
+
+    for guild_id, _ in new_guilds:
+        enabled_cogs_cache.set(guild_id, frozenset(all_cogs))
+    for _, guild_id in renamed:
+        guild_config_cache.invalidate(guild_id)
+
+    return ReconcileResult(
+        known=len(known),
+        inserted_guilds=len(new_guilds),
+        renamed_guilds=len(renamed),
+        inserted_cogs=len(cog_rows),
+        elapsed=time.perf_counter() - started,
+    )
+
+@timed_query
 async def get_enabled_cogs(pool, guild_id):
     """Lekéri egy szerver engedélyezett cog-jainak listáját."""
     async with pool.acquire() as conn:
@@ -146,6 +288,20 @@ async def get_enabled_cogs(pool, guild_id):
             rows = await cursor.fetchall()
             return [row[0] for row in rows]
 
+@timed_query
+async def get_enabled_cog_set(pool, guild_id):
+    """
+    Visszaadja egy szerver engedélyezett cog-jainak halmazát a gyorsítótárból.
+    Returns the guild's enabled cog set, loading it on first access.
+    """
+    enabled = enabled_cogs_cache.get(guild_id)
+    if enabled is None:
+        generation = enabled_cogs_cache.generation(guild_id)
+        enabled = frozenset(await get_enabled_cogs(pool, guild_id))
+        enabled_cogs_cache.set_if_current(guild_id, enabled, generation)
+    return enabled
+
+@timed_query
 async def set_cog_enabled(pool, guild_id, cog_name, is_enabled):
     """Engedélyez vagy letilt egy cog-ot egy szerveren."""
     async with pool.acquire() as conn:
@@ -154,8 +310,15 @@ async def set_cog_enabled(pool, guild_id, cog_name, is_enabled):
                 await cursor.execute("INSERT INTO enabled_cogs (guild_id, cog_name) VALUES (%s, %s) ON DUPLICATE KEY UPDATE cog_name=cog_name", (guild_id, cog_name))
             else:
                 await cursor.execute("DELETE FROM enabled_cogs WHERE guild_id = %s AND cog_name = %s", (guild_id, cog_name))
-            return cursor.rowcount > 0
+            changed = cursor.rowcount > 0
+    enabled = enabled_cogs_cache.peek(guild_id)
+    if enabled is not None:
+        enabled_cogs_cache.set(guild_id, enabled | {cog_name} if is_enabled else enabled - {cog_name})
+    else:
+        enabled_cogs_cache.invalidate(guild_id)
+    return changed
 
+@timed_query
 async def get_bad_words(pool, guild_id):
     """
     Lekéri egy szerver tiltott szavait.
@@ -167,6 +330,20 @@ async def get_bad_words(pool, guild_id):
             rows = await cursor.fetchall()
             return [row[0] for row in rows]
 
+@timed_query
+async def get_bad_word_matcher(pool, guild_id):
+    """
+    Visszaadja egy szerver tiltott szavaiból lefordított keresőt a gyorsítótárból.
+    Returns the guild's compiled bad word matcher, loading it on first access.
+    """
+    matcher = bad_word_cache.get(guild_id)
+    if matcher is None:
+        generation = bad_word_cache.generation(guild_id)
+        matcher = BadWordMatcher(await get_bad_words(pool, guild_id))
+        bad_word_cache.set_if_current(guild_id, matcher, generation)
+    return matcher
+
+@timed_query
 async def add_bad_word(pool, guild_id, word):
     """
     Hozzáad egy szót a tiltólistához.
@@ -175,8 +352,16 @@ async def add_bad_word(pool, guild_id, word):
     async with pool.acquire() as conn:
         async with conn.cursor() as cursor:
             await cursor.execute("INSERT INTO bad_words (guild_id, word) VALUES (%s, %s) ON DUPLICATE KEY UPDATE word=word", (guild_id, word))
-            return cursor.rowcount > 0
+            added = cursor.rowcount > 0
+    # Write-through: a betöltött keresőt azonnal frissítjük, a többit csak érvénytelenítjük
+    matcher = bad_word_cache.peek(guild_id)
+    if matcher is not None:
+        bad_word_cache.set(guild_id, BadWordMatcher(matcher.words | {word.lower()}))
+    else:
+        bad_word_cache.invalidate(guild_id)
+    return added
 
+@timed_query
 async def remove_bad_word(pool, guild_id, word):
     """
     Eltávolít egy szót a tiltólistáról.
@@ -185,8 +370,16 @@ async def remove_bad_word(pool, guild_id, word):
     async with pool.acquire() as conn:
         async with conn.cursor() as cursor:
             await cursor.execute("DELETE FROM bad_words WHERE guild_id = %s AND word = %s", (guild_id, word))
-            return cursor.rowcount > 0
+            removed = cursor.rowcount > 0
+    # Write-through: a betöltött keresőt azonnal frissítjük, a többit csak érvénytelenítjük
+    matcher = bad_word_cache.peek(guild_id)
+    if matcher is not None:
+        bad_word_cache.set(guild_id, BadWordMatcher(matcher.words - {word.lower()}))
+    else:
+        bad_word_cache.invalidate(guild_id)
+    return removed
 
+@timed_query
 async def update_guild_config(pool, guild_id, key, value):
     """
     Frissíti egy szerver egy adott konfigurációs értékét.
@@ -204,11 +397,13 @@ async def update_guild_config(pool, guild_id, key, value):
             try:
                 query = f"UPDATE guilds SET `{key}` = %s WHERE guild_id = %s"
                 await cursor.execute(query, (value, guild_id))
+                guild_config_cache.invalidate(guild_id)
                 logging.info(f"Successfully updated config for guild {guild_id}: key='{key}'")
             except Exception as e:
                 logging.error(f"Failed to update config for guild {guild_id}: {e}")
                 raise
 
+@timed_query
 async def create_template(pool, guild_id, name, title, description, color, footer):
     """
     Létrehoz egy új poszt sablont.
@@ -220,27 +415,95 @@ async def create_template(pool, guild_id, name, title, description, color, foote
                 "INSERT INTO post_templates (guild_id, name, embed_title, embed_description, color, embed_footer) VALUES (%s, %s, %s, %s, %s, %s)",
                 (guild_id, name, title, description, color, footer)
             )
+    templates = template_cache.peek(guild_id)
+    if templates is not None:
+        try:
+            compiled = CompiledTemplate(name, title, description, color, footer)
+        except TemplateError as e:
+            e.name = name
+            compiled = e
+        template_cache.set(guild_id, {**templates, name.casefold(): compiled})
+    else:
+        template_cache.invalidate(guild_id)
+    name_index = template_name_cache.peek(guild_id)
+    if name_index is not None:
+        name_index.add(name)
+    else:
+        template_name_cache.invalidate(guild_id)
 
+@timed_query
 async def get_template_by_name(pool, guild_id, name):
     """
     Lekér egy sablont a neve alapján.
     Fetches a template by its name.
     """
     async with pool.acquire() as conn:
-        async with conn.cursor(aiomysql.DictCursor) as cursor:
+        async with conn.cursor(TracingDictCursor) as cursor:
             await cursor.execute("SELECT * FROM post_templates WHERE guild_id = %s AND name = %s", (guild_id, name))
             return await cursor.fetchone()
 
+@timed_query
 async def get_templates_for_guild(pool, guild_id):
     """
     Lekéri egy szerver összes sablonját.
     Fetches all templates for a guild.
     """
     async with pool.acquire() as conn:
-        async with conn.cursor(aiomysql.DictCursor) as cursor:
+        async with conn.cursor(TracingDictCursor) as cursor:
             await cursor.execute("SELECT * FROM post_templates WHERE guild_id = %s ORDER BY name", (guild_id,))
             return await cursor.fetchall()
 
+@timed_query
+async def get_compiled_templates(pool, guild_id):
+    """
+    Visszaadja egy szerver lefordított sablonjait (name.casefold() -> CompiledTemplate) a gyorsítótárból.
+    Returns the guild's compiled templates, loading and compiling them on first access.
+
+    A kulcs a kisbetűsített név, mert a `name` oszlop kis- és nagybetű
+    érzéketlen (utf8mb4_unicode_ci): a hívók `sablon.casefold()`-dal keresnek,
+    a megjelenített név a sablon `name` attribútuma. A validáció előtt mentett,
+    hibás sablonok helyén a TemplateError példány áll (szintén `name`-mel),
+    hogy a hívó az okát is jelezni tudja.
+    """
+    templates = template_cache.get(guild_id)
+    if templates is None:
+        generation = template_cache.generation(guild_id)
+        templates = {}
+        for row in await get_templates_for_guild(pool, guild_id):
+            try:
+                templates[row['name'].casefold()] = CompiledTemplate.from_row(row)
+            except TemplateError as e:
+                logging.warning(f"Hibás sablon a(z) {guild_id} szerveren ({row['name']}): {e}")
+                e.name = row['name']
+                templates[row['name'].casefold()] = e
+        template_cache.set_if_current(guild_id, templates, generation)
+    return templates
+
+@timed_query
+async def get_template_name_index(pool, guild_id):
+    """
+    Visszaadja egy szerver sablonneveinek autocomplete indexét a gyorsítótárból.
+    Returns the guild's template name index; built from the compiled template cache.
+    """
+    name_index = template_name_cache.get(guild_id)
+    if name_index is None:
+        generation = template_name_cache.generation(guild_id)
+        name_index = NameIndex(template.name for template in (await get_compiled_templates(pool, guild_id)).values())
+        template_name_cache.set_if_current(guild_id, name_index, generation)
+    return name_index
+
+@timed_query
+async def get_template_listing(pool, guild_id):
+    """
+    Lekéri egy szerver sablonjainak nevét és címét név szerint rendezve.
+    Fetches template names and titles; served entirely by the idx_templates_listing index.
+    """
+    async with pool.acquire() as conn:
+        async with conn.cursor(TracingDictCursor) as cursor:
+            await cursor.execute("SELECT name, embed_title FROM post_templates WHERE guild_id = %s ORDER BY name", (guild_id,))
+            return await cursor.fetchall()
+
+@timed_query
 async def delete_template(pool, guild_id, name):
     """
     Töröl egy sablont.
@@ -249,4 +512,254 @@ async def delete_template(pool, guild_id, name):
     async with pool.acquire() as conn:
         async with conn.cursor() as cursor:
             await cursor.execute("DELETE FROM post_templates WHERE guild_id = %s AND name = %s", (guild_id, name))
-            return cursor.rowcount > 0
\ No newline at end of file
+            deleted = cursor.rowcount > 0
+    # A név oszlop kis- és nagybetű érzéketlen, így a törölt sor neve eltérhet a megadottól:
+    # a szerver gyorsítótárait újratöltésre jelöljük, a törlés ritka
+    if deleted:
+        template_cache.invalidate(guild_id)
+        template_name_cache.invalidate(guild_id)
+    return deleted
+
+@timed_query
+async def insert_warnings(pool, rows):
+    """
+    Egy kötegnyi figyelmeztetés beszúrása egyetlen executemany hívással.
+    Inserts a batch of (guild_id, user_id, moderator_id, reason, created_at) rows.
+    """
+    async with pool.acquire() as conn:
+        async with conn.cursor() as cursor:
+            await cursor.executemany(
+                "INSERT INTO warnings (guild_id, user_id, moderator_id, reason, created_at) VALUES (%s, %s, %s, %s, %s)",
+                rows
+            )
+
+@timed_query
+async def get_warnings(pool, guild_id, user_id, before_id=None, limit=10):
+    """
+    Egy tag figyelmeztetései a legújabbtól visszafelé, keyset lapozással.
+    Fetches a member's warnings newest first; `before_id` is the last warning_id of the previous page.
+
+    A lekérdezést teljes egészében az idx_warnings_member index szolgálja ki,
+    OFFSET nélkül, így a régebbi oldalak is ugyanolyan gyorsak.
+    """
+    query = "SELECT warning_id, moderator_id, reason, created_at FROM warnings WHERE guild_id = %s AND user_id = %s"
+    args = [guild_id, user_id]
+    if before_id is not None:
+        query += " AND warning_id < %s"
+        args.append(before_id)
+    query += " ORDER BY warning_id DESC LIMIT %s"
+    args.append(limit)
+    async with pool.acquire() as conn:
+        async with conn.cursor(TracingDictCursor) as cursor:
+            await cursor.execute(query, args)
+            return await cursor.fetchall()
+
+@timed_query
+async def count_warnings(pool, guild_id, user_id):
+    """Egy tag figyelmeztetéseinek száma (az idx_warnings_member indexből)."""
+    async with pool.acquire() as conn:
+        async with conn.cursor() as cursor:
+            await cursor.execute("SELECT COUNT(*) FROM warnings WHERE guild_id = %s AND user_id = %s", (guild_id, user_id))
+            return (await cursor.fetchone())[0]
+
+@timed_query
+async def save_mute(pool, guild_id, user_id, role_id, moderator_id, reason, expires_at):
+    """
+    Elment (vagy felülír) egy időzített némítást.
+    Stores a timed mute; an existing mute of the same member is replaced.
+    """
+    async with pool.acquire() as conn:
+        async with conn.cursor() as cursor:
+            await cursor.execute(
+                "INSERT INTO mutes (guild_id, user_id, role_id, moderator_id, reason, expires_at) VALUES (%s, %s, %s, %s, %s, %s) "
+                "ON DUPLICATE KEY UPDATE role_id=VALUES(role_id), moderator_id=VALUES(moderator_id), reason=VALUES(reason), expires_at=VALUES(expires_at)",
+                (guild_id, user_id, role_id, moderator_id, reason, expires_at)
+            )
+
+@timed_query
+async def save_mutes(pool, rows):
+    """
+    Több időzített némítás mentése egyetlen executemany hívással.
+    Stores (guild_id, user_id, role_id, moderator_id, reason, expires_at) rows in one batch.
+    """
+    async with pool.acquire() as conn:
+        async with conn.cursor() as cursor:
+            await cursor.executemany(
+                "INSERT INTO mutes (guild_id, user_id, role_id, moderator_id, reason, expires_at) VALUES (%s, %s, %s, %s, %s, %s) "
+                "ON DUPLICATE KEY UPDATE role_id=VALUES(role_id), moderator_id=VALUES(moderator_id), reason=VALUES(reason), expires_at=VALUES(expires_at)",
+                rows
+            )
+
+@timed_query
+async def delete_mutes(pool, keys):
+    """Törli a megadott (guild_id, user_id) párok némításait egyetlen executemany hívással."""
+    async with pool.acquire() as conn:
+        async with conn.cursor() as cursor:
+            await cursor.executemany("DELETE FROM mutes WHERE guild_id = %s AND user_id = %s", keys)
+
+@timed_query
+async def delete_expired_mutes(pool, rows):
+    """
+    Törli a lejárt némításokat; a (guild_id, user_id, expires_at) sor csak akkor törlődik, ha közben nem kapott későbbi lejáratot.
+    Deletes expired mutes, keeping rows that were rescheduled to a later expiry meanwhile.
+    """
+    async with pool.acquire() as conn:
+        async with conn.cursor() as cursor:
+            await cursor.executemany("DELETE FROM mutes WHERE guild_id = %s AND user_id = %s AND expires_at <= %s", rows)
+
+@timed_query
+async def get_active_mutes(pool):
+    """
+    Az összes tárolt időzített némítás (a lejártakat is beleértve) az ütemező feltöltéséhez.
+    Fetches every stored timed mute, including already expired ones.
+    """
+    async with pool.acquire() as conn:
+        async with conn.cursor(TracingDictCursor) as cursor:
+            await cursor.execute("SELECT guild_id, user_id, role_id, expires_at FROM mutes")
+            return await cursor.fetchall()
+
+@timed_query
+async def get_video_metadata(pool, video_id):
+    """
+    Egy videó tárolt adatai a gyorsítótárból vagy az adatbázisból (None, ha még nincs lekérve).
+    Returns stored metadata of a video, or None if it was never extracted.
+    """
+    metadata = video_metadata_cache.get(video_id)
+    if metadata is None:
+        generation = video_metadata_cache.generation(video_id)
+        async with pool.acquire() as conn:
+            async with conn.cursor() as cursor:
+                await cursor.execute("SELECT video_id, title, channel, duration FROM video_metadata WHERE video_id = %s", (video_id,))
+                row = await cursor.fetchone()
+        if row is None:
+            return None
+        metadata = VideoMetadata(*row)
+        video_metadata_cache.set_if_current(video_id, metadata, generation)
+    return metadata
+
+@timed_query
+async def save_video_metadata(pool, metadata):
+    """Elmenti egy videó kinyert adatait, és a gyorsítótárba is beteszi."""
+    async with pool.acquire() as conn:
+        async with conn.cursor() as cursor:
+            await cursor.execute(
+                "INSERT INTO video_metadata (video_id, title, channel, duration) VALUES (%s, %s, %s, %s) "
+                "ON DUPLICATE KEY UPDATE title=VALUES(title), channel=VALUES(channel), duration=VALUES(duration), fetched_at=CURRENT_TIMESTAMP",
+                (metadata.video_id, metadata.title[:512], metadata.channel[:255] if metadata.channel else None, metadata.duration)
+            )
+    video_metadata_cache.set(metadata.video_id, metadata)
+
+@timed_query
+async def get_posted_video_ids(pool, guild_id):
+    """
+    Visszaadja egy szerveren már posztolt videók ID halmazát a gyorsítótárból.
+    Returns the set of video IDs already posted in the guild, loading it on first access.
+
+    A halmaz első használatkor egyetlen lekérdezéssel töltődik be, utána az
+    ismétlődés-ellenőrzés csak memóriában fut.
+    """
+    posted = posted_video_cache.get(guild_id)
+    if posted is None:
+        generation = posted_video_cache.generation(guild_id)
+        async with pool.acquire() as conn:
+            async with conn.cursor() as cursor:
+                await cursor.execute("SELECT video_id FROM posted_videos WHERE guild_id = %s", (guild_id,))
+                posted = {row[0] for row in await cursor.fetchall()}
+        posted_video_cache.set_if_current(guild_id, posted, generation)
+    return posted
+
+@timed_query
+async def mark_video_posted(pool, guild_id, video_id, message_id=None, posted_by=None):
+    """Rögzíti, hogy a videó posztolva lett a szerveren (újraposztolásnál frissíti az adatokat)."""
+    async with pool.acquire() as conn:
+        async with conn.cursor() as cursor:
+            await cursor.execute(
+                "INSERT INTO posted_videos (guild_id, video_id, message_id, posted_by) VALUES (%s, %s, %s, %s) "
+                "ON DUPLICATE KEY UPDATE message_id=VALUES(message_id), posted_by=VALUES(posted_by), posted_at=CURRENT_TIMESTAMP",
+                (guild_id, video_id, message_id, posted_by)
+            )
+    # Write-through: a betöltött halmazt helyben bővítjük. Ha még nincs betöltve, a generációt
+    # léptetjük, így egy közben futó, az INSERT előtt olvasó betöltés nem írhat vissza elavult halmazt
+    posted = posted_video_cache.peek(guild_id)
+    if posted is not None:
+        posted.add(video_id)
+    else:
+        posted_video_cache.invalidate(guild_id)
+
+@timed_query
+async def get_feed_subscriptions(pool, owner):
+    """
+    Az összes YouTube feliratkozás az `owner` (shard tartomány) feed állapotával együtt a feed lekérő feltöltéséhez.
+    Fetches every subscription joined with the conditional-request state `owner` keeps for its feed.
+
+    Ha a tartománynak még nincs állapota (pl. megváltozott a workerek száma),
+    nincs ETag, a kiindulópont pedig a többi tartomány legrégebbi haladása,
+    ennek hiányában a követés kezdete; így videó nem marad ki, a már
+    posztoltakat pedig a posted_videos tábla szűri.
+    """
+    async with pool.acquire() as conn:
+        async with conn.cursor(TracingDictCursor) as cursor:
+            await cursor.execute(
+                "SELECT s.guild_id, s.channel_id, s.template_name, st.etag, st.last_modified, "
+                "COALESCE(st.last_published, "
+                "  (SELECT MIN(o.last_published) FROM youtube_feed_state o WHERE o.channel_id = s.channel_id), "
+                "  f.last_published) AS last_published "
+                "FROM youtube_subscriptions s JOIN youtube_feeds f ON f.channel_id = s.channel_id "
+                "LEFT JOIN youtube_feed_state st ON st.channel_id = s.channel_id AND st.owner = %s",
+                (owner,)
+            )
+            return await cursor.fetchall()
+
+@timed_query
+async def get_guild_feed_subscriptions(pool, guild_id):
+    """Egy szerver YouTube feliratkozásai csatorna szerint rendezve."""
+    async with pool.acquire() as conn:
+        async with conn.cursor(TracingDictCursor) as cursor:
+            await cursor.execute(
+                "SELECT channel_id, template_name, created_at FROM youtube_subscriptions WHERE guild_id = %s ORDER BY channel_id",
+                (guild_id,)
+            )
+            return await cursor.fetchall()
+
+@timed_query
+async def add_feed_subscription(pool, guild_id, channel_id, template_name=None, last_published=None):
+    """
+    Feliratkoztatja a szervert egy YouTube csatornára (meglévőnél a sablont frissíti).
+    Subscribes a guild to a channel feed; `last_published` seeds the state of a feed nobody followed yet.
+    """
+    async with pool.acquire() as conn:
+        async with conn.cursor() as cursor:
+            await cursor.execute(
+                "INSERT IGNORE INTO youtube_feeds (channel_id, last_published) VALUES (%s, %s)",
+                (channel_id, last_published)
+            )
+            await cursor.execute(
+                "INSERT INTO youtube_subscriptions (guild_id, channel_id, template_name) VALUES (%s, %s, %s) "
+                "ON DUPLICATE KEY UPDATE template_name=VALUES(template_name)",
+                (guild_id, channel_id, template_name)
+            )
+
+@timed_query
+async def remove_feed_subscription(pool, guild_id, channel_id):
+    """Törli a feliratkozást; igazat ad vissza, ha volt ilyen. A feed állapota megmarad."""
+    async with pool.acquire() as conn:
+        async with conn.cursor() as cursor:
+            await cursor.execute(
+                "DELETE FROM youtube_subscriptions WHERE guild_id = %s AND channel_id = %s",
+                (guild_id, channel_id)
+            )
+            return cursor.rowcount > 0
+
+@timed_query
+async def save_feed_state(pool, channel_id, owner, etag, last_modified, last_published):
+    """
+    Elmenti egy feed feltételes kéréshez szükséges állapotát és a legutóbb látott videó idejét.
+    Stores the polling state of a feed for one owner (shard range); other workers' state is left untouched.
+    """
+    async with pool.acquire() as conn:
+        async with conn.cursor() as cursor:
+            await cursor.execute(
+                "INSERT INTO youtube_feed_state (channel_id, owner, etag, last_modified, last_published) VALUES (%s, %s, %s, %s, %s) "
+                "ON DUPLICATE KEY UPDATE etag=VALUES(etag), last_modified=VALUES(last_modified), last_published=VALUES(last_published)",
+                (channel_id, owner, etag, last_modified, last_published)
+            )
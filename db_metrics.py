@@ -0,0 +1,120 @@
+# db_metrics.py
+import functools
+import logging
+import os
+import time
+from collections import Counter
+from contextvars import ContextVar
+import aiomysql
+from metrics import Histogram
+
+# Ennél lassabb adatbázis hívásokat a lefuttatott SQL utasításokkal együtt naplózzuk
+SLOW_QUERY_THRESHOLD = float(os.getenv("DB_SLOW_QUERY_MS", "200")) / 1000
+
+# Függvénynév -> késleltetési hisztogram, hibaszám, illetve SQL nélkül (pl. gyorsítótárból) kiszolgált hívások száma
+query_stats = {}
+query_errors = Counter()
+cache_hits = Counter()
+
+# Az éppen futó, mért hívás alatt végrehajtott (sql, paraméterek, idő) hármasok
+_statements = ContextVar("db_statements", default=None)
+
+
+# Egy lassú hívásnál legfeljebb ennyi utasítást naplózunk
+MAX_LOGGED_STATEMENTS = 10
+
+
+def _truncate(text, limit=300):
+    return text if len(text) <= limit else text[:limit] + "..."
+
+
+def timed_query(func):
+    """
+    Dekorátor, amely méri egy adatbázis függvény hívásainak számát és idejét.
+    Decorator recording call count and latency of an async database helper.
+
+    Ha a hívás lassabb a küszöbnél (DB_SLOW_QUERY_MS), a közben lefuttatott
+    utasításokat és paramétereiket is naplózza. Egymásba ágyazott mért
+    függvényeknél a belső hívás a külső utasításlistájába ír, így a külső
+    napló is tartalmazza azokat. Az SQL utasítás nélkül (gyorsítótárból)
+    kiszolgált hívások nem kerülnek a hisztogramba, csak a cache_hits
+    számlálóba, hogy ne húzzák le a lekérdezések percentiliseit.
+    """
+    name = func.__name__
+    histogram = query_stats.setdefault(name, Histogram())
+
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        statements = _statements.get()
+        token = None
+        if statements is None:
+            statements = []
+            token = _statements.set(statements)
+        first = len(statements)
+        started = time.perf_counter()
+        failed = False
+        try:
+            return await func(*args, **kwargs)
+        except Exception:
+            failed = True
+            query_errors[name] += 1
+            raise
+        finally:
+            elapsed = time.perf_counter() - started
+            if token is not None:
+                _statements.reset(token)
+            own = statements[first:]
+            if not own and not failed:
+                cache_hits[name] += 1
+            else:
+                histogram.observe(elapsed)
+                if elapsed >= SLOW_QUERY_THRESHOLD:
+                    _log_slow_call(name, elapsed, own)
+
+    return wrapper
+
+
+def _log_slow_call(name, elapsed, statements):
+    # A függvény teljes ideje és az SQL idők különbsége a pool várakozás és az event loop terhelése
+    sql_time = sum(statement_elapsed for _, _, statement_elapsed in statements)
+    lines = [f"Lassú adatbázis hívás: {name} {elapsed * 1000:.1f} ms (ebből SQL: {sql_time * 1000:.1f} ms)"]
+    for query, args, statement_elapsed in statements[:MAX_LOGGED_STATEMENTS]:
+        lines.append(f"  {statement_elapsed * 1000:.1f} ms: {_truncate(query)} -- {_truncate(repr(args))}")
+    if len(statements) > MAX_LOGGED_STATEMENTS:
+        lines.append(f"  ... és még {len(statements) - MAX_LOGGED_STATEMENTS} utasítás")
+    logging.warning("\n".join(lines))
+
+
+class TracingCursor(aiomysql.Cursor):
+    """
+    Kurzor, amely rögzíti a végrehajtott utasításokat az aktuális mért híváshoz.
+    A cursor that records executed statements for the enclosing timed_query call.
+
+    Az executemany az aiomysql-ben execute hívásokra bomlik, így azokat is rögzíti.
+    """
+
+    async def execute(self, query, args=None):
+        statements = _statements.get()
+        if statements is None:
+            return await super().execute(query, args)
+        started = time.perf_counter()
+        try:
+            return await super().execute(query, args)
+        finally:
+            statements.append((query, args, time.perf_counter() - started))
+
+
+class TracingDictCursor(TracingCursor, aiomysql.DictCursor):
+    """A TracingCursor dict sorokat visszaadó változata."""
+    pass
+
+
+def snapshot():
+    """Függvényenkénti statisztikák a legtöbbet hívottal kezdve."""
+    rows = []
+    for name, histogram in query_stats.items():
+        if not histogram.count and not cache_hits[name]:
+            continue
+        rows.append({"name": name, "errors": query_errors[name], "cache_hits": cache_hits[name], **histogram.snapshot()})
+    rows.sort(key=lambda row: row["count"] + row["cache_hits"], reverse=True)
+    return rows
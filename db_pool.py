@@ -0,0 +1,118 @@
+# db_pool.py
+import asyncio
+import os
+import time
+from metrics import Histogram
+
+
+def pool_settings_from_env():
+    """
+    Beolvassa a kapcsolat gyűjtő méretezését a környezeti változókból.
+    Reads the connection pool tuning from the environment.
+    """
+    return {
+        'port': int(os.getenv("DB_PORT", "3306")),
+        'minsize': int(os.getenv("DB_POOL_MINSIZE", "1")),
+        'maxsize': int(os.getenv("DB_POOL_MAXSIZE", "10")),
+        'connect_timeout': float(os.getenv("DB_CONNECT_TIMEOUT", "10")),
+        'pool_recycle': int(os.getenv("DB_POOL_RECYCLE", "3600")),
+        'acquire_timeout': float(os.getenv("DB_ACQUIRE_TIMEOUT", "10")) or None,
+    }
+
+
+class _AcquireContext:
+    """Az `async with pool.acquire() as conn:` formát kiszolgáló kontextuskezelő."""
+    __slots__ = ("_pool", "_conn")
+
+    def __init__(self, pool):
+        self._pool = pool
+        self._conn = None
+
+    async def __aenter__(self):
+        self._conn = await self._pool._acquire()
+        return self._conn
+
+    async def __aexit__(self, exc_type, exc, tb):
+        conn, self._conn = self._conn, None
+        await self._pool.release(conn)
+
+
+class InstrumentedPool:
+    """
+    Az aiomysql pool köré épülő réteg, amely méri a kapcsolatra várakozás idejét.
+    A wrapper around the aiomysql pool that measures how long coroutines wait in acquire().
+
+    Ugyanúgy használható, mint az eredeti pool (`async with pool.acquire() as conn`),
+    de számolja a várakozási időket, az időtúllépéseket és a foglalt kapcsolatokat.
+    """
+
+    def __init__(self, pool, acquire_timeout=None):
+        self._pool = pool
+        self.acquire_timeout = acquire_timeout
+        self.wait_times = Histogram()
+        self.acquires = 0
+        self.timeouts = 0
+        self.waiting = 0
+        self.max_waiting = 0
+        self.in_use = 0
+        self.max_in_use = 0
+
+    def acquire(self):
+        return _AcquireContext(self)
+
+    async def _acquire(self):
+        started = time.perf_counter()
+        self.waiting += 1
+        self.max_waiting = max(self.max_waiting, self.waiting)
+        try:
+            conn = await asyncio.wait_for(self._pool.acquire(), self.acquire_timeout)
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            raise
+        finally:
+            self.waiting -= 1
+        self.wait_times.observe(time.perf_counter() - started)
+        self.acquires += 1
+        self.in_use += 1
+        self.max_in_use = max(self.max_in_use, self.in_use)
+        return conn
+
+    async def release(self, conn):
+        self.in_use -= 1
+        await self._pool.release(conn)
+
+    @property
+    def minsize(self):
+        return self._pool.minsize
+
+    @property
+    def maxsize(self):
+        return self._pool.maxsize
+
+    @property
+    def size(self):
+        return self._pool.size
+
+    @property
+    def freesize(self):
+        return self._pool.freesize
+
+    async def close(self):
+        """Lezárja a poolt, és megvárja, amíg minden kapcsolat visszakerül."""
+        self._pool.close()
+        await self._pool.wait_closed()
+
+    def stats(self):
+        return {
+            "minsize": self.minsize,
+            "maxsize": self.maxsize,
+            "size": self.size,
+            "free": self.freesize,
+            "in_use": self.in_use,
+            "max_in_use": self.max_in_use,
+            "waiting": self.waiting,
+            "max_waiting": self.max_waiting,
+            "acquires": self.acquires,
+            "timeouts": self.timeouts,
+            "wait": self.wait_times.snapshot(),
+        }
@@ -0,0 +1,319 @@
+# feed_poller.py
+import asyncio
+import heapq
+import itertools
+import logging
+import os
+import random
+import time
+from datetime import datetime, timezone
+from typing import NamedTuple
+from urllib.parse import quote
+from xml.etree.ElementTree import XMLPullParser
+import aiohttp
+from metrics import Histogram
+
+# A csatorna feed címe; helyi teszt szerverhez átírható (a {channel_id} helyére kerül az ID)
+FEED_URL = os.getenv("YOUTUBE_FEED_URL", "https://www.youtube.com/feeds/videos.xml?channel_id={channel_id}")
+# Feedenkénti lekérési időköz (másodperc) és annak véletlen szórása (arány)
+FEED_INTERVAL = float(os.getenv("YOUTUBE_FEED_INTERVAL", "900"))
+FEED_JITTER = float(os.getenv("YOUTUBE_FEED_JITTER", "0.2"))
+# Egyszerre futó lekérések száma és egy lekérés időkorlátja (másodperc)
+FEED_CONCURRENCY = int(os.getenv("YOUTUBE_FEED_CONCURRENCY", "8"))
+FEED_TIMEOUT = float(os.getenv("YOUTUBE_FEED_TIMEOUT", "15"))
+# Hibás feed esetén a várakozás legfeljebb eddig nő (másodperc)
+MAX_BACKOFF = 6 * 3600
+CHUNK_SIZE = 16 * 1024
+
+ATOM = "{http://www.w3.org/2005/Atom}"
+YT = "{http://www.youtube.com/xml/schemas/2015}"
+
+
+class FeedEntry(NamedTuple):
+    """
+    Egy videó a csatorna feedjéből; a published naiv UTC idő.
+    A single upload from a channel feed; `published` is a naive UTC datetime.
+    """
+    video_id: str
+    title: str
+    author: str
+    published: datetime
+    link: str
+
+
+def parse_published(text):
+    """Az Atom időbélyeget (pl. 2024-05-01T12:00:00+00:00) naiv UTC datetime-má alakítja."""
+    value = datetime.fromisoformat(text.strip())
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+class FeedParser:
+    """
+    Darabonként etetett Atom feed feldolgozó.
+    An incremental Atom feed parser fed with response chunks.
+
+    Az elemek már a letöltés közben elkészülnek, így a hívó a régi videók
+    elérésekor a választ végig sem olvassa. A feldolgozott elemek törlődnek.
+    """
+
+    def __init__(self):
+        self._parser = XMLPullParser(events=("end",))
+
+    def feed(self, data):
+        """Feldolgozza a darabot, és visszaadja az abban lezárult bejegyzéseket."""
+        self._parser.feed(data)
+        entries = []
+        for _, element in self._parser.read_events():
+            if element.tag != f"{ATOM}entry":
+                continue
+            entry = self._entry(element)
+            element.clear()
+            if entry is not None:
+                entries.append(entry)
+        return entries
+
+    def close(self):
+        """Lezárja a feldolgozást; csonka dokumentumnál ParseError-t dob."""
+        self._parser.close()
+
+    @staticmethod
+    def _entry(element):
+        video_id = element.findtext(f"{YT}videoId")
+        published = element.findtext(f"{ATOM}published")
+        if not video_id or not published:
+            return None
+        link = element.find(f"{ATOM}link")
+        return FeedEntry(
+            video_id=video_id,
+            title=element.findtext(f"{ATOM}title") or video_id,
+            author=element.findtext(f"{ATOM}author/{ATOM}name") or "",
+            published=parse_published(published),
+            link=link.get("href") if link is not None else f"https://www.youtube.com/watch?v={video_id}",
+        )
+
+
+class FeedState:
+    """
+    Egy feed lekérési állapota: a feltételes kérés fejlécei és a legutóbb látott videó ideje.
+    Per-feed polling state: conditional-request validators and the newest seen upload.
+    """
+    __slots__ = ("channel_id", "etag", "last_modified", "last_published", "failures", "next_poll")
+
+    def __init__(self, channel_id, etag=None, last_modified=None, last_published=None):
+        self.channel_id = channel_id
+        self.etag = etag
+        self.last_modified = last_modified
+        self.last_published = last_published
+        self.failures = 0
+        self.next_poll = 0.0
+
+
+class FeedPoller:
+    """
+    YouTube csatorna feedek háttérben futó, korlátozott párhuzamosságú lekérője.
+    A background poller for YouTube channel feeds with bounded concurrency and conditional requests.
+
+    A feedek egyetlen kupacban, véletlen szórású időpontokra ütemezve várnak,
+    így sok feed sem egyszerre kerül sorra. A lekérések egy közös HTTP
+    munkameneten, legfeljebb `concurrency` párhuzamos kéréssel, ETag /
+    If-Modified-Since fejlécekkel futnak; változatlan feednél (304) nincs
+    feldolgozás. Az új videók a `handler(state, entries)` hívásba kerülnek
+    (a legrégebbi elöl), a frissült állapot a `saver(state)` hívásba. Hiba
+    esetén a feed ritkábban, legfeljebb MAX_BACKOFF időközzel kerül sorra.
+    """
+
+    def __init__(self, handler, saver, *, url=FEED_URL, interval=FEED_INTERVAL, jitter=FEED_JITTER,
+                 concurrency=FEED_CONCURRENCY, timeout=FEED_TIMEOUT):
+        self.handler = handler
+        self.saver = saver
+        self.url = url
+        self.interval = interval
+        self.jitter = jitter
+        self.timeout = timeout
+        self._feeds = {}
+        self._heap = []
+        self._counter = itertools.count()
+        self._changed = asyncio.Event()
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._polls = set()
+        self._session = None
+        self._task = None
+
+        # Metrikák
+        self.requests = 0
+        self.not_modified = 0
+        self.fetched = 0
+        self.new_entries = 0
+        self.errors = 0
+        self.bytes_read = 0
+        self.fetch_time = Histogram()
+        self.lag = Histogram()
+
+    def __len__(self):
+        return len(self._feeds)
+
+    def __contains__(self, channel_id):
+        return channel_id in self._feeds
+
+    def start(self):
+        if self._task is None:
+            self._session = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=self.timeout))
+            self._task = asyncio.create_task(self._run(), name="feed-poller")
+
+    async def stop(self):
+        tasks = list(self._polls)
+        if self._task is not None:
+            tasks.append(self._task)
+            self._task = None
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    def add(self, channel_id, etag=None, last_modified=None, last_published=None, delay=None):
+        """
+        Felveszi a feedet; az első lekérés alapértelmezetten az időközön belül véletlenszerűen történik.
+        Returns the existing state if the feed is already polled.
+        """
+        state = self._feeds.get(channel_id)
+        if state is None:
+            state = self._feeds[channel_id] = FeedState(channel_id, etag, last_modified, last_published)
+            # Újraindításkor a feedek szétszórva kerülnek sorra, nem egyszerre
+            self._schedule(state, random.uniform(0, self.interval) if delay is None else delay)
+        return state
+
+    def remove(self, channel_id):
+        """Törli a feedet; a kupac bejegyzése a kivételkor esik ki."""
+        return self._feeds.pop(channel_id, None) is not None
+
+    def _schedule(self, state, delay):
+        state.next_poll = time.monotonic() + delay
+        heapq.heappush(self._heap, (state.next_poll, next(self._counter), state.channel_id))
+        if self._heap[0][2] == state.channel_id:
+            self._changed.set()
+
+    def _next_delay(self, state):
+        delay = self.interval
+        if state.failures:
+            delay = min(MAX_BACKOFF, self.interval * 2 ** min(state.failures, 16))
+        return delay * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+    def _pop_due(self, now):
+        heap = self._heap
+        while heap:
+            due, _, channel_id = heap[0]
+            state = self._feeds.get(channel_id)
+            if state is None or state.next_poll != due:
+                heapq.heappop(heap)
+                continue
+            if due > now:
+                return None, due
+            heapq.heappop(heap)
+            return state, due
+        return None, None
+
+    async def _run(self):
+        while True:
+            state, due = self._pop_due(time.monotonic())
+            if state is None:
+                self._changed.clear()
+                delay = None if due is None else due - time.monotonic()
+                try:
+                    await asyncio.wait_for(self._changed.wait(), delay)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            # A szemafor itt, a feladat indítása előtt foglalódik: sok esedékes feed sem indít sok várakozó feladatot
+            await self._semaphore.acquire()
+            self.lag.observe(max(0.0, time.monotonic() - due))
+            task = asyncio.create_task(self._poll(state), name=f"feed-{state.channel_id}")
+            self._polls.add(task)
+            task.add_done_callback(self._polls.discard)
+
+    async def _poll(self, state):
+        started = time.perf_counter()
+        try:
+            await self.poll(state)
+            state.failures = 0
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self.errors += 1
+            state.failures += 1
+            logging.warning(f"A(z) {state.channel_id} YouTube feed lekérése sikertelen ({state.failures}. alkalom): {type(e).__name__}: {e}")
+        finally:
+            self._semaphore.release()
+            self.fetch_time.observe(time.perf_counter() - started)
+        # Ha közben leiratkoztak róla, nem kerül vissza a kupacba
+        if self._feeds.get(state.channel_id) is state:
+            self._schedule(state, self._next_delay(state))
+
+    async def poll(self, state):
+        """Egy feed lekérése és az új videók átadása; visszaadja az új bejegyzéseket."""
+        headers = {}
+        if state.etag:
+            headers["If-None-Match"] = state.etag
+        if state.last_modified:
+            headers["If-Modified-Since"] = state.last_modified
+
+        self.requests += 1
+        async with self._session.get(self.url.format(channel_id=quote(state.channel_id)), headers=headers) as response:
+            if response.status == 304:
+                self.not_modified += 1
+                return []
+            response.raise_for_status()
+            entries = await self._read_new_entries(response, state.last_published)
+            etag = response.headers.get("ETag")
+            last_modified = response.headers.get("Last-Modified")
+        self.fetched += 1
+
+        entries.sort(key=lambda entry: entry.published)
+        if state.last_published is None:
+            # Először látott feed: csak a kiindulópontot rögzítjük, a régi videók nem kerülnek ki
+            newest = entries[-1].published if entries else datetime.now(timezone.utc).replace(tzinfo=None)
+            entries = []
+        else:
+            newest = entries[-1].published if entries else state.last_published
+        if entries:
+            # Ha a kezelő hibát dob, az állapot nem frissül, és a következő kör újra megpróbálja
+            await self.handler(state, entries)
+            self.new_entries += len(entries)
+
+        if (etag, last_modified, newest) != (state.etag, state.last_modified, state.last_published):
+            state.etag, state.last_modified, state.last_published = etag, last_modified, newest
+            await self.saver(state)
+        return entries
+
+    async def _read_new_entries(self, response, last_published):
+        parser = FeedParser()
+        entries = []
+        async for chunk in response.content.iter_chunked(CHUNK_SIZE):
+            self.bytes_read += len(chunk)
+            for entry in parser.feed(chunk):
+                # A feed a legújabb videóval kezdődik: az első már látott videónál a többit nem kell beolvasni
+                if last_published is not None and entry.published <= last_published:
+                    return entries
+                entries.append(entry)
+        # Csonka válasznál ParseError: az állapot nem frissül, a feed később újra sorra kerül
+        parser.close()
+        return entries
+
+    def stats(self):
+        due = self._heap[0][0] - time.monotonic() if self._heap else None
+        return {
+            "feeds": len(self._feeds),
+            "inflight": len(self._polls),
+            "next_in": due,
+            "requests": self.requests,
+            "not_modified": self.not_modified,
+            "fetched": self.fetched,
+            "new_entries": self.new_entries,
+            "errors": self.errors,
+            "bytes_read": self.bytes_read,
+            "fetch_time": self.fetch_time.snapshot(),
+            "lag": self.lag.snapshot(),
+        }
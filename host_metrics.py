@@ -0,0 +1,175 @@
+# host_metrics.py
+import asyncio
+import logging
+import os
+import time
+from collections import deque
+from itertools import islice
+from typing import NamedTuple, Optional
+
+# Mintavételi időköz (másodperc) és a gyűrűpufferben tartott minták száma (alapból 1 óra)
+HOST_METRICS_INTERVAL = float(os.getenv("HOST_METRICS_INTERVAL", "5"))
+HOST_METRICS_SAMPLES = int(os.getenv("HOST_METRICS_SAMPLES", "720"))
+
+PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+class HostSample(NamedTuple):
+    """
+    Egy mintavétel: a gép CPU és memória terhelése, valamint a bot folyamat állapota.
+    A single sample of host CPU and memory load plus the bot process' own state.
+
+    A /proc nélküli rendszereken (nem Linux) a gépre vonatkozó mezők None értékűek,
+    a hurok késése pedig akkor, ha még nincs mérés.
+    """
+    timestamp: float
+    cpu_percent: Optional[float]
+    mem_used: Optional[int]
+    mem_total: Optional[int]
+    rss: Optional[int]
+    loop_lag: Optional[float]
+
+    @property
+    def mem_percent(self):
+        return 100.0 * self.mem_used / self.mem_total if self.mem_total else None
+
+
+class ProcReader:
+    """
+    A /proc fájlok olvasója: a fájlok nyitva maradnak, mintánként csak egy seek és read történik.
+    Reads /proc files kept open between samples; each sample is a seek and a short read.
+    """
+
+    def __init__(self, root="/proc"):
+        # Puffer nélkül: a pufferelt seek(0) a régi tartalmat adná vissza újraolvasás helyett
+        self._stat = open(f"{root}/stat", "rb", buffering=0)
+        self._meminfo = open(f"{root}/meminfo", "rb", buffering=0)
+        self._statm = open(f"{root}/self/statm", "rb", buffering=0)
+        self._cpu_times = None
+
+    @staticmethod
+    def _read(handle, size=4096):
+        handle.seek(0)
+        return handle.read(size)
+
+    def cpu_percent(self):
+        """A teljes gép CPU kihasználtsága az előző hívás óta (százalék); az első híváskor None."""
+        # Az első sor: cpu user nice system idle iowait irq softirq steal ...
+        fields = self._read(self._stat, 512).split(b"\n", 1)[0].split()[1:9]
+        times = [int(value) for value in fields]
+        idle = times[3] + times[4]
+        total = sum(times)
+        previous, self._cpu_times = self._cpu_times, (idle, total)
+        if previous is None or total == previous[1]:
+            return None
+        return 100.0 * (1.0 - (idle - previous[0]) / (total - previous[1]))
+
+    def memory(self):
+        """A gép (használt, összes) memóriája bájtban; a használt a MemTotal - MemAvailable."""
+        total = available = None
+        for line in self._read(self._meminfo, 1024).split(b"\n"):
+            if line.startswith(b"MemTotal:"):
+                total = int(line.split()[1]) * 1024
+            elif line.startswith(b"MemAvailable:"):
+                available = int(line.split()[1]) * 1024
+            if total is not None and available is not None:
+                return total - available, total
+        return None, total
+
+    def rss(self):
+        """A bot folyamat rezidens memóriája bájtban."""
+        return int(self._read(self._statm, 256).split()[1]) * PAGE_SIZE
+
+    def close(self):
+        for handle in (self._stat, self._meminfo, self._statm):
+            handle.close()
+
+
+class HostMetrics:
+    """
+    Háttérben futó mintavételező a gép és a bot folyamat terheléséről, gyűrűpufferrel.
+    A background sampler of host and process load kept in a fixed-size ring buffer.
+
+    `interval` másodpercenként egy mintát vesz a /proc fájlokból, és a legutóbbi
+    `size` mintát tartja meg. Az eseményhurok késését nem méri maga: a
+    `loop_lag` hívható a meglévő mérés (RuntimeMetrics) legutóbbi értékét adja,
+    így a /server és a /stats runtime ugyanazt a számot mutatja. A lekérdezések
+    (latest, average) csak a pufferből dolgoznak, mintavétel nélkül.
+    """
+
+    def __init__(self, *, loop_lag=None, interval=HOST_METRICS_INTERVAL, size=HOST_METRICS_SAMPLES, proc_root="/proc"):
+        self._loop_lag = loop_lag
+        self.interval = interval
+        self.samples = deque(maxlen=size)
+        try:
+            self._reader = ProcReader(proc_root)
+        except OSError:
+            logging.warning("A /proc nem olvasható, a gép terhelése nem lesz mérve (csak az eseményhurok késése).")
+            self._reader = None
+        self._task = None
+
+    def start(self):
+        if self._task is None:
+            if self._reader is not None:
+                # Az első CPU mintához kell egy kiinduló állapot
+                self._reader.cpu_percent()
+            self._task = asyncio.create_task(self._run(), name="host-metrics")
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        if self._reader is not None:
+            self._reader.close()
+            self._reader = None
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                self.samples.append(self.sample(self._loop_lag() if self._loop_lag else None))
+            except Exception as e:
+                logging.error(f"Hiba a gép terhelésének mérésekor: {e}")
+
+    def sample(self, loop_lag=None):
+        """Egy minta felvétele a /proc fájlokból."""
+        reader = self._reader
+        if reader is None:
+            return HostSample(time.time(), None, None, None, None, loop_lag)
+        mem_used, mem_total = reader.memory()
+        return HostSample(time.time(), reader.cpu_percent(), mem_used, mem_total, reader.rss(), loop_lag)
+
+    def latest(self):
+        """A legutóbbi minta, vagy None, ha még nincs."""
+        return self.samples[-1] if self.samples else None
+
+    def average(self, window):
+        """
+        Az utolsó `window` másodperc mintáinak átlaga mezőnként (None, ha nincs adat).
+        Averages the samples of the last `window` seconds per field.
+        """
+        if not self.samples:
+            return None
+        since = self.samples[-1].timestamp - window
+        count = max(1, int(window / self.interval))
+        sums, counts = {}, {}
+        for sample in islice(reversed(self.samples), count):
+            if sample.timestamp < since:
+                break
+            for field in ("cpu_percent", "mem_percent", "rss", "loop_lag"):
+                value = getattr(sample, field)
+                if value is not None:
+                    sums[field] = sums.get(field, 0.0) + value
+                    counts[field] = counts.get(field, 0) + 1
+        return {field: sums[field] / counts[field] if counts.get(field) else None
+                for field in ("cpu_percent", "mem_percent", "rss", "loop_lag")}
+
+    def stats(self):
+        latest = self.latest()
+        return {
+            "interval": self.interval,
+            "samples": len(self.samples),
+            "capacity": self.samples.maxlen,
+            "latest": latest._asdict() if latest else None,
+        }
@@ -0,0 +1,226 @@
+# launcher.py
+# Több folyamatos indítás: a shardokat összefüggő tartományokban osztja szét
+# worker folyamatok között, és újraindítja a leállt workereket.
+import asyncio
+import logging
+import multiprocessing
+import os
+import signal
+import time
+import discord
+from dotenv import load_dotenv
+
+# Discord korlát: shardonként (max_concurrency csoportonként) ennyi másodpercenként egy IDENTIFY
+IDENTIFY_INTERVAL = 5.0
+# Újraindítási késleltetés: exponenciálisan nő a RESTART_MAX_DELAY felső korlátig
+RESTART_BASE_DELAY = 1.0
+RESTART_MAX_DELAY = 60.0
+# Ennyi ideig futó worker összeomlása után a késleltetés újra az alapértékről indul
+STABLE_AFTER = 300.0
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - [%(processName)s] %(message)s')
+load_dotenv()
+
+
+def shard_ranges(shard_count, worker_count):
+    """
+    A shardokat összefüggő, közel egyenlő tartományokra osztja.
+    Splits shard ids 0..shard_count-1 into contiguous, near-equal ranges.
+    """
+    worker_count = max(1, min(worker_count, shard_count))
+    size, extra = divmod(shard_count, worker_count)
+    ranges = []
+    start = 0
+    for index in range(worker_count):
+        end = start + size + (1 if index < extra else 0)
+        ranges.append(list(range(start, end)))
+        start = end
+    return ranges
+
+
+async def fetch_gateway_info(token):
+    """A Discord által javasolt shardszám és az egyszerre indítható shardok száma (GET /gateway/bot)."""
+    http = discord.http.HTTPClient(asyncio.get_running_loop())
+    try:
+        await http.static_login(token)
+        shards, _, session_start_limit = await http.get_bot_gateway()
+    finally:
+        await http.close()
+    return shards, session_start_limit.get("max_concurrency", 1)
+
+
+async def prepare_database():
+    """A sémamigrációk egyszeri lefuttatása a workerek indítása előtt, egy kapcsolatos poolon."""
+    from bot import db_config_from_env
+    from database import create_pool
+    from db_pool import pool_settings_from_env
+    from migrations import run_migrations
+
+    db_config = db_config_from_env()
+    if not all(db_config.values()):
+        logging.error("Adatbázis konfigurációs változók hiányoznak a .env fájlból!")
+        return False
+    settings = dict(pool_settings_from_env(), minsize=1, maxsize=1)
+    db_pool = await create_pool(db_config, settings)
+    if not db_pool:
+        return False
+    try:
+        await run_migrations(db_pool)
+    finally:
+        await db_pool.close()
+    return True
+
+
+def _worker_main(shard_ids, shard_count, sync_commands, metrics_port):
+    """Egy worker folyamat belépési pontja: saját eseményhurok, saját adatbázis pool."""
+    import bot
+
+    def _stop(signum, frame):
+        raise KeyboardInterrupt
+
+    # A SIGTERM-re is rendezetten álljon le (bot és pool lezárása)
+    signal.signal(signal.SIGTERM, _stop)
+    try:
+        asyncio.run(bot.main(
+            shard_ids=shard_ids, shard_count=shard_count,
+            apply_migrations=False, sync_commands=sync_commands,
+            metrics_port=metrics_port,
+        ))
+    except KeyboardInterrupt:
+        logging.info(f"Worker leállítva (shardok: {shard_ids[0]}-{shard_ids[-1]}).")
+
+
+class Worker:
+    """Egy worker folyamat állapota a felügyelő szemszögéből."""
+    __slots__ = ("index", "shard_ids", "process", "started_at", "failures", "restart_at")
+
+    def __init__(self, index, shard_ids):
+        self.index = index
+        self.shard_ids = shard_ids
+        self.process = None
+        self.started_at = None
+        self.failures = 0
+        self.restart_at = None
+
+    @property
+    def label(self):
+        return f"worker {self.index} (shardok: {self.shard_ids[0]}-{self.shard_ids[-1]})"
+
+
+class Supervisor:
+    """
+    Elindítja a workereket, figyeli őket, és a hibával leállókat késleltetve újraindítja.
+    Starts the shard workers, watches them and restarts crashed ones with exponential backoff.
+
+    A workerek indítása IDENTIFY_INTERVAL szerint lépcsőzetes, hogy a
+    folyamatok együtt se lépjék túl a Discord IDENTIFY korlátját. A
+    parancsfát csak az első worker szinkronizálja.
+    """
+
+    def __init__(self, shard_count, ranges, max_concurrency=1, metrics_port=0):
+        self.shard_count = shard_count
+        self.max_concurrency = max(1, max_concurrency)
+        self.metrics_port = metrics_port
+        self.workers = [Worker(index, shard_ids) for index, shard_ids in enumerate(ranges)]
+        self.context = multiprocessing.get_context("spawn")
+        self.stopping = False
+
+    def _start(self, worker):
+        worker.process = self.context.Process(
+            target=_worker_main,
+            # Minden worker saját metrika portot kap: METRICS_PORT + worker sorszáma
+            args=(worker.shard_ids, self.shard_count, worker.index == 0, self.metrics_port + worker.index if self.metrics_port else 0),
+            name=f"shard-worker-{worker.index}",
+        )
+        worker.process.start()
+        worker.started_at = time.monotonic()
+        worker.restart_at = None
+        logging.info(f"{worker.label} elindítva (pid: {worker.process.pid}).")
+
+    def _identify_delay(self, worker):
+        return len(worker.shard_ids) * IDENTIFY_INTERVAL / self.max_concurrency
+
+    def _check(self, worker):
+        """Egy leállt worker kezelése: hibás kilépésnél újraindítás ütemezése."""
+        if worker.process is None or worker.process.is_alive() or worker.restart_at is not None:
+            return
+        exitcode = worker.process.exitcode
+        if exitcode == 0:
+            logging.info(f"{worker.label} rendben leállt, nem indul újra.")
+            worker.process = None
+            return
+        if time.monotonic() - worker.started_at >= STABLE_AFTER:
+            worker.failures = 0
+        delay = min(RESTART_MAX_DELAY, RESTART_BASE_DELAY * 2 ** worker.failures)
+        worker.failures += 1
+        worker.restart_at = time.monotonic() + delay
+        logging.warning(f"{worker.label} leállt (kilépési kód: {exitcode}), újraindítás {delay:.0f} s múlva.")
+
+    def _sleep(self, seconds):
+        deadline = time.monotonic() + seconds
+        while not self.stopping and time.monotonic() < deadline:
+            time.sleep(min(0.5, deadline - time.monotonic()))
+
+    def request_stop(self, signum=None, frame=None):
+        self.stopping = True
+
+    def run(self):
+        signal.signal(signal.SIGINT, self.request_stop)
+        signal.signal(signal.SIGTERM, self.request_stop)
+
+        for worker in self.workers:
+            if self.stopping:
+                break
+            self._start(worker)
+            self._sleep(self._identify_delay(worker))
+
+        while not self.stopping:
+            now = time.monotonic()
+            for worker in self.workers:
+                self._check(worker)
+                if worker.restart_at is not None and now >= worker.restart_at:
+                    self._start(worker)
+            if all(worker.process is None for worker in self.workers):
+                break
+            self._sleep(1.0)
+
+        self.shutdown()
+
+    def shutdown(self, timeout=30.0):
+        """Minden workernek SIGTERM-et küld, majd a határidő után a még futókat leállítja."""
+        alive = [w for w in self.workers if w.process is not None and w.process.is_alive()]
+        for worker in alive:
+            worker.process.terminate()
+        deadline = time.monotonic() + timeout
+        for worker in alive:
+            worker.process.join(max(0.0, deadline - time.monotonic()))
+            if worker.process.is_alive():
+                logging.warning(f"{worker.label} nem állt le időben, kényszerített leállítás.")
+                worker.process.kill()
+                worker.process.join()
+        logging.info("Minden worker leállt.")
+
+
+def main():
+    token = os.getenv("DISCORD_BOT_TOKEN")
+    if not token:
+        logging.error("DISCORD_BOT_TOKEN hiányzik a .env fájlból!")
+        return
+
+    # A sémát egyszer, a felügyelő migrálja; a workerek már csak használják
+    if not asyncio.run(prepare_database()):
+        return
+
+    recommended, max_concurrency = asyncio.run(fetch_gateway_info(token))
+    shard_count = int(os.getenv("SHARD_COUNT") or recommended)
+    worker_count = int(os.getenv("WORKER_COUNT") or os.cpu_count() or 1)
+    ranges = shard_ranges(shard_count, worker_count)
+    logging.info(
+        f"{shard_count} shard (javasolt: {recommended}) {len(ranges)} workeren, "
+        f"max_concurrency: {max_concurrency}."
+    )
+    Supervisor(shard_count, ranges, max_concurrency, int(os.getenv("METRICS_PORT") or 0)).run()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+# metrics.py
+from bisect import bisect_left
+
+# Alapértelmezett késleltetési vödrök másodpercben (0,5 ms - 10 s)
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Histogram:
+    """
+    Rögzített vödrökből álló hisztogram késleltetések méréséhez.
+    A fixed-bucket histogram for latency measurements.
+
+    A megfigyelés egyetlen bisect és egy számláló növelése, így éles
+    környezetben is bekapcsolva hagyható. A percentilisek a vödrökön belüli
+    lineáris interpolációval becsültek.
+    """
+    __slots__ = ("bounds", "counts", "count", "sum", "max")
+
+    def __init__(self, bounds=DEFAULT_BUCKETS):
+        self.bounds = tuple(bounds)
+        # Az utolsó vödör a legnagyobb határ feletti (+Inf) értékeket gyűjti
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+        if value > self.max:
+            self.max = value
+
+    @property
+    def mean(self):
+        return self.sum / self.count if self.count else 0.0
+
+    def percentile(self, q):
+        """
+        Becsült percentilis (0 <= q <= 1) a vödrök alapján.
+        Estimates the q-quantile from the buckets.
+        """
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        cumulative = 0
+        for index, bucket_count in enumerate(self.counts):
+            if not bucket_count:
+                continue
+            if cumulative + bucket_count >= rank:
+                if index == len(self.bounds):
+                    return self.max
+                lower = self.bounds[index - 1] if index else 0.0
+                upper = min(self.bounds[index], self.max)
+                fraction = (rank - cumulative) / bucket_count
+                return lower + (max(upper, lower) - lower) * fraction
+            cumulative += bucket_count
+        return self.max
+
+    def cumulative_buckets(self):
+        """(felső határ, kumulált darabszám) párok, a végén a +Inf vödörrel."""
+        cumulative = 0
+        for bound, bucket_count in zip(self.bounds + (float("inf"),), self.counts):
+            cumulative += bucket_count
+            yield bound, cumulative
+
+    def snapshot(self):
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "mean": self.mean,
+            "p50": self.percentile(0.50),
+            "p95": self.percentile(0.95),
+            "p99": self.percentile(0.99),
+            "max": self.max,
+        }
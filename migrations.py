@@ -0,0 +1,191 @@
+# migrations.py
+import logging
+from typing import NamedTuple
+import aiomysql
+from database import TABLES
+from db_metrics import timed_query
+
+# A migrációk párhuzamos futtatását (pl. több worker folyamat) kizáró zár neve
+MIGRATION_LOCK = "discord_bot_schema_migration"
+
+SCHEMA_VERSION_TABLE = (
+    "CREATE TABLE IF NOT EXISTS `schema_version` ("
+    "  `version` INT UNSIGNED NOT NULL,"
+    "  `description` VARCHAR(255) NOT NULL,"
+    "  `applied_at` TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,"
+    "  PRIMARY KEY (`version`)"
+    ") ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci"
+)
+
+
+class Migration(NamedTuple):
+    """
+    Egy sémaváltozás: verziószám, leírás és idempotens SQL utasítások.
+    A schema change: version number, description and idempotent SQL statements.
+    """
+    version: int
+    description: str
+    statements: tuple
+
+
+# --- Migrációk (csak hozzáfűzni szabad, a meglévőket módosítani tilos) ---
+
+MIGRATIONS = (
+    Migration(1, "Alap táblák", tuple(TABLES.values())),
+    Migration(2, "Covering index a sablonlistához (guild_id, name, embed_title)", (
+        # A /admin template-list lekérdezése (get_template_listing) így csak az indexet olvassa
+        "ALTER TABLE `post_templates` ADD INDEX IF NOT EXISTS `idx_templates_listing` (`guild_id`, `name`, `embed_title`)",
+    )),
+    Migration(3, "Keskeny index a szerverek egyeztetéséhez (guild_name)", (
+        # A reconcile_guilds SELECT guild_id, guild_name lekérdezése a széles sorok helyett ezt az
+        # indexet olvassa végig (a másodlagos index a guild_id elsődleges kulcsot is tartalmazza)
+        "ALTER TABLE `guilds` ADD INDEX IF NOT EXISTS `idx_guilds_name` (`guild_name`)",
+    )),
+    Migration(4, "Figyelmeztetések tábla", (
+        # Az (guild_id, user_id, warning_id) index a /warnings keyset lapozását szolgálja ki
+        "CREATE TABLE IF NOT EXISTS `warnings` ("
+        "  `warning_id` BIGINT UNSIGNED NOT NULL AUTO_INCREMENT,"
+        "  `guild_id` BIGINT UNSIGNED NOT NULL,"
+        "  `user_id` BIGINT UNSIGNED NOT NULL,"
+        "  `moderator_id` BIGINT UNSIGNED NOT NULL,"
+        "  `reason` VARCHAR(512) NOT NULL,"
+        "  `created_at` DATETIME NOT NULL,"
+        "  PRIMARY KEY (`warning_id`),"
+        "  KEY `idx_warnings_member` (`guild_id`, `user_id`, `warning_id`),"
+        "  CONSTRAINT `fk_warnings_guild` FOREIGN KEY (`guild_id`)"
+        "    REFERENCES `guilds` (`guild_id`) ON DELETE CASCADE"
+        ") ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci",
+    )),
+    Migration(5, "Időzített némítások tábla", (
+        # Szerverenként és felhasználónként egy aktív némítás; induláskor az ütemező ebből töltődik fel
+        "CREATE TABLE IF NOT EXISTS `mutes` ("
+        "  `guild_id` BIGINT UNSIGNED NOT NULL,"
+        "  `user_id` BIGINT UNSIGNED NOT NULL,"
+        "  `role_id` BIGINT UNSIGNED NOT NULL,"
+        "  `moderator_id` BIGINT UNSIGNED NOT NULL,"
+        "  `reason` VARCHAR(512) NOT NULL,"
+        "  `expires_at` DATETIME NOT NULL,"
+        "  PRIMARY KEY (`guild_id`, `user_id`),"
+        "  KEY `idx_mutes_expires` (`expires_at`),"
+        "  CONSTRAINT `fk_mutes_guild` FOREIGN KEY (`guild_id`)"
+        "    REFERENCES `guilds` (`guild_id`) ON DELETE CASCADE"
+        ") ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci",
+    )),
+    Migration(6, "Videó adatok gyorsítótár tábla", (
+        # Szerverfüggetlen: egy videó adatait csak egyszer kérjük le a yt-dlp-vel
+        "CREATE TABLE IF NOT EXISTS `video_metadata` ("
+        "  `video_id` VARCHAR(16) NOT NULL,"
+        "  `title` VARCHAR(512) NOT NULL,"
+        "  `channel` VARCHAR(255) DEFAULT NULL,"
+        "  `duration` INT UNSIGNED DEFAULT NULL,"
+        "  `fetched_at` TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,"
+        "  PRIMARY KEY (`video_id`)"
+        ") ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci",
+    )),
+    Migration(7, "Posztolt videók tábla", (
+        # Az elsődleges kulcs (guild_id, video_id) egyben a szerver videóinak betöltését is kiszolgálja
+        "CREATE TABLE IF NOT EXISTS `posted_videos` ("
+        "  `guild_id` BIGINT UNSIGNED NOT NULL,"
+        "  `video_id` VARCHAR(16) NOT NULL,"
+        "  `message_id` BIGINT UNSIGNED DEFAULT NULL,"
+        "  `posted_by` BIGINT UNSIGNED DEFAULT NULL,"
+        "  `posted_at` TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,"
+        "  PRIMARY KEY (`guild_id`, `video_id`),"
+        "  CONSTRAINT `fk_posted_videos_guild` FOREIGN KEY (`guild_id`)"
+        "    REFERENCES `guilds` (`guild_id`) ON DELETE CASCADE"
+        ") ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci",
+    )),
+    Migration(8, "YouTube csatorna feedek és feliratkozások", (
+        # Csatornánként egy sor: a feltételes kérések (ETag / Last-Modified) állapota újraindítás után is megmarad
+        "CREATE TABLE IF NOT EXISTS `youtube_feeds` ("
+        "  `channel_id` VARCHAR(32) NOT NULL,"
+        "  `etag` VARCHAR(255) DEFAULT NULL,"
+        "  `last_modified` VARCHAR(64) DEFAULT NULL,"
+        "  `last_published` DATETIME DEFAULT NULL,"
+        "  PRIMARY KEY (`channel_id`)"
+        ") ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci",
+        # Egy feedet több szerver is követhet, a lekérés mégis csatornánként egyszer történik
+        "CREATE TABLE IF NOT EXISTS `youtube_subscriptions` ("
+        "  `guild_id` BIGINT UNSIGNED NOT NULL,"
+        "  `channel_id` VARCHAR(32) NOT NULL,"
+        "  `template_name` VARCHAR(50) DEFAULT NULL,"
+        "  `created_at` TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,"
+        "  PRIMARY KEY (`guild_id`, `channel_id`),"
+        "  KEY `idx_youtube_subscriptions_channel` (`channel_id`),"
+        "  CONSTRAINT `fk_youtube_subscriptions_guild` FOREIGN KEY (`guild_id`)"
+        "    REFERENCES `guilds` (`guild_id`) ON DELETE CASCADE,"
+        "  CONSTRAINT `fk_youtube_subscriptions_feed` FOREIGN KEY (`channel_id`)"
+        "    REFERENCES `youtube_feeds` (`channel_id`) ON DELETE CASCADE"
+        ") ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci",
+    )),
+    Migration(9, "YouTube feed állapot shard tartományonként", (
+        # Több worker esetén mindegyik a saját szervereinek lekérési állapotát tartja;
+        # a youtube_feeds.last_published ezután csak a követés kezdetét jelöli
+        "CREATE TABLE IF NOT EXISTS `youtube_feed_state` ("
+        "  `channel_id` VARCHAR(32) NOT NULL,"
+        "  `owner` VARCHAR(32) NOT NULL,"
+        "  `etag` VARCHAR(255) DEFAULT NULL,"
+        "  `last_modified` VARCHAR(64) DEFAULT NULL,"
+        "  `last_published` DATETIME DEFAULT NULL,"
+        "  PRIMARY KEY (`channel_id`, `owner`),"
+        "  CONSTRAINT `fk_youtube_feed_state_feed` FOREIGN KEY (`channel_id`)"
+        "    REFERENCES `youtube_feeds` (`channel_id`) ON DELETE CASCADE"
+        ") ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci",
+        # A meglévő állapot az egy folyamatos futás tulajdonába kerül
+        "INSERT IGNORE INTO `youtube_feed_state` (channel_id, owner, etag, last_modified, last_published) "
+        "SELECT channel_id, 'all', etag, last_modified, last_published FROM `youtube_feeds`",
+    )),
+)
+
+
+async def _current_version(cursor):
+    try:
+        await cursor.execute("SELECT MAX(version) FROM schema_version")
+    except aiomysql.ProgrammingError as e:
+        # 1146: a tábla nem létezik, vagyis még egyetlen migráció sem futott
+        if e.args[0] != 1146:
+            raise
+        return 0
+    row = await cursor.fetchone()
+    return row[0] or 0
+
+
+@timed_query
+async def run_migrations(pool, migrations=MIGRATIONS):
+    """
+    Lefuttatja a még nem alkalmazott migrációkat, és visszaadja az aktuális sémaverziót.
+    Applies pending migrations in order and returns the resulting schema version.
+
+    Naprakész séma esetén egyetlen lekérdezés fut. Egyébként egy MariaDB
+    zár (GET_LOCK) alatt újraellenőrzi a verziót, így egyszerre csak egy
+    folyamat migrál.
+    """
+    latest = migrations[-1].version if migrations else 0
+    async with pool.acquire() as conn:
+        async with conn.cursor() as cursor:
+            version = await _current_version(cursor)
+            if version >= latest:
+                logging.info(f"Az adatbázis séma naprakész (verzió: {version}).")
+                return version
+
+            await cursor.execute("SELECT GET_LOCK(%s, 60)", (MIGRATION_LOCK,))
+            if (await cursor.fetchone())[0] != 1:
+                raise RuntimeError("Nem sikerült megszerezni a migrációs zárat.")
+            try:
+                await cursor.execute(SCHEMA_VERSION_TABLE)
+                version = await _current_version(cursor)
+                for migration in migrations:
+                    if migration.version <= version:
+                        continue
+                    logging.info(f"Migráció futtatása: {migration.version} - {migration.description}")
+                    for statement in migration.statements:
+                        await cursor.execute(statement)
+                    await cursor.execute(
+                        "INSERT INTO schema_version (version, description) VALUES (%s, %s)",
+                        (migration.version, migration.description)
+                    )
+                    version = migration.version
+            finally:
+                await cursor.execute("SELECT RELEASE_LOCK(%s)", (MIGRATION_LOCK,))
+    logging.info(f"Az adatbázis séma frissítve (verzió: {version}).")
+    return version
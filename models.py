@@ -0,0 +1,75 @@
+# models.py
+from typing import NamedTuple, Optional
+
+
+class GuildConfig:
+    """
+    Egy szerver `guilds` táblabeli sorának tömör, típusos megfelelője.
+    A compact, typed record of a guild's row in the `guilds` table.
+
+    A __slots__ miatt egy példány nem hordoz saját dict-et, így sok ezer
+    szerver konfigurációja is kevés memóriával tartható a gyorsítótárban.
+    """
+    __slots__ = (
+        "guild_id",
+        "guild_name",
+        "video_public_channel_id",
+        "mute_role_id",
+        "server_description",
+        "server_host",
+        "server_cpu",
+        "server_ram",
+    )
+
+    # Az oszlopok sorrendje megegyezik a __slots__ sorrendjével (lásd get_guild_settings)
+    COLUMNS = __slots__
+
+    def __init__(self, guild_id, guild_name, video_public_channel_id=None, mute_role_id=None,
+                 server_description=None, server_host=None, server_cpu=None, server_ram=None):
+        self.guild_id = guild_id
+        self.guild_name = guild_name
+        self.video_public_channel_id = video_public_channel_id
+        self.mute_role_id = mute_role_id
+        self.server_description = server_description
+        self.server_host = server_host
+        self.server_cpu = server_cpu
+        self.server_ram = server_ram
+
+    def __repr__(self):
+        return f"<GuildConfig guild_id={self.guild_id} guild_name={self.guild_name!r}>"
+
+
+class ReconcileResult(NamedTuple):
+    """
+    A szerverlista induláskori egyeztetésének eredménye.
+    Outcome of reconciling the gateway's guild list with the database.
+    """
+    known: int
+    inserted_guilds: int
+    renamed_guilds: int
+    inserted_cogs: int
+    elapsed: float
+
+    @property
+    def rows_changed(self):
+        return self.inserted_guilds + self.renamed_guilds + self.inserted_cogs
+
+
+class VideoMetadata(NamedTuple):
+    """
+    Egy YouTube videó adatai a poszthoz.
+    Metadata of a YouTube video used to fill in a post.
+    """
+    video_id: str
+    title: str
+    channel: Optional[str]
+    duration: Optional[int]
+
+    @property
+    def duration_text(self):
+        """Az időtartam "1:02:03" vagy "4:05" alakban (üres, ha ismeretlen, pl. élő adásnál)."""
+        if self.duration is None:
+            return ""
+        minutes, seconds = divmod(self.duration, 60)
+        hours, minutes = divmod(minutes, 60)
+        return f"{hours}:{minutes:02}:{seconds:02}" if hours else f"{minutes}:{seconds:02}"
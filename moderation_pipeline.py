@@ -0,0 +1,448 @@
+# moderation_pipeline.py
+import asyncio
+import logging
+import os
+import time
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import discord
+from metrics import Histogram
+from word_filter import BadWordMatcher
+
+# --- Beállítások (.env) ---
+# Az összes szerveren együtt várakozó üzenetek felső korlátja
+QUEUE_SIZE = int(os.getenv("MODERATION_QUEUE_SIZE", "10000"))
+# Egy szerver legfeljebb ennyi várakozó üzenetet tarthat, így egy raid nem tölti meg a teljes sort
+GUILD_QUEUE_LIMIT = int(os.getenv("MODERATION_GUILD_QUEUE_LIMIT", "1000"))
+WORKERS = int(os.getenv("MODERATION_WORKERS", "4"))
+BATCH_SIZE = int(os.getenv("MODERATION_BATCH_SIZE", "50"))
+# A keresés kiszervezése: "none" (az eseményhurokban), "thread" vagy "process"
+OFFLOAD = os.getenv("MODERATION_OFFLOAD", "none")
+# Csak az ennél hosszabb (karakterben mért) kötegek keresése kerül ki a hurokból
+OFFLOAD_MIN_CHARS = int(os.getenv("MODERATION_OFFLOAD_MIN_CHARS", "20000"))
+
+# Csatornánként ennyi másodpercen belül legfeljebb egy törlés és egy figyelmeztetés megy ki (0 = kikapcsolva)
+BURST_WINDOW = float(os.getenv("MODERATION_BURST_WINDOW", "2"))
+# A Discord egy tömeges törlésben legfeljebb ennyi üzenetet fogad el
+BULK_DELETE_LIMIT = 100
+# Egy összesítő figyelmeztetésben megemlített felhasználók felső korlátja
+WARNING_MENTION_LIMIT = 10
+
+# Köteg méretek vödrei (darab)
+BATCH_SIZE_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+# A ledobott üzenetekről legfeljebb ennyi másodpercenként írunk figyelmeztetést
+SHED_LOG_INTERVAL = 10.0
+
+
+def _search_all(matcher, texts):
+    """A köteg üzeneteinek keresése: (index, találat) párok a találatot tartalmazó üzenetekre."""
+    results = []
+    for index, text in enumerate(texts):
+        match = matcher.search(text)
+        if match:
+            results.append((index, match))
+    return results
+
+
+# A process pool workereiben szólistánként egyszer felépített keresők
+_process_matchers = {}
+
+
+def _search_words(words, texts):
+    """Process poolban futó keresés: a keresőt a szólistából építi fel, és a workerben tárolja."""
+    matcher = _process_matchers.get(words)
+    if matcher is None:
+        if len(_process_matchers) >= 64:
+            _process_matchers.clear()
+        matcher = _process_matchers[words] = BadWordMatcher(words)
+    return _search_all(matcher, texts)
+
+
+class ModerationPipeline:
+    """
+    Korlátos, szerverenként kötegelő feldolgozó sor a tiltott szó szűréshez.
+    A bounded, per-guild micro-batching queue that takes bad word filtering off the gateway handler.
+
+    Az on_message csak sorba teszi az üzenetet (enqueue), a feldolgozást
+    WORKERS darab háttérfeladat végzi. Egy szerver egyszerre legfeljebb egy
+    workernél van, és egy köteg után a sor végére kerül, így a raidelt
+    szerver sem éheztetheti ki a többit. Túlterheléskor az új üzenetek
+    ledobódnak (szerverenkénti és teljes korlát), ezt a számlálók mutatják.
+
+    `loader(guild_id)` adja a szerver keresőjét, `handler(guild_id, violations)`
+    kapja a (message, BadWordMatch) párokat.
+    """
+
+    def __init__(self, loader, handler, *, workers=WORKERS, batch_size=BATCH_SIZE, max_size=QUEUE_SIZE,
+                 guild_limit=GUILD_QUEUE_LIMIT, offload=OFFLOAD, offload_min_chars=OFFLOAD_MIN_CHARS):
+        self.loader = loader
+        self.handler = handler
+        self.workers = workers
+        self.batch_size = batch_size
+        self.max_size = max_size
+        self.guild_limit = guild_limit
+        self.offload = offload
+        self.offload_min_chars = offload_min_chars
+
+        self._pending = {}
+        self._ready = asyncio.Queue()
+        self._size = 0
+        self._inflight = 0
+        self._idle = asyncio.Event()
+        self._idle.set()
+        self._tasks = []
+        self._executor = None
+        self._closed = False
+        self._last_shed_log = 0.0
+
+        # Metrikák
+        self.enqueued = 0
+        self.processed = 0
+        self.violations = 0
+        self.batches = 0
+        self.errors = 0
+        self.offloaded = 0
+        self.max_depth = 0
+        self.dropped = Counter()
+        self.queue_wait = Histogram()
+        self.batch_time = Histogram()
+        self.batch_sizes = Histogram(BATCH_SIZE_BUCKETS)
+
+    def __len__(self):
+        return self._size
+
+    # --- Életciklus ---
+
+    def start(self):
+        if self.offload == "thread":
+            self._executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="moderation")
+        elif self.offload == "process":
+            self._executor = ProcessPoolExecutor(max_workers=max(1, (os.cpu_count() or 2) // 2))
+        elif self.offload != "none":
+            logging.warning(f"Ismeretlen MODERATION_OFFLOAD érték: {self.offload}, a keresés a hurokban fut.")
+            self.offload = "none"
+        self._closed = False
+        self._tasks = [asyncio.create_task(self._worker(), name=f"moderation-worker-{i}") for i in range(self.workers)]
+
+    async def stop(self, timeout=10.0):
+        """Lezárja a sort, megvárja a várakozó üzenetek feldolgozását (legfeljebb `timeout` ideig), majd leáll."""
+        self._closed = True
+        try:
+            await asyncio.wait_for(self.join(), timeout)
+        except asyncio.TimeoutError:
+            logging.warning(f"A moderációs sor leállításakor {self._size} üzenet feldolgozatlan maradt.")
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    async def join(self):
+        """Megvárja, amíg a sor kiürül, és minden köteg feldolgozása befejeződik."""
+        await self._idle.wait()
+
+    # --- Sorba állítás (a gateway eseménykezelőből) ---
+
+    def enqueue(self, message):
+        """
+        Sorba teszi az üzenetet; túlterheléskor ledobja, és False-t ad vissza.
+        Never blocks: overload is handled by shedding the new message.
+        """
+        if self._closed:
+            return self._shed("closed", message)
+        if self._size >= self.max_size:
+            return self._shed("queue_full", message)
+        guild_id = message.guild.id
+        queue = self._pending.get(guild_id)
+        if queue is None:
+            queue = self._pending[guild_id] = deque()
+            # Új (vagy épp nem feldolgozott) szerver: a körforgó sor végére kerül
+            self._ready.put_nowait(guild_id)
+        elif len(queue) >= self.guild_limit:
+            return self._shed("guild_full", message)
+        queue.append((time.perf_counter(), message))
+        self._size += 1
+        self.enqueued += 1
+        if self._size > self.max_depth:
+            self.max_depth = self._size
+        self._idle.clear()
+        return True
+
+    def _shed(self, reason, message):
+        self.dropped[reason] += 1
+        now = time.monotonic()
+        if now - self._last_shed_log >= SHED_LOG_INTERVAL:
+            self._last_shed_log = now
+            logging.warning(
+                f"Moderációs sor túlterhelve ({reason}), üzenetek ledobva: {sum(self.dropped.values())} "
+                f"(mélység: {self._size}, szerver: {message.guild.id})."
+            )
+        return False
+
+    # --- Feldolgozás ---
+
+    async def _worker(self):
+        while True:
+            guild_id = await self._ready.get()
+            queue = self._pending[guild_id]
+            batch = [queue.popleft() for _ in range(min(self.batch_size, len(queue)))]
+            self._size -= len(batch)
+            self._inflight += 1
+            try:
+                await self._process(guild_id, batch)
+            except Exception as e:
+                self.errors += 1
+                logging.error(f"Hiba a(z) {guild_id} szerver moderációs kötegének feldolgozásakor: {e}")
+            finally:
+                self._inflight -= 1
+                # A szerver csak a köteg után kerül vissza a sorba, így egyszerre egy worker dolgozik rajta
+                if queue:
+                    self._ready.put_nowait(guild_id)
+                else:
+                    del self._pending[guild_id]
+                if not self._size and not self._inflight:
+                    self._idle.set()
+
+    async def _process(self, guild_id, batch):
+        started = time.perf_counter()
+        for enqueued_at, _ in batch:
+            self.queue_wait.observe(started - enqueued_at)
+
+        matcher = await self.loader(guild_id)
+        if matcher:
+            messages = [message for _, message in batch]
+            matches = await self._search(matcher, [message.content for message in messages])
+            if matches:
+                self.violations += len(matches)
+                await self.handler(guild_id, [(messages[index], match) for index, match in matches])
+
+        self.processed += len(batch)
+        self.batches += 1
+        self.batch_sizes.observe(len(batch))
+        self.batch_time.observe(time.perf_counter() - started)
+
+    async def _search(self, matcher, texts):
+        if self._executor is None or sum(map(len, texts)) < self.offload_min_chars:
+            return _search_all(matcher, texts)
+        self.offloaded += 1
+        loop = asyncio.get_running_loop()
+        if self.offload == "process":
+            return await loop.run_in_executor(self._executor, _search_words, matcher.words, texts)
+        return await loop.run_in_executor(self._executor, _search_all, matcher, texts)
+
+    def stats(self):
+        return {
+            "depth": self._size,
+            "max_depth": self.max_depth,
+            "max_size": self.max_size,
+            "guilds": len(self._pending),
+            "inflight": self._inflight,
+            "workers": self.workers,
+            "offload": self.offload,
+            "enqueued": self.enqueued,
+            "processed": self.processed,
+            "violations": self.violations,
+            "batches": self.batches,
+            "offloaded": self.offloaded,
+            "errors": self.errors,
+            "dropped": dict(self.dropped),
+            "batch_size": self.batch_sizes.mean,
+            "queue_wait": self.queue_wait.snapshot(),
+            "batch_time": self.batch_time.snapshot(),
+        }
+
+
+class _ChannelBurst:
+    """Egy csatorna törlésre váró üzenetei, az utolsó kiküldés ideje és a folyamatban lévő kiküldés."""
+    __slots__ = ("channel", "messages", "words", "last_flush", "timer", "sender")
+
+    def __init__(self, channel):
+        self.channel = channel
+        self.messages = []
+        self.words = set()
+        self.last_flush = float("-inf")
+        self.timer = None
+        self.sender = None
+
+
+class BurstDeleter:
+    """
+    Csatornánként összegyűjti a törlendő üzeneteket, és tömegesen törli őket.
+    Collects offending messages per channel and deletes them in bulk with one aggregated warning.
+
+    Nyugodt csatornán az első találat azonnal törlődik. Ha a `window`
+    másodpercen belül újabb érkezik, a csatorna gyűjtő módba vált: az
+    ablak végén egyetlen channel.delete_messages hívás és egyetlen
+    összesítő figyelmeztetés megy ki. Így üzenetenkénti két REST hívás
+    helyett ablakonként legfeljebb kettő.
+
+    A REST hívások csatornánként külön feladatban futnak, így egy szerver
+    rate limitje nem tartja fel a moderációs sor workereit és a többi
+    szervert. Csatornánként egyszerre egy kiküldés fut; ami közben érkezik,
+    a következő kiküldéssel megy.
+    """
+
+    def __init__(self, window=BURST_WINDOW):
+        self.window = window
+        self._channels = {}
+        self._senders = set()
+        self._adds = 0
+
+        # Metrikák
+        self.messages = 0
+        self.flushes = 0
+        self.bulk_deletes = 0
+        self.single_deletes = 0
+        self.warnings = 0
+        self.failures = 0
+
+    @property
+    def api_calls(self):
+        return self.bulk_deletes + self.single_deletes + self.warnings
+
+    @property
+    def api_calls_saved(self):
+        """Üzenetenként egy törlés és egy figyelmeztetés lett volna."""
+        return 2 * self.messages - self.api_calls
+
+    def add(self, message, match):
+        """Felveszi a törlendő üzenetet; a törlés és a figyelmeztetés háttérfeladatban fut, nem várakoztat."""
+        channel = message.channel
+        state = self._channels.get(channel.id)
+        if state is None:
+            state = self._channels[channel.id] = _ChannelBurst(channel)
+        state.messages.append(message)
+        state.words.add(match.word)
+
+        self._adds += 1
+        if self._adds % 1000 == 0:
+            self._prune()
+
+        if state.sender is not None:
+            # A folyamatban lévő kiküldés végén a közben érkezettek is sorra kerülnek
+            return
+        now = time.monotonic()
+        if state.timer is None and now - state.last_flush >= self.window:
+            # Nyugodt csatorna: azonnali törlés, késleltetés nélkül
+            self._start(state)
+        elif len(state.messages) >= BULK_DELETE_LIMIT:
+            self._start(state)
+        elif state.timer is None:
+            state.timer = asyncio.create_task(self._flush_later(state, state.last_flush + self.window - now))
+
+    def _start(self, state):
+        if state.timer is not None:
+            state.timer.cancel()
+            state.timer = None
+        state.sender = asyncio.create_task(self._send(state))
+        self._senders.add(state.sender)
+        state.sender.add_done_callback(self._senders.discard)
+
+    async def _send(self, state):
+        try:
+            await self._flush(state)
+        finally:
+            state.sender = None
+        if not state.messages or state.timer is not None:
+            return
+        if len(state.messages) >= BULK_DELETE_LIMIT:
+            self._start(state)
+        else:
+            state.timer = asyncio.create_task(self._flush_later(state, state.last_flush + self.window - time.monotonic()))
+
+    async def _flush_later(self, state, delay):
+        await asyncio.sleep(delay)
+        state.timer = None
+        if state.sender is None:
+            self._start(state)
+
+    async def flush_all(self):
+        """Megvárja a folyamatban lévő kiküldéseket, és minden várakozó csatornát azonnal kiküld (leállításkor)."""
+        for state in self._channels.values():
+            if state.timer is not None:
+                state.timer.cancel()
+                state.timer = None
+        while self._senders:
+            await asyncio.gather(*self._senders, return_exceptions=True)
+            # A befejeződő kiküldés új időzítőt indíthatott
+            for state in self._channels.values():
+                if state.timer is not None:
+                    state.timer.cancel()
+                    state.timer = None
+        for state in list(self._channels.values()):
+            while state.messages:
+                await self._flush(state)
+
+    def _prune(self):
+        # A régóta csendes csatornák állapota eldobható: a következő találat úgyis azonnal törlődik
+        cutoff = time.monotonic() - self.window
+        for channel_id, state in list(self._channels.items()):
+            if not state.messages and state.timer is None and state.sender is None and state.last_flush < cutoff:
+                del self._channels[channel_id]
+
+    async def _flush(self, state):
+        # Egy kiküldés alatt több is összegyűlhet, mint amennyit egy tömeges törlés elfogad
+        messages, state.messages = state.messages[:BULK_DELETE_LIMIT], state.messages[BULK_DELETE_LIMIT:]
+        words, state.words = state.words, set()
+        state.last_flush = time.monotonic()
+        if not messages:
+            return
+        self.flushes += 1
+        self.messages += len(messages)
+        channel = state.channel
+        guild = messages[0].guild
+
+        try:
+            if len(messages) == 1:
+                self.single_deletes += 1
+                await messages[0].delete()
+            else:
+                self.bulk_deletes += 1
+                await channel.delete_messages(messages, reason="Tiltott szavak")
+        except discord.NotFound:
+            # Időközben már törölték
+            pass
+        except discord.Forbidden:
+            self.failures += 1
+            logging.warning(f"Nincs jogosultságom üzenetet törölni a(z) {guild.name} szerveren.")
+            return
+        except Exception as e:
+            self.failures += 1
+            logging.error(f"Hiba az üzenetek törlésekor: {e}")
+            return
+
+        mentions = list(dict.fromkeys(message.author.mention for message in messages))
+        try:
+            self.warnings += 1
+            if len(messages) == 1:
+                await channel.send(f"{mentions[0]}, a hozzászólásod tiltott szavakat tartalmazott, ezért törölve lett.", delete_after=10)
+            else:
+                listed = " ".join(mentions[:WARNING_MENTION_LIMIT])
+                if len(mentions) > WARNING_MENTION_LIMIT:
+                    listed += f" és még {len(mentions) - WARNING_MENTION_LIMIT} felhasználó"
+                await channel.send(f"{listed}: {len(messages)} tiltott szavakat tartalmazó hozzászólás törölve lett.", delete_after=10)
+        except Exception as e:
+            self.failures += 1
+            logging.error(f"Hiba a figyelmeztetés küldésekor: {e}")
+        logging.info(
+            f"{len(messages)} törölt üzenet a(z) {guild.name} szerveren a tiltott szó szűrő miatt "
+            f"(szavak: {', '.join(sorted(words))})."
+        )
+
+    def stats(self):
+        return {
+            "window": self.window,
+            "channels": len(self._channels),
+            "inflight": len(self._senders),
+            "messages": self.messages,
+            "flushes": self.flushes,
+            "bulk_deletes": self.bulk_deletes,
+            "single_deletes": self.single_deletes,
+            "warnings": self.warnings,
+            "failures": self.failures,
+            "api_calls": self.api_calls,
+            "api_calls_saved": self.api_calls_saved,
+        }
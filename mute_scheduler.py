@@ -0,0 +1,143 @@
+# mute_scheduler.py
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from metrics import Histogram
+
+# Egy körben legfeljebb ennyi lejárt elem kerül a kezelőhöz
+MAX_BATCH = 100
+# Sikertelen kezelés után ennyi másodperc múlva próbálkozik újra
+RETRY_DELAY = 60.0
+
+
+class ExpiryScheduler:
+    """
+    Egyetlen min-kupacra épülő ütemező lejáró elemekhez (pl. időzített némítások).
+    A single min-heap scheduler that wakes only for the next expiry.
+
+    Elemenként nincs alvó feladat: egy háttérfeladat a kupac tetejéig alszik,
+    és az addig lejárt elemeket kötegben adja át a `handler(batch)` hívásnak,
+    ahol a batch (kulcs, lejárat) párok listája. A lejárat Unix időbélyeg. Az
+    átütemezés és a törlés lusta: a kupacban maradt elavult bejegyzéseket a
+    kivételkor dobja el. A handler a sikertelen kulcsok listáját adhatja
+    vissza, ezek RETRY_DELAY múlva újra sorra kerülnek.
+    """
+
+    def __init__(self, name, handler, *, max_batch=MAX_BATCH):
+        self.name = name
+        self.handler = handler
+        self.max_batch = max_batch
+        self._heap = []
+        self._entries = {}
+        self._counter = itertools.count()
+        self._changed = asyncio.Event()
+        self._task = None
+
+        # Metrikák
+        self.processed = 0
+        self.batches = 0
+        self.retries = 0
+        self.errors = 0
+        self.lag = Histogram()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name=f"scheduler-{self.name}")
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    def schedule(self, key, expires_at):
+        """Beütemez vagy átütemez egy kulcsot; csak korábbi lejáratnál kell felébreszteni a ciklust."""
+        self._entries[key] = expires_at
+        heapq.heappush(self._heap, (expires_at, next(self._counter), key))
+        if self._heap[0][2] == key:
+            self._changed.set()
+
+    def cancel(self, key):
+        """Törli a kulcsot; a kupac bejegyzése a kivételkor esik ki."""
+        removed = self._entries.pop(key, None) is not None
+        # Sok elavult bejegyzés esetén a kupacot újraépítjük
+        if len(self._heap) > 2 * len(self._entries) + 64:
+            self._heap = [item for item in self._heap if self._entries.get(item[2]) == item[0]]
+            heapq.heapify(self._heap)
+        return removed
+
+    def next_due(self):
+        self._discard_stale()
+        return self._heap[0][0] if self._heap else None
+
+    def _discard_stale(self):
+        heap = self._heap
+        while heap and self._entries.get(heap[0][2]) != heap[0][0]:
+            heapq.heappop(heap)
+
+    def _pop_due(self, now):
+        batch = []
+        heap = self._heap
+        while heap and len(batch) < self.max_batch:
+            expires_at, _, key = heap[0]
+            if self._entries.get(key) != expires_at:
+                heapq.heappop(heap)
+                continue
+            if expires_at > now:
+                break
+            heapq.heappop(heap)
+            del self._entries[key]
+            batch.append((key, expires_at))
+        return batch
+
+    async def _run(self):
+        while True:
+            due = self.next_due()
+            delay = None if due is None else due - time.time()
+            if delay is None or delay > 0:
+                self._changed.clear()
+                try:
+                    await asyncio.wait_for(self._changed.wait(), delay)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            now = time.time()
+            batch = self._pop_due(now)
+            for _, expires_at in batch:
+                self.lag.observe(max(0.0, now - expires_at))
+            try:
+                failed = await self.handler(batch) or ()
+            except Exception as e:
+                self.errors += 1
+                logging.error(f"{self.name}: hiba {len(batch)} lejárt elem kezelésekor: {e}")
+                failed = [key for key, _ in batch]
+            self.batches += 1
+            self.processed += len(batch) - len(failed)
+            for key in failed:
+                # Ha közben újraütemezték, azt nem írjuk felül
+                if key not in self._entries:
+                    self.retries += 1
+                    self.schedule(key, time.time() + RETRY_DELAY)
+
+    def stats(self):
+        due = self.next_due()
+        return {
+            "name": self.name,
+            "depth": len(self._entries),
+            "heap": len(self._heap),
+            "next_in": None if due is None else due - time.time(),
+            "processed": self.processed,
+            "batches": self.batches,
+            "retries": self.retries,
+            "errors": self.errors,
+            "lag": self.lag.snapshot(),
+        }
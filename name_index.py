@@ -0,0 +1,56 @@
+# name_index.py
+from bisect import bisect_left, insort
+
+# A Discord legfeljebb ennyi autocomplete választást fogad el
+MAX_CHOICES = 25
+
+
+class NameIndex:
+    """
+    Rendezett névindex gyors előtag- és részszöveg-kereséshez (autocomplete).
+    A sorted name index answering prefix and substring queries for autocomplete.
+
+    Az elemek (kisbetűs kulcs, eredeti név) párok rendezett listában, így az
+    előtag találatok bisect-tel, másolás nélkül kereshetők, a beszúrás és a
+    törlés pedig helyben, inkrementálisan történik.
+    """
+    __slots__ = ("_entries",)
+
+    def __init__(self, names=()):
+        self._entries = sorted((name.lower(), name) for name in set(names))
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, name):
+        index = bisect_left(self._entries, (name.lower(), name))
+        return index < len(self._entries) and self._entries[index] == (name.lower(), name)
+
+    def add(self, name):
+        if name not in self:
+            insort(self._entries, (name.lower(), name))
+
+    def remove(self, name):
+        index = bisect_left(self._entries, (name.lower(), name))
+        if index < len(self._entries) and self._entries[index] == (name.lower(), name):
+            del self._entries[index]
+
+    def search(self, query, limit=MAX_CHOICES):
+        """
+        Először az előtaggal kezdődő, majd a részszövegként tartalmazó neveket adja vissza.
+        Returns names starting with the query first, then names containing it, capped at `limit`.
+        """
+        query = query.lower()
+        entries = self._entries
+        results = []
+        index = bisect_left(entries, (query,))
+        while index < len(entries) and len(results) < limit and entries[index][0].startswith(query):
+            results.append(entries[index][1])
+            index += 1
+        if len(results) < limit and query:
+            for key, name in entries:
+                if query in key and not key.startswith(query):
+                    results.append(name)
+                    if len(results) >= limit:
+                        break
+        return results
@@ -0,0 +1,118 @@
+# post_templates.py
+import string
+import discord
+
+# A sablonokban használható változók
+TEMPLATE_FIELDS = ("title", "link", "description", "author", "channel", "duration")
+
+DEFAULT_COLOR = 0xFFFFFF
+
+_formatter = string.Formatter()
+
+
+class TemplateError(ValueError):
+    """
+    Érvénytelen poszt sablon (ismeretlen változó, hibás formázás vagy szín).
+    Raised for an invalid post template.
+    """
+    # A hibás sablon neve, ha ismert (a gyorsítótárban a sablon helyén álló példányoknál)
+    name = None
+
+
+class CompiledFormat:
+    """
+    Előre feldarabolt formázó szöveg: a str.format elemzése egyszer történik meg.
+    A format string split into literal and field segments once, at compile time.
+    """
+    __slots__ = ("source", "_segments", "_constant")
+
+    def __init__(self, source):
+        self.source = source
+        segments = []
+        try:
+            parsed = list(_formatter.parse(source))
+        except ValueError as e:
+            raise TemplateError(f"Hibás formázás: {e}") from None
+        for literal, field, spec, conversion in parsed:
+            if field is not None:
+                if field not in TEMPLATE_FIELDS:
+                    allowed = ", ".join(f"{{{name}}}" for name in TEMPLATE_FIELDS)
+                    raise TemplateError(f"Ismeretlen változó: {{{field}}}. Használható: {allowed}")
+                if spec and "{" in spec:
+                    raise TemplateError(f"Beágyazott formázás nem támogatott: {{{field}:{spec}}}")
+            segments.append((literal, field, spec, conversion))
+        self._segments = tuple(segments)
+        # Változó nélküli szövegnél a renderelés egy konstans visszaadása
+        self._constant = "".join(literal for literal, *_ in segments) if all(s[1] is None for s in segments) else None
+
+    def render(self, values):
+        if self._constant is not None:
+            return self._constant
+        parts = []
+        for literal, field, spec, conversion in self._segments:
+            if literal:
+                parts.append(literal)
+            if field is None:
+                continue
+            value = values[field]
+            if conversion:
+                value = _formatter.convert_field(value, conversion)
+            parts.append(format(value, spec) if spec else str(value))
+        return "".join(parts)
+
+
+def parse_color(color):
+    """A '#RRGGBB' (vagy 'RRGGBB') alakú színt egész számmá alakítja."""
+    if not color:
+        return DEFAULT_COLOR
+    text = color.strip().lstrip("#")
+    if len(text) != 6:
+        raise TemplateError(f"Érvénytelen szín: `{color}`. Használj #RRGGBB formátumot.")
+    try:
+        return int(text, 16)
+    except ValueError:
+        raise TemplateError(f"Érvénytelen szín: `{color}`. Használj #RRGGBB formátumot.") from None
+
+
+class CompiledTemplate:
+    """
+    Egy poszt sablon lefordított, azonnal renderelhető formája.
+    A post template compiled once into a render-ready object.
+
+    A színt egyszer értelmezi, a szövegeket előre feldarabolja, és már
+    fordításkor ellenőrzi a változókat, így a posztolás tisztán memóriában
+    futó renderelés.
+    """
+    __slots__ = ("name", "title", "description", "footer", "color")
+
+    def __init__(self, name, title, description=None, color=None, footer=None):
+        self.name = name
+        self.title = CompiledFormat(title or "")
+        self.description = CompiledFormat(description) if description else None
+        self.footer = CompiledFormat(footer) if footer else None
+        self.color = parse_color(color)
+        # Próbarenderelés: a hibás formázási előírások már mentéskor kiderülnek
+        try:
+            self._render_texts({field: field for field in TEMPLATE_FIELDS})
+        except (ValueError, TypeError) as e:
+            raise TemplateError(f"Hibás formázás: {e}") from None
+
+    @classmethod
+    def from_row(cls, row):
+        """Egy post_templates sorból (dict) készít lefordított sablont."""
+        return cls(row['name'], row['embed_title'], row['embed_description'], row['color'], row['embed_footer'])
+
+    def _render_texts(self, values):
+        title = self.title.render(values)
+        description = self.description.render(values) if self.description else None
+        footer = self.footer.render(values) if self.footer else None
+        return title, description, footer
+
+    def render(self, *, title, link, description, author, channel="", duration=""):
+        """Elkészíti a sablon alapján a beágyazott üzenetet."""
+        values = {"title": title, "link": link, "description": description, "author": author, "channel": channel, "duration": duration}
+        embed_title, embed_description, footer = self._render_texts(values)
+        embed = discord.Embed(title=embed_title, description=embed_description, color=self.color)
+        if footer:
+            embed.set_footer(text=footer)
+        return embed
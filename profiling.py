@@ -0,0 +1,55 @@
+# profiling.py
+import logging
+import time
+from contextlib import contextmanager
+
+# A folyamat indulásának ideje; a bot.py legelején importáljuk, hogy a modulbetöltés is látszódjon
+PROCESS_START = time.perf_counter()
+
+
+class StartupProfiler:
+    """
+    Az indulás egyes fázisainak (importok, séma, cog-ok, szinkronizálás) időmérője.
+    Records wall-clock time of each startup phase and emits a summary report.
+
+    A mérés mindig fut (fázisonként két perf_counter hívás), a részletes
+    jelentés csak profilozó módban (STARTUP_PROFILE=1) kerül a naplóba.
+    """
+
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.records = []
+        self.ready_at = None
+
+    def record(self, name, started, elapsed, category="phase"):
+        self.records.append((category, name, started - PROCESS_START, elapsed))
+
+    @contextmanager
+    def phase(self, name, category="phase"):
+        """Egy fázis idejének mérése: `with profiler.phase("migrációk"): ...`"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, started, time.perf_counter() - started, category)
+
+    def mark_ready(self):
+        """Rögzíti, mikor lett a bot először kész parancsok fogadására."""
+        if self.ready_at is None:
+            self.ready_at = time.perf_counter() - PROCESS_START
+        return self.ready_at
+
+    def report(self):
+        lines = []
+        if self.ready_at is not None:
+            lines.append(f"Indulási profil: {self.ready_at:.3f} s a folyamat indulásától az első parancsig.")
+        else:
+            lines.append("Indulási profil:")
+        lines.append(f"  {'típus':<8} {'név':<32} {'kezdet (s)':>11} {'idő (ms)':>10}")
+        for category, name, offset, elapsed in sorted(self.records, key=lambda record: record[2]):
+            lines.append(f"  {category:<8} {name:<32} {offset:>11.3f} {elapsed * 1000:>10.1f}")
+        return "\n".join(lines)
+
+    def log_report(self):
+        if self.enabled:
+            logging.info(self.report())
@@ -0,0 +1,235 @@
+# runtime_metrics.py
+import asyncio
+import logging
+import os
+import time
+from collections import Counter
+from aiohttp import web
+from discord import app_commands
+import db_metrics
+from metrics import Histogram
+
+# Az eseményhurok késésének mérési időköze (másodperc)
+LOOP_LAG_INTERVAL = float(os.getenv("LOOP_LAG_INTERVAL", "0.5"))
+
+# Az interakció extras szótárában az indulási idő kulcsa
+_STARTED_KEY = "metrics_started"
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def _labels(labels):
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + "}" if labels else ""
+
+
+def _histogram_lines(name, labels, histogram):
+    lines = []
+    for bound, cumulative in histogram.cumulative_buckets():
+        le = "+Inf" if bound == float("inf") else repr(bound)
+        lines.append(f"{name}_bucket{_labels({**labels, 'le': le})} {cumulative}")
+    lines.append(f"{name}_sum{_labels(labels)} {histogram.sum}")
+    lines.append(f"{name}_count{_labels(labels)} {histogram.count}")
+    return lines
+
+
+class RuntimeMetrics:
+    """
+    A bot saját futásidejű mérései: parancsok és eseménykezelők késése, hibák, eseményhurok késés.
+    The bot's runtime self-metrics: per-command and per-listener latency, errors and event-loop lag.
+
+    A parancsok ideje a globális interakció ellenőrzéstől a befejezésig (vagy
+    hibáig) tart; a kezelőké a MyBot._run_event hívásból mérődik, kezelőnként
+    külön. A hurok késését egy `lag_interval` időközzel alvó feladat méri az
+    alvás túlfutásából. Az adatok a /stats runtime paranccsal és opcionálisan
+    egy helyi HTTP végponton, Prometheus szöveges formátumban érhetők el; a
+    további értékek a gauge() hívással regisztrálhatók.
+    """
+
+    def __init__(self, *, lag_interval=LOOP_LAG_INTERVAL):
+        self.lag_interval = lag_interval
+        self.commands = {}
+        self.command_errors = Counter()
+        self.command_rejected = Counter()
+        self.listeners = {}
+        self.listener_errors = Counter()
+        self.loop_lag = Histogram()
+        # A legutóbbi mérés (másodperc), None az első előtt; a HostMetrics mintái is ezt olvassák
+        self.last_loop_lag = None
+        self._gauges = {}
+        self._probe = None
+        self._runner = None
+
+    def gauge(self, name, description, read):
+        """Pillanatnyi érték regisztrálása a Prometheus kimenethez; a `read()` None esetén kimarad."""
+        self._gauges[name] = (description, read)
+
+    async def start(self, port=0, host="127.0.0.1"):
+        """Elindítja a hurok késés mérését, és ha `port` nem 0, a /metrics végpontot."""
+        if self._probe is None:
+            self._probe = asyncio.create_task(self._probe_loop(), name="loop-lag-probe")
+        if port and self._runner is None:
+            app = web.Application()
+            app.router.add_get("/metrics", self._handle_metrics)
+            runner = web.AppRunner(app, access_log=None)
+            await runner.setup()
+            try:
+                await web.TCPSite(runner, host, port).start()
+            except OSError as e:
+                logging.error(f"A metrika végpont nem indítható ({host}:{port}): {e}")
+                await runner.cleanup()
+                return
+            self._runner = runner
+            logging.info(f"Prometheus metrika végpont: http://{host}:{port}/metrics")
+
+    async def stop(self):
+        if self._probe is not None:
+            self._probe.cancel()
+            await asyncio.gather(self._probe, return_exceptions=True)
+            self._probe = None
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def _probe_loop(self):
+        while True:
+            started = time.perf_counter()
+            await asyncio.sleep(self.lag_interval)
+            self.last_loop_lag = max(0.0, time.perf_counter() - started - self.lag_interval)
+            self.loop_lag.observe(self.last_loop_lag)
+
+    # --- Parancsok ---
+
+    def command_started(self, interaction):
+        """Az interakció ellenőrzés elején hívódik; csak az első hívás számít."""
+        interaction.extras.setdefault(_STARTED_KEY, time.perf_counter())
+
+    def command_finished(self, interaction, error=None):
+        """Rögzíti a parancs idejét; a CheckFailure elutasításként, minden más hibaként számít."""
+        started = interaction.extras.pop(_STARTED_KEY, None)
+        if started is None:
+            return
+        command = interaction.command
+        name = command.qualified_name if command is not None else "ismeretlen"
+        histogram = self.commands.get(name)
+        if histogram is None:
+            histogram = self.commands[name] = Histogram()
+        histogram.observe(time.perf_counter() - started)
+        if error is None:
+            return
+        if isinstance(error, app_commands.CheckFailure):
+            self.command_rejected[name] += 1
+        else:
+            self.command_errors[name] += 1
+
+    def command_check_failed(self, interaction):
+        """
+        A globális ellenőrzés által elutasított parancs rögzítése.
+        discord.py ilyenkor sem hibakezelőt, sem befejezés eseményt nem hív.
+        """
+        self.command_finished(interaction, app_commands.CheckFailure())
+
+    # --- Eseménykezelők ---
+
+    def timed_listener(self, coro, event_name):
+        """A kezelőt mérő burkoló; a kivételt továbbdobja, hogy az on_error változatlanul fusson."""
+        key = (event_name, getattr(coro, "__qualname__", repr(coro)))
+        histogram = self.listeners.get(key)
+        if histogram is None:
+            histogram = self.listeners[key] = Histogram()
+
+        async def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return await coro(*args, **kwargs)
+            except Exception:
+                self.listener_errors[key] += 1
+                raise
+            finally:
+                histogram.observe(time.perf_counter() - started)
+
+        return wrapper
+
+    # --- Kimenetek ---
+
+    def snapshot(self):
+        """Parancsonkénti és kezelőnkénti statisztikák hibaszámokkal, valamint a hurok késése."""
+        commands = [
+            {"name": name, "errors": self.command_errors[name], "rejected": self.command_rejected[name], **histogram.snapshot()}
+            for name, histogram in self.commands.items()
+        ]
+        commands.sort(key=lambda row: row["count"], reverse=True)
+        listeners = [
+            {"event": event, "listener": listener, "errors": self.listener_errors[(event, listener)], **histogram.snapshot()}
+            for (event, listener), histogram in self.listeners.items() if histogram.count
+        ]
+        # A kezelők sorrendje a teljes elhasznált idő, mert a gyakori, gyors kezelők is terhelhetik a hurkot
+        listeners.sort(key=lambda row: row["sum"], reverse=True)
+        return {"commands": commands, "listeners": listeners, "loop_lag": self.loop_lag.snapshot()}
+
+    def render_prometheus(self):
+        """Az összes mérés Prometheus szöveges formátumban (0.0.4)."""
+        lines = [
+            "# HELP discord_bot_command_duration_seconds App command latency from the interaction check to completion.",
+            "# TYPE discord_bot_command_duration_seconds histogram",
+        ]
+        for name, histogram in sorted(self.commands.items()):
+            lines += _histogram_lines("discord_bot_command_duration_seconds", {"command": name}, histogram)
+        lines += [
+            "# HELP discord_bot_command_errors_total Failed app commands; kind=rejected counts failed checks.",
+            "# TYPE discord_bot_command_errors_total counter",
+        ]
+        for name in sorted(self.commands):
+            lines.append(f"discord_bot_command_errors_total{_labels({'command': name, 'kind': 'error'})} {self.command_errors[name]}")
+            lines.append(f"discord_bot_command_errors_total{_labels({'command': name, 'kind': 'rejected'})} {self.command_rejected[name]}")
+
+        lines += [
+            "# HELP discord_bot_listener_duration_seconds Gateway event listener latency.",
+            "# TYPE discord_bot_listener_duration_seconds histogram",
+        ]
+        for (event, listener), histogram in sorted(self.listeners.items()):
+            lines += _histogram_lines("discord_bot_listener_duration_seconds", {"event": event, "listener": listener}, histogram)
+        lines += [
+            "# HELP discord_bot_listener_errors_total Gateway event listeners that raised.",
+            "# TYPE discord_bot_listener_errors_total counter",
+        ]
+        for (event, listener) in sorted(self.listeners):
+            lines.append(f"discord_bot_listener_errors_total{_labels({'event': event, 'listener': listener})} {self.listener_errors[(event, listener)]}")
+
+        lines += [
+            "# HELP discord_bot_event_loop_lag_seconds Oversleep of a periodic probe task.",
+            "# TYPE discord_bot_event_loop_lag_seconds histogram",
+        ]
+        lines += _histogram_lines("discord_bot_event_loop_lag_seconds", {}, self.loop_lag)
+
+        lines += [
+            "# HELP discord_bot_db_query_duration_seconds Latency of database helpers.",
+            "# TYPE discord_bot_db_query_duration_seconds histogram",
+        ]
+        for name, histogram in sorted(db_metrics.query_stats.items()):
+            if histogram.count:
+                lines += _histogram_lines("discord_bot_db_query_duration_seconds", {"function": name}, histogram)
+        lines += [
+            "# HELP discord_bot_db_cache_hits_total Database helper calls served without running SQL.",
+            "# TYPE discord_bot_db_cache_hits_total counter",
+        ]
+        for name, hits in sorted(db_metrics.cache_hits.items()):
+            lines.append(f"discord_bot_db_cache_hits_total{_labels({'function': name})} {hits}")
+
+        for name, (description, read) in self._gauges.items():
+            try:
+                value = read()
+            except Exception as e:
+                logging.warning(f"A(z) {name} metrika nem olvasható: {e}")
+                continue
+            if value is None:
+                continue
+            lines += [f"# HELP {name} {description}", f"# TYPE {name} gauge", f"{name} {value}"]
+        return "\n".join(lines) + "\n"
+
+    async def _handle_metrics(self, request):
+        return web.Response(
+            body=self.render_prometheus().encode(),
+            headers={"Content-Type": "text/plain; version=0.0.4; charset=utf-8"}
+        )
@@ -0,0 +1,6 @@
+# tests/conftest.py
+import os
+import sys
+
+# A tesztek a repó gyökeréből importálják a modulokat, ahogy a bot és a benchmarkok is
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
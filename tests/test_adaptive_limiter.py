@@ -0,0 +1,71 @@
+# tests/test_adaptive_limiter.py
+import asyncio
+import time
+
+from adaptive_limiter import AdaptiveLimiter
+
+
+def test_concurrency_never_exceeds_limit():
+    limiter = AdaptiveLimiter(initial=3, maximum=3)
+    peak = 0
+
+    async def call():
+        nonlocal peak
+        async with limiter.slot():
+            peak = max(peak, limiter.active)
+            await asyncio.sleep(0.001)
+
+    async def main():
+        await asyncio.gather(*(call() for _ in range(30)))
+
+    asyncio.run(main())
+    assert peak == 3
+    assert limiter.active == 0
+    assert limiter.calls == 30
+
+
+def test_successful_calls_grow_limit_additively():
+    limiter = AdaptiveLimiter(initial=4, maximum=16)
+    for _ in range(4):
+        limiter._record(0.0)
+    # Négy sikeres hívás 4-nél nagyjából +1
+    assert 4.9 < limiter.limit < 5.0
+    for _ in range(1000):
+        limiter._record(0.0)
+    assert limiter.limit == 16
+    assert limiter.peak == 16
+
+
+def test_throttle_halves_once_per_cooldown():
+    limiter = AdaptiveLimiter(initial=8, minimum=1, cooldown=60.0)
+    limiter.throttle()
+    limiter.throttle()
+    assert limiter.limit == 4
+    assert limiter.throttled == 2
+
+
+def test_limit_does_not_drop_below_minimum():
+    limiter = AdaptiveLimiter(initial=2, minimum=1, cooldown=0.0)
+    for _ in range(5):
+        limiter.throttle()
+    assert limiter.limit == 1
+
+
+def test_slow_call_counts_as_rate_limit():
+    limiter = AdaptiveLimiter(initial=8, slow_threshold=0.5)
+    limiter._record(1.0)
+    assert limiter.limit == 4
+    assert limiter.throttled == 1
+
+
+def test_retry_after_pauses_new_calls():
+    limiter = AdaptiveLimiter(initial=4)
+    limiter.throttle(retry_after=0.05)
+
+    async def call():
+        started = time.monotonic()
+        async with limiter.slot():
+            return time.monotonic() - started
+
+    waited = asyncio.run(call())
+    assert waited >= 0.04
@@ -0,0 +1,89 @@
+# tests/test_burst_deleter.py
+import asyncio
+from types import SimpleNamespace
+
+from moderation_pipeline import BULK_DELETE_LIMIT, BurstDeleter
+
+
+class FakeChannel:
+    def __init__(self, channel_id, delay=0.0):
+        self.id = channel_id
+        self.delay = delay
+        self.deleted = []
+        self.sent = []
+
+    async def delete_messages(self, messages, **kwargs):
+        await asyncio.sleep(self.delay)
+        assert len(messages) <= BULK_DELETE_LIMIT
+        self.deleted.append(len(messages))
+
+    async def send(self, content, **kwargs):
+        self.sent.append(content)
+
+
+def make_message(channel, index):
+    async def delete():
+        await asyncio.sleep(channel.delay)
+        channel.deleted.append(1)
+
+    return SimpleNamespace(
+        channel=channel, guild=SimpleNamespace(id=channel.id, name=f"szerver {channel.id}"),
+        author=SimpleNamespace(mention=f"<@{index}>"), delete=delete,
+    )
+
+
+MATCH = SimpleNamespace(word="tiltott")
+
+
+def test_add_does_not_wait_for_rest_calls():
+    async def main():
+        burst = BurstDeleter(window=0.05)
+        slow = FakeChannel(1, delay=0.5)
+        fast = FakeChannel(2)
+        burst.add(make_message(slow, 0), MATCH)
+        # A lassú csatorna törlése fut, a másik szerver üzenete mégis azonnal sorra kerül
+        burst.add(make_message(fast, 1), MATCH)
+        await asyncio.sleep(0.05)
+        assert fast.deleted == [1]
+        assert slow.deleted == []
+        await burst.flush_all()
+        assert slow.deleted == [1]
+
+    asyncio.run(main())
+
+
+def test_burst_is_deleted_in_one_call_with_one_warning():
+    async def main():
+        burst = BurstDeleter(window=0.05)
+        channel = FakeChannel(1)
+        # Egy köteg üzenetei még a kiküldés indulása előtt összegyűlnek
+        for index in range(20):
+            burst.add(make_message(channel, index), MATCH)
+        await asyncio.sleep(0.01)
+        # Az ablakon belül érkezők az ablak végén együtt mennek
+        for index in range(20, 30):
+            burst.add(make_message(channel, index), MATCH)
+            await asyncio.sleep(0)
+        await asyncio.sleep(0.2)
+        return burst, channel
+
+    burst, channel = asyncio.run(main())
+    assert channel.deleted == [20, 10]
+    assert len(channel.sent) == 2
+    assert burst.stats()["api_calls"] == 4
+    assert burst.stats()["api_calls_saved"] == 56
+
+
+def test_messages_arriving_during_a_send_are_chunked():
+    async def main():
+        burst = BurstDeleter(window=0.01)
+        channel = FakeChannel(1, delay=0.05)
+        burst.add(make_message(channel, 0), MATCH)
+        for index in range(1, 2 * BULK_DELETE_LIMIT + 11):
+            burst.add(make_message(channel, index), MATCH)
+        await burst.flush_all()
+        return channel
+
+    channel = asyncio.run(main())
+    assert sum(channel.deleted) == 2 * BULK_DELETE_LIMIT + 11
+    assert max(channel.deleted) <= BULK_DELETE_LIMIT
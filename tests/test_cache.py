@@ -0,0 +1,72 @@
+# tests/test_cache.py
+from cache import GuildCache, LRUCache
+
+
+def test_guild_cache_counts_hits_and_misses():
+    cache = GuildCache("teszt")
+    assert cache.get(1) is None
+    cache.set(1, {"szó"})
+    assert cache.get(1) == {"szó"}
+    assert cache.peek(1) == {"szó"}
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_guild_cache_rejects_stale_load():
+    cache = GuildCache("teszt")
+    generation = cache.generation(1)
+    # Betöltés közben írás történik
+    cache.set(1, {"új"})
+    assert not cache.set_if_current(1, {"régi"}, generation)
+    assert cache.peek(1) == {"új"}
+
+
+def test_guild_cache_invalidate_drops_value_and_bumps_generation():
+    cache = GuildCache("teszt")
+    cache.set(1, {"szó"})
+    generation = cache.generation(1)
+    cache.invalidate(1)
+    assert 1 not in cache
+    assert cache.generation(1) == generation + 1
+    assert cache.set_if_current(1, {"friss"}, cache.generation(1))
+    assert cache.peek(1) == {"friss"}
+
+
+def test_lru_cache_evicts_least_recently_used():
+    cache = LRUCache("teszt", maxsize=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+    assert "b" not in cache
+    assert "a" in cache and "c" in cache
+    assert cache.evictions == 1
+
+
+def test_lru_cache_peek_does_not_refresh_order():
+    cache = LRUCache("teszt", maxsize=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.peek("a") == 1
+    cache.set("c", 3)
+    assert "a" not in cache
+
+
+def test_lru_cache_expires_entries(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("cache.time.monotonic", lambda: now[0])
+    cache = LRUCache("teszt", maxsize=10, ttl=5)
+    cache.set("a", 1)
+    now[0] += 4.9
+    assert cache.get("a") == 1
+    now[0] += 0.2
+    assert cache.peek("a") is None
+    assert cache.get("a") is None
+    assert cache.expirations == 1
+
+
+def test_lru_cache_rejects_stale_load():
+    cache = LRUCache("teszt", maxsize=10)
+    generation = cache.generation("a")
+    cache.invalidate("a")
+    assert not cache.set_if_current("a", 1, generation)
+    assert cache.get("a") is None
@@ -0,0 +1,51 @@
+# tests/test_db_metrics.py
+import asyncio
+import logging
+
+import db_metrics
+from db_metrics import timed_query
+
+
+def _run_statement(query):
+    # A TracingCursor.execute ugyanígy ír az aktuális mért hívás listájába
+    db_metrics._statements.get().append((query, None, 0.001))
+
+
+@timed_query
+async def _inner_lookup(cached):
+    if not cached:
+        _run_statement("SELECT word FROM bad_words")
+    return cached
+
+
+@timed_query
+async def _outer_lookup(cached):
+    return await _inner_lookup(cached)
+
+
+def test_outer_slow_log_includes_nested_statements(monkeypatch, caplog):
+    monkeypatch.setattr(db_metrics, "SLOW_QUERY_THRESHOLD", 0.0)
+    with caplog.at_level(logging.WARNING):
+        asyncio.run(_outer_lookup(False))
+
+    outer = [record.getMessage() for record in caplog.records if "_outer_lookup" in record.getMessage()]
+    assert len(outer) == 1
+    assert "SELECT word FROM bad_words" in outer[0]
+    assert "SQL: 1.0 ms" in outer[0]
+
+
+def test_cache_hits_are_not_recorded_as_latency():
+    inner = db_metrics.query_stats["_inner_lookup"]
+    count = inner.count
+    hits = db_metrics.cache_hits["_outer_lookup"]
+
+    asyncio.run(_outer_lookup(True))
+
+    assert inner.count == count
+    assert db_metrics.cache_hits["_outer_lookup"] == hits + 1
+    assert db_metrics.cache_hits["_inner_lookup"] >= 1
+
+
+def test_statement_list_is_unbound_after_call():
+    asyncio.run(_outer_lookup(False))
+    assert db_metrics._statements.get() is None
@@ -0,0 +1,171 @@
+# tests/test_feed_poller.py
+import asyncio
+from datetime import datetime
+
+import pytest
+
+from feed_poller import FeedParser, FeedPoller, FeedState, parse_published
+
+HEADER = (
+    '<?xml version="1.0" encoding="UTF-8"?>\n'
+    '<feed xmlns:yt="http://www.youtube.com/xml/schemas/2015" xmlns="http://www.w3.org/2005/Atom">'
+    "<title>Csatorna</title>"
+)
+
+
+def entry(video_id, published):
+    return (
+        f"<entry><yt:videoId>{video_id}</yt:videoId><title>Videó {video_id}</title>"
+        f'<link rel="alternate" href="https://www.youtube.com/watch?v={video_id}"/>'
+        f"<author><name>Csatorna</name></author><published>{published}</published></entry>"
+    )
+
+
+def feed(*entries):
+    return (HEADER + "".join(entries) + "</feed>").encode()
+
+
+FEED = feed(
+    entry("uj000000002", "2024-05-03T12:00:00+00:00"),
+    entry("uj000000001", "2024-05-02T14:00:00+02:00"),
+    entry("regi0000000", "2024-05-01T12:00:00+00:00"),
+)
+
+
+def test_parse_published_converts_to_naive_utc():
+    assert parse_published("2024-05-02T14:00:00+02:00") == datetime(2024, 5, 2, 12, 0)
+
+
+def test_parser_yields_entries_across_chunk_boundaries():
+    parser = FeedParser()
+    entries = []
+    for start in range(0, len(FEED), 7):
+        entries += parser.feed(FEED[start:start + 7])
+    parser.close()
+    assert [item.video_id for item in entries] == ["uj000000002", "uj000000001", "regi0000000"]
+    assert entries[1].published == datetime(2024, 5, 2, 12, 0)
+    assert entries[0].link == "https://www.youtube.com/watch?v=uj000000002"
+    assert entries[0].author == "Csatorna"
+
+
+class FakeContent:
+    def __init__(self, body):
+        self._body = body
+        self.read = 0
+
+    async def iter_chunked(self, size):
+        for start in range(0, len(self._body), 64):
+            self.read += 1
+            yield self._body[start:start + 64]
+
+
+class FakeResponse:
+    def __init__(self, status, body=b"", headers=None):
+        self.status = status
+        self.content = FakeContent(body)
+        self.headers = headers or {}
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        pass
+
+    def raise_for_status(self):
+        if self.status >= 400:
+            raise RuntimeError(f"HTTP {self.status}")
+
+
+class FakeSession:
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.requests = []
+
+    def get(self, url, headers):
+        self.requests.append((url, headers))
+        return self.responses.pop(0)
+
+
+def make_poller(*responses):
+    handled, saved = [], []
+
+    async def handler(state, entries):
+        handled.extend(item.video_id for item in entries)
+
+    async def saver(state):
+        saved.append((state.etag, state.last_modified, state.last_published))
+
+    poller = FeedPoller(handler, saver, url="http://feed.test/?channel_id={channel_id}")
+    poller._session = FakeSession(*responses)
+    return poller, handled, saved
+
+
+def test_poll_hands_over_only_new_entries_oldest_first():
+    poller, handled, saved = make_poller(FakeResponse(200, FEED, {"ETag": '"v2"', "Last-Modified": "Fri, 03 May 2024 12:00:00 GMT"}))
+    state = FeedState("UCcsatorna", last_published=datetime(2024, 5, 1, 12, 0))
+    asyncio.run(poller.poll(state))
+    assert handled == ["uj000000001", "uj000000002"]
+    assert saved == [('"v2"', "Fri, 03 May 2024 12:00:00 GMT", datetime(2024, 5, 3, 12, 0))]
+    assert poller._session.requests[0][0] == "http://feed.test/?channel_id=UCcsatorna"
+
+
+def test_poll_sends_validators_and_skips_304():
+    poller, handled, saved = make_poller(FakeResponse(304))
+    state = FeedState("UCcsatorna", etag='"v2"', last_modified="Fri, 03 May 2024 12:00:00 GMT",
+                      last_published=datetime(2024, 5, 3, 12, 0))
+    assert asyncio.run(poller.poll(state)) == []
+    assert poller._session.requests[0][1] == {"If-None-Match": '"v2"', "If-Modified-Since": "Fri, 03 May 2024 12:00:00 GMT"}
+    assert (handled, saved, poller.not_modified) == ([], [], 1)
+
+
+def test_first_poll_only_records_baseline():
+    poller, handled, saved = make_poller(FakeResponse(200, FEED, {"ETag": '"v2"'}))
+    state = FeedState("UCcsatorna")
+    asyncio.run(poller.poll(state))
+    assert handled == []
+    assert state.last_published == datetime(2024, 5, 3, 12, 0)
+    assert len(saved) == 1
+
+
+def test_poll_stops_reading_at_the_first_seen_entry():
+    padding = entry("regi0000001", "2024-04-01T12:00:00+00:00") * 50
+    body = feed(entry("uj000000002", "2024-05-03T12:00:00+00:00"), entry("regi0000000", "2024-05-01T12:00:00+00:00"), padding)
+    response = FakeResponse(200, body, {"ETag": '"v2"'})
+    poller, handled, _ = make_poller(response)
+    asyncio.run(poller.poll(FeedState("UCcsatorna", last_published=datetime(2024, 5, 1, 12, 0))))
+    assert handled == ["uj000000002"]
+    assert response.content.read < len(body) / 64 / 2
+
+
+def test_failed_handler_keeps_state_for_retry():
+    poller, _, saved = make_poller(FakeResponse(200, FEED, {"ETag": '"v2"'}))
+
+    async def failing_handler(state, entries):
+        raise RuntimeError("Discord nem elérhető")
+
+    poller.handler = failing_handler
+    state = FeedState("UCcsatorna", etag='"v1"', last_published=datetime(2024, 5, 1, 12, 0))
+    with pytest.raises(RuntimeError):
+        asyncio.run(poller.poll(state))
+    assert state.etag == '"v1"'
+    assert state.last_published == datetime(2024, 5, 1, 12, 0)
+    assert saved == []
+
+
+def test_truncated_feed_raises():
+    poller, handled, saved = make_poller(FakeResponse(200, FEED[:-20]))
+    with pytest.raises(Exception):
+        asyncio.run(poller.poll(FeedState("UCcsatorna", last_published=datetime(2024, 1, 1))))
+    assert saved == []
+
+
+def test_shard_scope_keys_feed_state_per_worker():
+    import bot as bot_module
+
+    async def build(**kwargs):
+        instance = bot_module.MyBot(None, **kwargs)
+        await instance.host_metrics.stop()
+        return instance
+
+    assert asyncio.run(build()).shard_scope == "all"
+    assert asyncio.run(build(shard_ids=[4, 5, 6, 7], shard_count=16)).shard_scope == "4-7/16"
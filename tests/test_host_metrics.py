@@ -0,0 +1,66 @@
+# tests/test_host_metrics.py
+import asyncio
+
+from host_metrics import PAGE_SIZE, HostMetrics, HostSample
+from runtime_metrics import RuntimeMetrics
+
+
+def write_proc(root, busy, idle, available_kb, rss_pages):
+    (root / "self").mkdir(exist_ok=True)
+    (root / "stat").write_text(f"cpu  {busy} 0 0 {idle} 0 0 0 0 0 0\ncpu0 1 0 0 1 0 0 0 0 0 0\n")
+    (root / "meminfo").write_text(f"MemTotal:       1000 kB\nMemFree:         100 kB\nMemAvailable:    {available_kb} kB\n")
+    (root / "self" / "statm").write_text(f"5000 {rss_pages} 100 1 0 200 0\n")
+
+
+def test_sample_reads_cpu_delta_memory_and_rss(tmp_path):
+    write_proc(tmp_path, busy=100, idle=900, available_kb=400, rss_pages=10)
+    metrics = HostMetrics(interval=5, size=10, proc_root=tmp_path)
+    assert metrics.sample().cpu_percent is None
+
+    # A fájlok nyitva maradnak; az új tartalmat a következő minta látja
+    write_proc(tmp_path, busy=175, idle=925, available_kb=250, rss_pages=20)
+    sample = metrics.sample(loop_lag=0.01)
+    assert sample.cpu_percent == 75.0
+    assert (sample.mem_used, sample.mem_total) == (750 * 1024, 1000 * 1024)
+    assert sample.mem_percent == 75.0
+    assert sample.rss == 20 * PAGE_SIZE
+    assert sample.loop_lag == 0.01
+    metrics._reader.close()
+
+
+def test_missing_proc_keeps_loop_lag_only(tmp_path):
+    metrics = HostMetrics(proc_root=tmp_path / "nincs")
+    sample = metrics.sample(0.5)
+    assert sample.cpu_percent is None and sample.rss is None
+    assert sample.loop_lag == 0.5
+
+
+def test_ring_buffer_and_window_average():
+    metrics = HostMetrics(interval=5, size=3, proc_root="/nincs")
+    for index, cpu in enumerate([10.0, 20.0, 30.0, 40.0]):
+        metrics.samples.append(HostSample(1000.0 + index * 5, cpu, None, None, None, 0.0))
+    assert len(metrics.samples) == 3
+    assert metrics.latest().cpu_percent == 40.0
+    assert metrics.average(5)["cpu_percent"] == 40.0
+    assert metrics.average(10)["cpu_percent"] == 35.0
+    assert metrics.average(60)["cpu_percent"] == 30.0
+    assert metrics.average(60)["mem_percent"] is None
+
+
+def test_sampler_reads_loop_lag_from_runtime_probe():
+    runtime = RuntimeMetrics()
+    metrics = HostMetrics(loop_lag=lambda: runtime.last_loop_lag, interval=0.01, proc_root="/nincs")
+
+    async def main():
+        metrics.start()
+        await asyncio.sleep(0.035)
+        runtime.last_loop_lag = 0.02
+        await asyncio.sleep(0.035)
+        await metrics.stop()
+
+    asyncio.run(main())
+    lags = [sample.loop_lag for sample in metrics.samples]
+    # Az első mérés előtt nincs érték; utána a minták a probe legutóbbi értékét rögzítik, saját mérés nélkül
+    assert lags[0] is None
+    assert lags[-1] == 0.02
+    assert set(lags) == {None, 0.02}
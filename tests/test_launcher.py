@@ -0,0 +1,21 @@
+# tests/test_launcher.py
+import pytest
+
+from launcher import shard_ranges
+
+
+@pytest.mark.parametrize("shard_count, worker_count", [(1, 1), (16, 4), (10, 3), (7, 7), (5, 8), (3, 0)])
+def test_ranges_cover_every_shard_once(shard_count, worker_count):
+    ranges = shard_ranges(shard_count, worker_count)
+    assert [shard for shard_range in ranges for shard in shard_range] == list(range(shard_count))
+    assert all(shard_range == list(range(shard_range[0], shard_range[-1] + 1)) for shard_range in ranges)
+
+
+def test_ranges_are_near_equal():
+    sizes = [len(shard_range) for shard_range in shard_ranges(10, 3)]
+    assert sizes == [4, 3, 3]
+
+
+def test_workers_never_exceed_shards():
+    assert len(shard_ranges(2, 8)) == 2
+    assert shard_ranges(3, 0) == [[0, 1, 2]]
@@ -0,0 +1,70 @@
+# tests/test_metrics.py
+import asyncio
+
+import pytest
+
+from db_pool import InstrumentedPool
+from metrics import Histogram
+
+
+def test_empty_histogram():
+    histogram = Histogram()
+    assert histogram.snapshot()["p99"] == 0.0
+    assert histogram.mean == 0.0
+
+
+def test_percentiles_stay_within_bucket_bounds():
+    histogram = Histogram((1, 2, 5, 10))
+    for value in [0.5] * 50 + [1.5] * 40 + [7] * 9 + [20]:
+        histogram.observe(value)
+    assert 0 < histogram.percentile(0.5) <= 1
+    assert 1 < histogram.percentile(0.9) <= 2
+    assert 5 < histogram.percentile(0.99) <= 10
+    assert histogram.percentile(1.0) == 20
+    assert histogram.mean == pytest.approx((25 + 60 + 63 + 20) / 100)
+
+
+def test_percentile_is_capped_at_max():
+    histogram = Histogram((1, 10))
+    histogram.observe(2)
+    assert histogram.percentile(0.99) <= 2
+
+
+def test_cumulative_buckets_end_with_inf():
+    histogram = Histogram((1, 2))
+    for value in (0.5, 1.5, 3):
+        histogram.observe(value)
+    assert list(histogram.cumulative_buckets()) == [(1, 1), (2, 2), (float("inf"), 3)]
+
+
+class FakeAiomysqlPool:
+    minsize, maxsize = 1, 1
+
+    def __init__(self):
+        self._free = asyncio.Queue()
+        self._free.put_nowait("kapcsolat")
+
+    async def acquire(self):
+        return await self._free.get()
+
+    async def release(self, conn):
+        self._free.put_nowait(conn)
+
+
+def test_pool_counts_waiters_and_timeouts():
+    pool = InstrumentedPool(FakeAiomysqlPool(), acquire_timeout=0.02)
+
+    async def main():
+        async with pool.acquire() as conn:
+            assert conn == "kapcsolat"
+            assert pool.in_use == 1
+            with pytest.raises(asyncio.TimeoutError):
+                async with pool.acquire():
+                    pass
+            assert pool.max_waiting == 1
+        async with pool.acquire():
+            pass
+
+    asyncio.run(main())
+    assert (pool.acquires, pool.timeouts, pool.in_use, pool.waiting) == (2, 1, 0, 0)
+    assert pool.wait_times.count == 2
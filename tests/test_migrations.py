@@ -0,0 +1,86 @@
+# tests/test_migrations.py
+import asyncio
+
+import migrations
+from migrations import MIGRATIONS, Migration, run_migrations
+
+
+def test_versions_are_contiguous_and_ascending():
+    assert [migration.version for migration in MIGRATIONS] == list(range(1, len(MIGRATIONS) + 1))
+    assert all(migration.statements for migration in MIGRATIONS)
+
+
+def test_create_statements_are_idempotent():
+    for migration in MIGRATIONS:
+        for statement in migration.statements:
+            if statement.startswith("CREATE TABLE"):
+                assert statement.startswith("CREATE TABLE IF NOT EXISTS"), migration.description
+
+
+class FakeCursor:
+    def __init__(self, version):
+        self.version = version
+        self.executed = []
+        self._row = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        pass
+
+    async def execute(self, query, args=None):
+        self.executed.append(query)
+        if query.startswith("SELECT MAX(version)"):
+            self._row = (self.version,)
+        elif query.startswith("SELECT GET_LOCK"):
+            self._row = (1,)
+        elif query.startswith("INSERT INTO schema_version"):
+            self.version = args[0]
+
+    async def fetchone(self):
+        return self._row
+
+
+class FakePool:
+    def __init__(self, cursor):
+        self._cursor = cursor
+
+    def acquire(self):
+        return self
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        pass
+
+    def cursor(self, *cursor_classes):
+        return self._cursor
+
+
+TEST_MIGRATIONS = (
+    Migration(1, "első", ("CREATE TABLE IF NOT EXISTS a (id INT)",)),
+    Migration(2, "második", ("ALTER TABLE a ADD COLUMN b INT", "ALTER TABLE a ADD COLUMN c INT")),
+    Migration(3, "harmadik", ("CREATE TABLE IF NOT EXISTS d (id INT)",)),
+)
+
+
+def test_up_to_date_schema_runs_one_query():
+    cursor = FakeCursor(version=3)
+    assert asyncio.run(run_migrations(FakePool(cursor), TEST_MIGRATIONS)) == 3
+    assert len(cursor.executed) == 1
+
+
+def test_pending_migrations_run_in_order_under_lock():
+    cursor = FakeCursor(version=1)
+    assert asyncio.run(run_migrations(FakePool(cursor), TEST_MIGRATIONS)) == 3
+    statements = [query for query in cursor.executed if not query.startswith(("SELECT", "INSERT INTO schema_version"))]
+    assert statements == [
+        migrations.SCHEMA_VERSION_TABLE,
+        "ALTER TABLE a ADD COLUMN b INT",
+        "ALTER TABLE a ADD COLUMN c INT",
+        "CREATE TABLE IF NOT EXISTS d (id INT)",
+    ]
+    assert cursor.executed[1].startswith("SELECT GET_LOCK")
+    assert cursor.executed[-1].startswith("SELECT RELEASE_LOCK")
@@ -0,0 +1,90 @@
+# tests/test_moderation_pipeline.py
+import asyncio
+from types import SimpleNamespace
+
+from moderation_pipeline import ModerationPipeline
+from word_filter import BadWordMatcher
+
+MATCHER = BadWordMatcher(["tiltott"])
+
+
+def message(guild_id, content):
+    return SimpleNamespace(guild=SimpleNamespace(id=guild_id), content=content)
+
+
+def make_pipeline(**kwargs):
+    handled = []
+    batches = []
+
+    async def loader(guild_id):
+        return MATCHER
+
+    async def handler(guild_id, violations):
+        handled.extend((guild_id, item.content, match.word) for item, match in violations)
+
+    pipeline = ModerationPipeline(loader, handler, **kwargs)
+    original = pipeline._process
+
+    async def process(guild_id, batch):
+        batches.append((guild_id, len(batch)))
+        await original(guild_id, batch)
+
+    pipeline._process = process
+    return pipeline, handled, batches
+
+
+def test_violations_are_found_and_batched_per_guild():
+    async def main():
+        pipeline, handled, batches = make_pipeline(workers=1, batch_size=10)
+        for index in range(5):
+            pipeline.enqueue(message(1, f"üzenet {index}"))
+        pipeline.enqueue(message(1, "ez tiltott szó"))
+        pipeline.start()
+        await pipeline.join()
+        await pipeline.stop()
+        return pipeline, handled, batches
+
+    pipeline, handled, batches = asyncio.run(main())
+    assert handled == [(1, "ez tiltott szó", "tiltott")]
+    assert batches == [(1, 6)]
+    assert pipeline.processed == 6
+
+
+def test_busy_guild_does_not_starve_others():
+    async def main():
+        pipeline, _, batches = make_pipeline(workers=1, batch_size=5)
+        for index in range(50):
+            pipeline.enqueue(message(1, f"raid {index}"))
+        pipeline.enqueue(message(2, "csendes szerver"))
+        pipeline.start()
+        await pipeline.join()
+        await pipeline.stop()
+        return batches
+
+    batches = asyncio.run(main())
+    # A második szerver az első köteg után sorra kerül, nem a raid végén
+    assert batches[:2] == [(1, 5), (2, 1)]
+
+
+def test_overload_is_shed_per_guild_and_globally():
+    pipeline, _, _ = make_pipeline(max_size=5, guild_limit=3)
+    accepted = [pipeline.enqueue(message(1, "x")) for _ in range(4)]
+    accepted += [pipeline.enqueue(message(2, "x")) for _ in range(3)]
+    assert accepted == [True, True, True, False, True, True, False]
+    assert pipeline.dropped == {"guild_full": 1, "queue_full": 1}
+    assert len(pipeline) == 5
+
+
+def test_thread_offload_gives_same_results():
+    async def main():
+        pipeline, handled, _ = make_pipeline(workers=2, offload="thread", offload_min_chars=0)
+        pipeline.start()
+        for index in range(20):
+            pipeline.enqueue(message(index % 3, "tiltott" if index % 4 == 0 else "rendben"))
+        await pipeline.join()
+        await pipeline.stop()
+        return pipeline, handled
+
+    pipeline, handled = asyncio.run(main())
+    assert len(handled) == 5
+    assert pipeline.offloaded > 0
@@ -0,0 +1,183 @@
+# tests/test_mute_scheduler.py
+import asyncio
+import time
+from types import SimpleNamespace
+
+import discord
+
+import mute_scheduler
+from cogs import moderation_cog
+from mute_scheduler import ExpiryScheduler
+
+
+def run_scheduler(scheduler, seconds):
+    async def main():
+        scheduler.start()
+        await asyncio.sleep(seconds)
+        await scheduler.stop()
+
+    asyncio.run(main())
+
+
+def test_expired_keys_are_handled_in_order_and_in_batches():
+    batches = []
+
+    async def handler(batch):
+        batches.append(batch)
+
+    scheduler = ExpiryScheduler("teszt", handler, max_batch=2)
+    now = time.time()
+    for index, key in enumerate("abc"):
+        scheduler.schedule(key, now - 1 + index * 0.01)
+    scheduler.schedule("később", now + 60)
+
+    run_scheduler(scheduler, 0.05)
+    assert [[key for key, _ in batch] for batch in batches] == [["a", "b"], ["c"]]
+    assert len(scheduler) == 1
+    assert scheduler.processed == 3
+
+
+def test_reschedule_and_cancel_are_lazy():
+    handled = []
+
+    async def handler(batch):
+        handled.extend(key for key, _ in batch)
+
+    scheduler = ExpiryScheduler("teszt", handler)
+    now = time.time()
+    scheduler.schedule("átütemezett", now - 1)
+    scheduler.schedule("átütemezett", now + 60)
+    scheduler.schedule("törölt", now - 1)
+    assert scheduler.cancel("törölt")
+    assert not scheduler.cancel("törölt")
+
+    run_scheduler(scheduler, 0.05)
+    assert handled == []
+    assert scheduler.next_due() == now + 60
+
+
+def test_earlier_key_wakes_the_sleeping_loop():
+    handled = []
+
+    async def handler(batch):
+        handled.extend(key for key, _ in batch)
+
+    scheduler = ExpiryScheduler("teszt", handler)
+
+    async def main():
+        scheduler.schedule("késői", time.time() + 60)
+        scheduler.start()
+        await asyncio.sleep(0.01)
+        scheduler.schedule("korai", time.time() + 0.02)
+        await asyncio.sleep(0.1)
+        await scheduler.stop()
+
+    asyncio.run(main())
+    assert handled == ["korai"]
+
+
+def test_failed_keys_are_retried(monkeypatch):
+    monkeypatch.setattr(mute_scheduler, "RETRY_DELAY", 0.02)
+    calls = []
+
+    async def handler(batch):
+        calls.append([key for key, _ in batch])
+        return [key for key, _ in batch] if len(calls) == 1 else []
+
+    scheduler = ExpiryScheduler("teszt", handler)
+    scheduler.schedule("a", time.time() - 1)
+    run_scheduler(scheduler, 0.1)
+    assert calls == [["a"], ["a"]]
+    assert scheduler.retries == 1
+    assert scheduler.processed == 1
+
+
+# --- A ModerationCog lejárati kezelője ---
+
+GUILD_ID, USER_ID, ROLE_ID = 10, 20, 30
+
+
+class FakeMember:
+    def __init__(self, role, on_remove=None):
+        self.roles = [role]
+        self.on_remove = on_remove
+
+    async def remove_roles(self, role, reason=None):
+        if self.on_remove is not None:
+            # A REST hívás közben újranémítják a tagot
+            self.on_remove()
+        self.roles.remove(role)
+
+
+def make_cog(monkeypatch, guild):
+    deleted = []
+
+    async def delete_expired_mutes(pool, rows):
+        deleted.extend(rows)
+
+    monkeypatch.setattr(moderation_cog, "delete_expired_mutes", delete_expired_mutes)
+
+    async def wait_until_ready():
+        pass
+
+    cog = moderation_cog.ModerationCog.__new__(moderation_cog.ModerationCog)
+    cog.bot = SimpleNamespace(wait_until_ready=wait_until_ready, get_guild=lambda guild_id: guild)
+    cog.db_pool = None
+    cog.mute_scheduler = ExpiryScheduler("mutes", cog._expire_mutes)
+    cog.mute_roles = {}
+    return cog, deleted
+
+
+def make_guild(member):
+    role = member.roles[0]
+    return SimpleNamespace(id=GUILD_ID, name="szerver", get_role=lambda role_id: role if role_id == ROLE_ID else None,
+                           get_member=lambda user_id: member)
+
+
+def test_expired_mute_removes_role_and_row(monkeypatch):
+    role = discord.Object(ROLE_ID)
+    member = FakeMember(role)
+    cog, deleted = make_cog(monkeypatch, make_guild(member))
+    key = (GUILD_ID, USER_ID)
+    cog.mute_roles[key] = ROLE_ID
+
+    failed = asyncio.run(cog._expire_mutes([(key, 1_700_000_000.0)]))
+    assert failed == []
+    assert member.roles == []
+    assert key not in cog.mute_roles
+    assert deleted == [(GUILD_ID, USER_ID, moderation_cog._utc_datetime(1_700_000_000.0))]
+
+
+def test_mute_renewed_during_expiry_is_kept(monkeypatch):
+    role = discord.Object(ROLE_ID)
+    key = (GUILD_ID, USER_ID)
+    member = FakeMember(role)
+    cog, deleted = make_cog(monkeypatch, make_guild(member))
+    cog.mute_roles[key] = ROLE_ID
+    # Ugyanazt, amit a /mute tesz: új sor, új rang bejegyzés és új lejárat
+    member.on_remove = lambda: (cog.mute_roles.__setitem__(key, ROLE_ID), cog.mute_scheduler.schedule(key, time.time() + 3600))
+
+    failed = asyncio.run(cog._expire_mutes([(key, 1_700_000_000.0)]))
+    assert failed == []
+    assert deleted == []
+    assert cog.mute_roles[key] == ROLE_ID
+    assert key in cog.mute_scheduler
+
+
+def test_unavailable_guild_is_retried(monkeypatch):
+    cog, deleted = make_cog(monkeypatch, None)
+    key = (GUILD_ID, USER_ID)
+    cog.mute_roles[key] = ROLE_ID
+
+    failed = asyncio.run(cog._expire_mutes([(key, 1_700_000_000.0)]))
+    assert failed == [key]
+    assert deleted == []
+    assert cog.mute_roles[key] == ROLE_ID
+
+
+def test_parse_duration():
+    assert moderation_cog.parse_duration("1d12h") == 129600
+    assert moderation_cog.parse_duration(" 30m ") == 1800
+    assert moderation_cog.parse_duration("0s") is None
+    assert moderation_cog.parse_duration("2x") is None
+    assert moderation_cog.parse_duration("400d") is None
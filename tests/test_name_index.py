@@ -0,0 +1,29 @@
+# tests/test_name_index.py
+from name_index import MAX_CHOICES, NameIndex
+
+
+def test_prefix_matches_come_before_substring_matches():
+    index = NameIndex(["Gaming", "hírek", "Game-night", "endgame", "zene"])
+    assert index.search("gam") == ["Game-night", "Gaming", "endgame"]
+
+
+def test_empty_query_lists_names_sorted_case_insensitively():
+    index = NameIndex(["b", "A", "c"])
+    assert index.search("") == ["A", "b", "c"]
+
+
+def test_add_and_remove_are_incremental():
+    index = NameIndex(["alap"])
+    index.add("Alap2")
+    index.add("alap")
+    assert len(index) == 2
+    assert "Alap2" in index
+    index.remove("alap")
+    index.remove("nincs ilyen")
+    assert index.search("al") == ["Alap2"]
+
+
+def test_results_are_capped():
+    index = NameIndex(f"sablon{number}" for number in range(100))
+    assert len(index.search("sablon")) == MAX_CHOICES
+    assert len(index.search("1", limit=5)) == 5
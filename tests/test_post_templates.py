@@ -0,0 +1,112 @@
+# tests/test_post_templates.py
+import asyncio
+
+import pytest
+
+import database
+from post_templates import CompiledTemplate, TemplateError
+
+GUILD_ID = 1234
+
+
+class FakeCursor:
+    """Kis- és nagybetű érzéketlen név egyezés, mint a _ci collation."""
+
+    def __init__(self, rows):
+        self._rows = rows
+        self._result = []
+        self.rowcount = 0
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        pass
+
+    async def execute(self, query, args=None):
+        if query.startswith("SELECT"):
+            self._result = [row for row in self._rows if row["guild_id"] == args[0]]
+        elif query.startswith("DELETE"):
+            before = len(self._rows)
+            self._rows[:] = [row for row in self._rows if not (row["guild_id"] == args[0] and row["name"].lower() == args[1].lower())]
+            self.rowcount = before - len(self._rows)
+
+    async def fetchall(self):
+        return self._result
+
+
+class FakePool:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def acquire(self):
+        return self
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        pass
+
+    def cursor(self, *cursor_classes):
+        return FakeCursor(self.rows)
+
+
+def template_row(name):
+    return {"guild_id": GUILD_ID, "name": name, "embed_title": "{title}", "embed_description": None, "color": "#ff0000", "embed_footer": None}
+
+
+def test_render_fills_fields():
+    template = CompiledTemplate("alap", "Új videó: {title}", "{channel} - {duration}", "#00ff00", "Posztolta: {author}")
+    embed = template.render(title="Cím", link="https://youtu.be/x", description="", author="Bot", channel="Csatorna", duration="3:02")
+    assert embed.title == "Új videó: Cím"
+    assert embed.description == "Csatorna - 3:02"
+    assert embed.footer.text == "Posztolta: Bot"
+    assert embed.color.value == 0x00FF00
+
+
+@pytest.mark.parametrize("title, color", [
+    ("{ismeretlen}", None),
+    ("{title", None),
+    ("{title:{width}}", None),
+    ("{title:d}", None),
+    ("{title}", "#12345"),
+    ("{title}", "zzzzzz"),
+])
+def test_invalid_templates_are_rejected(title, color):
+    with pytest.raises(TemplateError):
+        CompiledTemplate("hibás", title, color=color)
+
+
+def test_delete_template_ignores_name_case_in_caches():
+    pool = FakePool([template_row("foo"), template_row("bar")])
+    database.template_cache.invalidate(GUILD_ID)
+    database.template_name_cache.invalidate(GUILD_ID)
+
+    async def main():
+        assert "foo" in await database.get_compiled_templates(pool, GUILD_ID)
+        assert "foo" in await database.get_template_name_index(pool, GUILD_ID)
+        assert await database.delete_template(pool, GUILD_ID, "Foo")
+        return await database.get_compiled_templates(pool, GUILD_ID), await database.get_template_name_index(pool, GUILD_ID)
+
+    templates, name_index = asyncio.run(main())
+    assert set(templates) == {"bar"}
+    assert name_index.search("f") == []
+    assert name_index.search("b") == ["bar"]
+
+
+def test_compiled_templates_are_keyed_case_insensitively():
+    broken = {**template_row("Rossz"), "embed_title": "{ismeretlen}"}
+    pool = FakePool([template_row("hirek"), broken])
+    database.template_cache.invalidate(GUILD_ID)
+    database.template_name_cache.invalidate(GUILD_ID)
+
+    async def main():
+        return await database.get_compiled_templates(pool, GUILD_ID), await database.get_template_name_index(pool, GUILD_ID)
+
+    templates, name_index = asyncio.run(main())
+    assert templates["Hirek".casefold()].name == "hirek"
+    assert isinstance(templates["ROSSZ".casefold()], TemplateError)
+    assert templates["rossz"].name == "Rossz"
+    # Az autocomplete a tárolt nevet ajánlja
+    assert name_index.search("") == ["hirek", "Rossz"]
@@ -0,0 +1,80 @@
+# tests/test_posted_videos.py
+import asyncio
+
+from database import get_posted_video_ids, mark_video_posted, posted_video_cache
+
+
+class FakeCursor:
+    """A posted_videos tábla; a SELECT a `release` eseményig vár, hogy egy írás közbeékelődhessen."""
+
+    def __init__(self, rows, release=None):
+        self.rows = rows
+        self.release = release
+        self._result = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        pass
+
+    async def execute(self, query, args=None):
+        if query.startswith("SELECT"):
+            self._result = [(video_id,) for guild_id, video_id in self.rows if guild_id == args[0]]
+            if self.release is not None:
+                await self.release.wait()
+        else:
+            self.rows.add((args[0], args[1]))
+
+    async def fetchall(self):
+        return self._result
+
+
+class FakePool:
+    def __init__(self, cursor):
+        self._cursor = cursor
+
+    def acquire(self):
+        return self
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        pass
+
+    def cursor(self, *cursor_classes):
+        return self._cursor
+
+
+def test_mark_during_load_is_not_lost():
+    guild_id = 9001
+    posted_video_cache.invalidate(guild_id)
+
+    async def scenario():
+        release = asyncio.Event()
+        pool = FakePool(FakeCursor({(guild_id, "regi")}, release))
+        # A betöltés az INSERT előtt olvas, és az írás után fejeződik be
+        load = asyncio.create_task(get_posted_video_ids(pool, guild_id))
+        await asyncio.sleep(0)
+        await mark_video_posted(pool, guild_id, "uj")
+        release.set()
+        assert await load == {"regi"}
+        return await get_posted_video_ids(pool, guild_id)
+
+    assert asyncio.run(scenario()) == {"regi", "uj"}
+
+
+def test_mark_extends_loaded_set():
+    guild_id = 9002
+    posted_video_cache.invalidate(guild_id)
+    pool = FakePool(FakeCursor({(guild_id, "regi")}))
+
+    async def scenario():
+        posted = await get_posted_video_ids(pool, guild_id)
+        await mark_video_posted(pool, guild_id, "uj")
+        return posted, await get_posted_video_ids(pool, guild_id)
+
+    loaded, cached = asyncio.run(scenario())
+    assert cached is loaded
+    assert cached == {"regi", "uj"}
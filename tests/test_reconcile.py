@@ -0,0 +1,91 @@
+# tests/test_reconcile.py
+import asyncio
+
+import database
+from database import reconcile_guilds
+
+
+class FakeCursor:
+    def __init__(self, rows):
+        self.rows = rows
+        self.selects = []
+        self.writes = []
+        self._result = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        pass
+
+    async def execute(self, query, args=None):
+        assert query.startswith("SELECT guild_id, guild_name FROM guilds WHERE guild_id IN (")
+        assert query.count("%s") == len(args)
+        self.selects.append(list(args))
+        self._result = [(guild_id, self.rows[guild_id]) for guild_id in args if guild_id in self.rows]
+
+    async def fetchall(self):
+        return self._result
+
+    async def executemany(self, query, rows):
+        self.writes.append((query, list(rows)))
+
+
+class FakeConnection:
+    def __init__(self, cursor):
+        self._cursor = cursor
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        pass
+
+    def cursor(self, *cursor_classes):
+        return self._cursor
+
+    async def begin(self):
+        pass
+
+    async def commit(self):
+        pass
+
+    async def rollback(self):
+        pass
+
+
+class FakePool:
+    def __init__(self, cursor):
+        self._connection = FakeConnection(cursor)
+
+    def acquire(self):
+        return self._connection
+
+
+def test_reads_only_the_shards_guilds(monkeypatch):
+    monkeypatch.setattr(database, "get_all_cogs", lambda: ["cogs.a"])
+    # A táblában más shardok szerverei is vannak, ezeket nem szabad beolvasni
+    cursor = FakeCursor({1: "egy", 2: "kettő", 100: "más shard", 200: "más shard"})
+    result = asyncio.run(reconcile_guilds(FakePool(cursor), [(1, "egy"), (2, "új név"), (3, "három")]))
+
+    assert cursor.selects == [[1, 2, 3]]
+    assert (result.known, result.inserted_guilds, result.renamed_guilds, result.inserted_cogs) == (2, 1, 1, 1)
+    assert [rows for _, rows in cursor.writes] == [[(3, "három")], [(3, "cogs.a")], [("új név", 2)]]
+
+
+def test_large_shards_are_read_in_chunks(monkeypatch):
+    monkeypatch.setattr(database, "RECONCILE_CHUNK_SIZE", 2)
+    cursor = FakeCursor({guild_id: str(guild_id) for guild_id in range(5)})
+    result = asyncio.run(reconcile_guilds(FakePool(cursor), [(guild_id, str(guild_id)) for guild_id in range(5)]))
+
+    assert cursor.selects == [[0, 1], [2, 3], [4]]
+    assert result.known == 5
+    assert cursor.writes == []
+
+
+def test_empty_shard_runs_no_query():
+    cursor = FakeCursor({1: "egy"})
+    result = asyncio.run(reconcile_guilds(FakePool(cursor), []))
+
+    assert cursor.selects == []
+    assert result.rows_changed == 0
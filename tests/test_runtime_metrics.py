@@ -0,0 +1,93 @@
+# tests/test_runtime_metrics.py
+import asyncio
+from types import SimpleNamespace
+
+import discord
+import pytest
+
+import bot as bot_module
+from runtime_metrics import RuntimeMetrics
+
+
+class FakeResponse:
+    def __init__(self):
+        self.messages = []
+
+    async def send_message(self, content, **kwargs):
+        self.messages.append(content)
+
+
+def make_interaction(guild, name="ytpost"):
+    return SimpleNamespace(
+        type=discord.InteractionType.application_command,
+        guild=guild,
+        command=SimpleNamespace(qualified_name=name),
+        extras={},
+        response=FakeResponse(),
+    )
+
+
+@pytest.fixture
+def bot(monkeypatch):
+    async def enabled_cogs(pool, guild_id):
+        return set()
+
+    monkeypatch.setattr(bot_module, "get_enabled_cog_set", enabled_cogs)
+
+    async def build():
+        return bot_module.MyBot(None)
+
+    instance = asyncio.run(build())
+    instance.command_cogs["ytpost"] = ("cogs.youtube_cog", "YouTubeCog")
+    yield instance
+    asyncio.run(instance.host_metrics.stop())
+
+
+def test_dm_command_is_counted_as_rejected(bot):
+    interaction = make_interaction(guild=None)
+    assert asyncio.run(bot.is_cog_enabled(interaction)) is False
+    assert bot.metrics.command_rejected["ytpost"] == 1
+    assert bot.metrics.commands["ytpost"].count == 1
+    assert bot.metrics.command_errors["ytpost"] == 0
+
+
+def test_disabled_cog_command_is_counted_as_rejected(bot):
+    interaction = make_interaction(guild=SimpleNamespace(id=1))
+    assert asyncio.run(bot.is_cog_enabled(interaction)) is False
+    assert "nincs engedélyezve" in interaction.response.messages[0]
+    assert bot.metrics.command_rejected["ytpost"] == 1
+    # Az indulási idő nem marad az interakcióban
+    assert "metrics_started" not in interaction.extras
+
+
+def test_finished_without_start_is_ignored():
+    metrics = RuntimeMetrics()
+    metrics.command_finished(make_interaction(guild=None))
+    assert metrics.commands == {}
+
+
+def test_errors_and_rejections_are_rendered_separately():
+    metrics = RuntimeMetrics()
+    for error in (None, discord.app_commands.CheckFailure(), RuntimeError("hiba")):
+        interaction = make_interaction(guild=None, name="server")
+        metrics.command_started(interaction)
+        metrics.command_finished(interaction, error)
+
+    assert metrics.commands["server"].count == 3
+    text = metrics.render_prometheus()
+    assert 'discord_bot_command_errors_total{command="server",kind="error"} 1' in text
+    assert 'discord_bot_command_errors_total{command="server",kind="rejected"} 1' in text
+
+
+def test_timed_listener_counts_errors_and_reraises():
+    metrics = RuntimeMetrics()
+
+    async def on_message(message):
+        raise ValueError(message)
+
+    wrapped = metrics.timed_listener(on_message, "on_message")
+    with pytest.raises(ValueError):
+        asyncio.run(wrapped("x"))
+    key = ("on_message", on_message.__qualname__)
+    assert metrics.listener_errors[key] == 1
+    assert metrics.listeners[key].count == 1
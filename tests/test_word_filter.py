@@ -0,0 +1,74 @@
+# tests/test_word_filter.py
+import random
+
+import pytest
+
+from word_filter import LINEAR_SCAN_LIMIT, BadWordMatcher
+
+
+def brute_force_all(words, text):
+    text = text.lower()
+    return sorted(
+        (start + len(word), start, word)
+        for word in {word.lower() for word in words if word}
+        for start in range(len(text)) if text.startswith(word, start)
+    )
+
+
+def random_words(rng, count, alphabet="abcde"):
+    return {"".join(rng.choice(alphabet) for _ in range(rng.randint(1, 5))) for _ in range(count)}
+
+
+@pytest.fixture(params=[5, LINEAR_SCAN_LIMIT + 10], ids=["linear", "automaton"])
+def word_count(request):
+    return request.param
+
+
+def test_search_returns_earliest_ending_match(word_count):
+    rng = random.Random(word_count)
+    for _ in range(200):
+        words = random_words(rng, word_count)
+        matcher = BadWordMatcher(words)
+        text = "".join(rng.choice("abcdef ") for _ in range(rng.randint(0, 40)))
+        expected = brute_force_all(words, text)
+        match = matcher.search(text)
+        if not expected:
+            assert match is None
+            continue
+        assert match is not None
+        assert match.end == expected[0][0]
+        assert text.lower()[match.start:match.end] == match.word
+        assert match.word in matcher.words
+
+
+def test_finditer_yields_every_overlapping_match():
+    rng = random.Random(7)
+    for _ in range(200):
+        words = random_words(rng, rng.randint(1, LINEAR_SCAN_LIMIT * 2))
+        matcher = BadWordMatcher(words)
+        text = "".join(rng.choice("abcde") for _ in range(rng.randint(0, 40)))
+        found = sorted((match.end, match.start, match.word) for match in matcher.finditer(text))
+        assert found == brute_force_all(words, text)
+
+
+def test_case_insensitive_and_unicode():
+    matcher = BadWordMatcher(["Csúnya", "rossz"])
+    assert matcher.search("Ez egy CSÚNYA szó").word == "csúnya"
+    assert matcher.search("ROSSZ").start == 0
+    assert matcher.search("teljesen rendben") is None
+
+
+def test_empty_words_are_ignored():
+    matcher = BadWordMatcher(["", "szó"])
+    assert len(matcher) == 1
+    assert not BadWordMatcher([])
+    assert BadWordMatcher([]).search("bármi") is None
+    assert list(BadWordMatcher([]).finditer("bármi")) == []
+
+
+def test_nested_words_report_shortest_ending_first():
+    words = ["he", "she", "hers", "his"] + [f"x{index}y" for index in range(LINEAR_SCAN_LIMIT)]
+    matcher = BadWordMatcher(words)
+    match = matcher.search("ushers")
+    assert (match.start, match.end) in {(1, 4), (2, 4)}
+    assert {match.word for match in matcher.finditer("ushers")} == {"she", "he", "hers"}
@@ -0,0 +1,80 @@
+# tests/test_write_behind.py
+import asyncio
+
+from write_behind import WriteBehindBuffer
+
+
+def test_flushes_by_size_in_order():
+    written = []
+
+    async def flush(rows):
+        written.append(list(rows))
+
+    async def main():
+        buffer = WriteBehindBuffer("teszt", flush, max_batch=3, interval=60)
+        buffer.start()
+        buffer.add(0)
+        buffer.add(1)
+        await asyncio.sleep(0.01)
+        # Az időköz még nem telt le, a köteg sincs tele
+        assert written == []
+        for row in range(2, 7):
+            buffer.add(row)
+        await asyncio.sleep(0.01)
+        # A megtelt köteg felébreszti az írót, ami minden várakozó sort kiír
+        assert written == [[0, 1, 2], [3, 4, 5], [6]]
+        await buffer.close()
+
+    asyncio.run(main())
+
+
+def test_flushes_by_interval():
+    written = []
+
+    async def flush(rows):
+        written.extend(rows)
+
+    async def main():
+        buffer = WriteBehindBuffer("teszt", flush, max_batch=100, interval=0.02)
+        buffer.start()
+        buffer.add("a")
+        await asyncio.sleep(0.1)
+        assert written == ["a"]
+        await buffer.close()
+
+    asyncio.run(main())
+
+
+def test_failed_batch_is_kept_and_retried_in_order():
+    attempts = []
+    written = []
+
+    async def flush(rows):
+        attempts.append(list(rows))
+        if len(attempts) == 1:
+            raise RuntimeError("az adatbázis nem elérhető")
+        written.extend(rows)
+
+    async def main():
+        buffer = WriteBehindBuffer("teszt", flush, max_batch=10)
+        buffer.add(1)
+        buffer.add(2)
+        assert not await buffer.flush()
+        buffer.add(3)
+        assert await buffer.flush()
+        return buffer
+
+    buffer = asyncio.run(main())
+    assert written == [1, 2, 3]
+    assert buffer.failures == 1
+
+
+def test_overflow_drops_oldest_rows():
+    async def flush(rows):
+        pass
+
+    buffer = WriteBehindBuffer("teszt", flush, max_batch=100, max_pending=3)
+    for row in range(5):
+        buffer.add(row)
+    assert buffer._rows == [2, 3, 4]
+    assert buffer.dropped == 2
@@ -0,0 +1,50 @@
+# tests/test_youtube_ids.py
+import pytest
+
+from cogs.youtube_cog import get_channel_id, get_youtube_id
+
+VIDEO_ID = "dQw4w9WgXcQ"
+CHANNEL_ID = "UC" + "a1B2c3D4e5F6g7H8i9J0k_"
+
+
+@pytest.mark.parametrize("url", [
+    f"https://www.youtube.com/watch?v={VIDEO_ID}",
+    f"https://www.youtube.com/watch?v={VIDEO_ID}&list=PL123&t=42s",
+    f"https://m.youtube.com/watch?feature=share&v={VIDEO_ID}",
+    f"https://youtu.be/{VIDEO_ID}?si=abcdef",
+    f"https://www.youtube.com/shorts/{VIDEO_ID}?feature=share",
+    f"https://www.youtube.com/embed/{VIDEO_ID}",
+    f"https://www.youtube-nocookie.com/embed/{VIDEO_ID}",
+    f"https://music.youtube.com/watch?v={VIDEO_ID}&feature=share",
+    f"https://www.youtube.com/live/{VIDEO_ID}",
+    f"youtube.com/watch?v={VIDEO_ID}",
+    f"  https://youtu.be/{VIDEO_ID}  ",
+    f"<https://youtu.be/{VIDEO_ID}>",
+    f"nézd: https://www.youtube.com/watch?v={VIDEO_ID} !",
+])
+def test_supported_url_forms(url):
+    assert get_youtube_id(url) == VIDEO_ID
+
+
+@pytest.mark.parametrize("url", [
+    f"https://example.com/watch?v={VIDEO_ID}",
+    "https://www.youtube.com/watch?v=tooshort",
+    f"https://youtu.be/{VIDEO_ID}extra",
+    "Érvénytelen",
+    "",
+])
+def test_rejected_urls(url):
+    assert get_youtube_id(url) is None
+
+
+@pytest.mark.parametrize("value", [
+    CHANNEL_ID,
+    f"https://www.youtube.com/channel/{CHANNEL_ID}",
+    f"<https://youtube.com/channel/{CHANNEL_ID}/videos>",
+])
+def test_channel_ids(value):
+    assert get_channel_id(value) == CHANNEL_ID
+
+
+def test_handle_links_are_not_channel_ids():
+    assert get_channel_id("https://www.youtube.com/@valaki") is None
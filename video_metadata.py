@@ -0,0 +1,145 @@
+# video_metadata.py
+import asyncio
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from metrics import Histogram
+from models import VideoMetadata
+
+# A párhuzamos yt-dlp kinyerések száma és egy kinyerés időkorlátja (másodperc)
+EXTRACT_WORKERS = int(os.getenv("VIDEO_METADATA_WORKERS", "2"))
+EXTRACT_TIMEOUT = float(os.getenv("VIDEO_METADATA_TIMEOUT", "20"))
+# "yt-dlp" (alapértelmezett) vagy "stub" (hálózat nélküli, determinisztikus adatok)
+EXTRACTOR = os.getenv("VIDEO_METADATA_EXTRACTOR", "yt-dlp")
+
+
+class YtDlpExtractor:
+    """
+    Blokkoló yt-dlp kinyerő; csak az executorban hívható.
+    Blocking yt-dlp extractor; only ever called from the executor.
+    """
+
+    def __init__(self, timeout=EXTRACT_TIMEOUT):
+        self.options = {
+            "quiet": True,
+            "no_warnings": True,
+            "skip_download": True,
+            "noplaylist": True,
+            "socket_timeout": timeout,
+        }
+
+    def __call__(self, video_id):
+        # A yt-dlp importja lassú, ezért csak az első kinyeréskor, az executor szálán történik meg
+        from yt_dlp import YoutubeDL
+
+        with YoutubeDL(self.options) as ydl:
+            info = ydl.extract_info(f"https://www.youtube.com/watch?v={video_id}", download=False, process=False)
+        duration = info.get("duration")
+        return VideoMetadata(
+            video_id=video_id,
+            title=info.get("title") or video_id,
+            channel=info.get("channel") or info.get("uploader"),
+            duration=int(duration) if duration is not None else None,
+        )
+
+
+class StubExtractor:
+    """
+    Hálózat nélküli kinyerő tesztekhez és terhelésméréshez.
+    A network-free extractor for tests and benchmarks.
+
+    A `records` szótárban megadott adatokat adja vissza, egyébként az ID-ból
+    képzett determinisztikus adatokat; a `delay` a yt-dlp idejét szimulálja.
+    """
+
+    def __init__(self, records=None, delay=0.0):
+        self.records = dict(records or {})
+        self.delay = delay
+        self.calls = 0
+
+    def __call__(self, video_id):
+        self.calls += 1
+        if self.delay:
+            time.sleep(self.delay)
+        if video_id in self.records:
+            return self.records[video_id]
+        return VideoMetadata(video_id, f"Videó {video_id}", "Teszt csatorna", 60 + sum(map(ord, video_id)) % 3600)
+
+
+def make_extractor(kind=EXTRACTOR):
+    if kind == "stub":
+        return StubExtractor()
+    return YtDlpExtractor()
+
+
+class VideoMetadataService:
+    """
+    Videó adatok lekérése: memória (LRU) -> adatbázis -> yt-dlp, ebben a sorrendben.
+    Resolves video metadata from the LRU cache, then the database, then a bounded yt-dlp executor.
+
+    Ugyanarra a videóra egyszerre csak egy kinyerés fut: a párhuzamos kérések
+    ugyanazt az eredményt várják meg. A kinyerés legfeljebb EXTRACT_WORKERS
+    szálon, EXTRACT_TIMEOUT időkorláttal fut; hibánál None az eredmény.
+    `loader(video_id)` és `saver(metadata)` az adatbázis réteg függvényei.
+    """
+
+    def __init__(self, loader, saver, extractor=None, *, workers=EXTRACT_WORKERS, timeout=EXTRACT_TIMEOUT):
+        self.loader = loader
+        self.saver = saver
+        self.extractor = extractor or make_extractor()
+        self.timeout = timeout
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="yt-dlp")
+        self._inflight = {}
+
+        # Metrikák
+        self.extractions = 0
+        self.failures = 0
+        self.coalesced = 0
+        self.extract_time = Histogram()
+
+    async def get(self, video_id):
+        metadata = await self.loader(video_id)
+        if metadata is not None:
+            return metadata
+        future = self._inflight.get(video_id)
+        if future is None:
+            future = self._inflight[video_id] = asyncio.ensure_future(self._extract(video_id))
+        else:
+            self.coalesced += 1
+        # A shield miatt egy megszakított interakció nem szakítja meg a többiek által is várt kinyerést
+        return await asyncio.shield(future)
+
+    async def _extract(self, video_id):
+        loop = asyncio.get_running_loop()
+        started = time.perf_counter()
+        self.extractions += 1
+        try:
+            try:
+                metadata = await asyncio.wait_for(loop.run_in_executor(self._executor, self.extractor, video_id), self.timeout)
+            except Exception as e:
+                self.failures += 1
+                logging.warning(f"A(z) {video_id} videó adatai nem kérhetők le: {type(e).__name__}: {e}")
+                return None
+            finally:
+                self.extract_time.observe(time.perf_counter() - started)
+            try:
+                await self.saver(metadata)
+            except Exception as e:
+                logging.error(f"Hiba a(z) {video_id} videó adatainak mentésekor: {e}")
+            return metadata
+        finally:
+            # Csak a mentés után: addig az újabb kérések is ezt az eredményt várják
+            self._inflight.pop(video_id, None)
+
+    def close(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self):
+        return {
+            "extractions": self.extractions,
+            "failures": self.failures,
+            "coalesced": self.coalesced,
+            "inflight": len(self._inflight),
+            "extract_time": self.extract_time.snapshot(),
+        }
@@ -0,0 +1,122 @@
+# word_filter.py
+from collections import deque
+from typing import NamedTuple, Optional, Iterable, Iterator
+
+
+class BadWordMatch(NamedTuple):
+    """
+    Egy találat a tiltott szavak között.
+    A single bad word hit: the matched term and its [start, end) position in the lowercased text.
+    """
+    word: str
+    start: int
+    end: int
+
+
+_NO_OUTPUT = ()
+
+# Ennyi szó alatt a beépített str.find gyorsabb, mint a Pythonban léptetett automata
+LINEAR_SCAN_LIMIT = 50
+
+
+class BadWordMatcher:
+    """
+    Aho-Corasick automata a tiltott szavak egy menetben történő keresésére.
+    An Aho-Corasick automaton that scans a message for every bad word in a single pass.
+
+    Az automata egyszer épül fel egy szerver szólistájából, a keresés ideje pedig
+    csak az üzenet hosszától függ, a szavak számától nem. Rövid listáknál
+    (LINEAR_SCAN_LIMIT alatt) a search() egyszerű str.find keresést használ.
+    """
+    __slots__ = ("words", "_goto", "_fail", "_out")
+
+    def __init__(self, words: Iterable[str]):
+        self.words = frozenset(word.lower() for word in words if word)
+
+        goto = [{}]
+        out = [_NO_OUTPUT]
+        for word in self.words:
+            node = 0
+            for ch in word:
+                nxt = goto[node].get(ch)
+                if nxt is None:
+                    nxt = len(goto)
+                    goto.append({})
+                    out.append(_NO_OUTPUT)
+                    goto[node][ch] = nxt
+                node = nxt
+            out[node] = (word,)
+
+        # Hibakövető (failure) linkek szélességi bejárással; minden csúcs örökli
+        # a hibalinkje mentén elérhető szavakat is.
+        fail = [0] * len(goto)
+        queue = deque(goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, nxt in goto[node].items():
+                queue.append(nxt)
+                f = fail[node]
+                while f and ch not in goto[f]:
+                    f = fail[f]
+                fail[nxt] = goto[f].get(ch, 0)
+                if out[fail[nxt]]:
+                    out[nxt] = out[nxt] + out[fail[nxt]]
+
+        self._goto = goto
+        self._fail = fail
+        self._out = out
+
+    def __len__(self):
+        return len(self.words)
+
+    def __bool__(self):
+        return bool(self.words)
+
+    def search(self, text: str) -> Optional[BadWordMatch]:
+        """
+        Visszaadja az első (legkorábban végződő) találatot, vagy None-t.
+        Returns the first (earliest ending) match in the text, or None.
+        """
+        text = text.lower()
+        if len(self.words) < LINEAR_SCAN_LIMIT:
+            best = None
+            for word in self.words:
+                start = text.find(word)
+                if start != -1 and (best is None or start + len(word) < best.end):
+                    best = BadWordMatch(word, start, start + len(word))
+            return best
+
+        goto, fail, out = self._goto, self._fail, self._out
+        node = 0
+        for i, ch in enumerate(text):
+            while True:
+                nxt = goto[node].get(ch)
+                if nxt is not None:
+                    node = nxt
+                    break
+                if not node:
+                    break
+                node = fail[node]
+            if out[node]:
+                word = out[node][0]
+                return BadWordMatch(word, i + 1 - len(word), i + 1)
+        return None
+
+    def finditer(self, text: str) -> Iterator[BadWordMatch]:
+        """
+        Visszaadja az összes (akár átfedő) találatot a szövegben.
+        Yields every (possibly overlapping) match in the text.
+        """
+        goto, fail, out = self._goto, self._fail, self._out
+        node = 0
+        for i, ch in enumerate(text.lower()):
+            while True:
+                nxt = goto[node].get(ch)
+                if nxt is not None:
+                    node = nxt
+                    break
+                if not node:
+                    break
+                node = fail[node]
+            for word in out[node]:
+                yield BadWordMatch(word, i + 1 - len(word), i + 1)
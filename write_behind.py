@@ -0,0 +1,110 @@
+# write_behind.py
+import asyncio
+import logging
+import time
+from metrics import Histogram
+
+
+class WriteBehindBuffer:
+    """
+    Aszinkron, késleltetett író: a sorokat memóriában gyűjti, és kötegekben írja ki.
+    An async write-behind buffer that batches rows and flushes them by size or time.
+
+    Az add() nem vár adatbázisra; a háttérfeladat akkor ír, ha `max_batch`
+    sor összegyűlt, vagy a legrégebbi sor `interval` másodperce vár. A
+    `flush_fn(rows)` egy kötegnyi sort ír ki (pl. executemany). Sikertelen
+    írásnál a sorok visszakerülnek, és a következő körben újra próbálkozik;
+    `max_pending` felett a legrégebbi sorok elvesznek. A close() mindent kiír.
+    """
+
+    def __init__(self, name, flush_fn, *, max_batch=100, interval=1.0, max_pending=10000):
+        self.name = name
+        self.flush_fn = flush_fn
+        self.max_batch = max_batch
+        self.interval = interval
+        self.max_pending = max_pending
+
+        self._rows = []
+        self._wakeup = asyncio.Event()
+        self._lock = asyncio.Lock()
+        self._task = None
+        self._closing = False
+
+        # Metrikák
+        self.added = 0
+        self.written = 0
+        self.flushes = 0
+        self.failures = 0
+        self.dropped = 0
+        self.flush_time = Histogram()
+
+    def __len__(self):
+        return len(self._rows)
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name=f"write-behind-{self.name}")
+
+    def add(self, row):
+        """Sorba teszi a sort; megtelt köteg esetén azonnali kiírást kér."""
+        self._rows.append(row)
+        self.added += 1
+        if len(self._rows) > self.max_pending:
+            overflow = len(self._rows) - self.max_pending
+            del self._rows[:overflow]
+            self.dropped += overflow
+            logging.error(f"{self.name}: az írási puffer megtelt, {overflow} sor elveszett.")
+        if len(self._rows) >= self.max_batch:
+            self._wakeup.set()
+
+    async def _run(self):
+        while not self._closing:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+    async def flush(self):
+        """Kiírja a várakozó sorokat `max_batch` méretű kötegekben; hibánál a sorok megmaradnak."""
+        async with self._lock:
+            while self._rows:
+                batch = self._rows[:self.max_batch]
+                del self._rows[:len(batch)]
+                started = time.perf_counter()
+                try:
+                    await self.flush_fn(batch)
+                except Exception as e:
+                    self.failures += 1
+                    # A sorok az elejére kerülnek vissza, így a sorrend megmarad
+                    self._rows[:0] = batch
+                    logging.error(f"{self.name}: {len(batch)} sor kiírása sikertelen, újrapróbálás később: {e}")
+                    return False
+                self.flushes += 1
+                self.written += len(batch)
+                self.flush_time.observe(time.perf_counter() - started)
+        return True
+
+    async def close(self):
+        """Leállítja a háttérfeladatot, és kiírja a még várakozó sorokat."""
+        # A háttérfeladatot nem szakítjuk meg írás közben: jelzünk, és megvárjuk
+        self._closing = True
+        self._wakeup.set()
+        if self._task is not None:
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        if not await self.flush():
+            logging.error(f"{self.name}: leállításkor {len(self._rows)} sor nem került kiírásra.")
+
+    def stats(self):
+        return {
+            "name": self.name,
+            "pending": len(self._rows),
+            "added": self.added,
+            "written": self.written,
+            "flushes": self.flushes,
+            "failures": self.failures,
+            "dropped": self.dropped,
+            "flush_time": self.flush_time.snapshot(),
+        }